@@ -0,0 +1,167 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Adaptive (p1, Th) Refinement of Design Sweeps
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+import cycle
+
+
+######### REFINEMENT SETTINGS ###########
+COARSE_P1 = np.linspace(10, 100, 4)  # (bar)
+COARSE_TH = np.linspace(673, 873, 5)  # (Kelvin)
+
+# Absolute tolerances: an interval is bisected when linear interpolation misses its midpoint by more than TOL
+# or the metric changes across it by more than CHANGE_TOL
+TOL = {'thermal_eff': 1e-3}
+CHANGE_TOL = {'thermal_eff': 0.02}
+
+MIN_STEP = {'p1': 1.0, 'Th': 1.0}  # (bar, Kelvin) no two samples on a line are placed closer than this
+
+
+def _evaluator(design, cogeneration, constrained, backend, options):
+    def evaluate(p1, Th):
+        if constrained:
+            import constraints
+            return constraints.solve_feasible(design, p1, Th, cogeneration=cogeneration, backend=backend, **options)
+        if cogeneration:
+            return cycle.solve_cogeneration(design, p1, Th, backend=backend, **options)
+        return cycle.solve(design, p1, Th, backend=backend, **options)
+    return evaluate
+
+
+def _metric_matrix(table, names):
+    return np.column_stack([table[name] for name in names])
+
+
+######### ONE-DIMENSIONAL BISECTION ###########
+# Refines every line (fixed value of the other input) at once: each round solves the midpoints of all open
+# intervals in one batch. An interval stays open while interpolation error or metric change exceeds the
+# tolerances, or while its ends and midpoint disagree on whether the solve is finite (feasibility edges).
+# Starting samples already in `known` are not solved again.
+def _refine_lines(evaluate, axis, lines, samples, tol, change_tol, min_step, max_rounds, known=None):
+    names = list(tol)
+    tol = np.array([tol[n] for n in names])
+    change_tol = np.array([change_tol.get(n, np.inf) for n in names])
+    other = 'Th' if axis == 'p1' else 'p1'
+
+    def solve(line_values, x):
+        return evaluate(**{other: line_values, axis: x})
+
+    ##### Starting grid
+    L, X = np.meshgrid(np.arange(len(lines)), samples, indexing='ij')
+    grid = {other: lines[L.ravel()], axis: X.ravel()}
+    rows = np.full(len(L.ravel()), -1)
+    if known is not None:
+        index = {key: i for i, key in enumerate(zip(known[other].tolist(), known[axis].tolist()))}
+        rows = np.array([index.get(key, -1) for key in zip(grid[other].tolist(), grid[axis].tolist())])
+    todo = rows < 0
+    tables = []
+    F = np.empty((len(rows), len(names)))
+    if known is not None and not todo.all():
+        F[~todo] = _metric_matrix(known, names)[rows[~todo]]
+    if todo.any():
+        tables.append(solve(grid[other][todo], grid[axis][todo]))
+        F[todo] = _metric_matrix(tables[0], names)
+    F = F.reshape(len(lines), len(samples), -1)
+
+    ##### Open intervals as flat arrays: line, ends and metric values at the ends
+    line = np.repeat(np.arange(len(lines)), len(samples) - 1)
+    a = np.tile(samples[:-1], len(lines))
+    b = np.tile(samples[1:], len(lines))
+    fa, fb = F[:, :-1].reshape(len(a), -1), F[:, 1:].reshape(len(b), -1)
+
+    for _ in range(max_rounds):
+        if len(line) == 0:
+            break
+        m = (a + b) / 2
+        table = solve(lines[line], m)
+        tables.append(table)
+        fm = _metric_matrix(table, names)
+
+        finite = [np.all(np.isfinite(f), axis=1) for f in (fa, fm, fb)]
+        edge = (finite[0] != finite[1]) | (finite[1] != finite[2])
+        with np.errstate(invalid='ignore'):
+            error = np.max(np.abs(fm - (fa + fb) / 2) / tol, axis=1)
+            change = np.max(np.abs(fb - fa) / change_tol, axis=1)
+        coarse = finite[0] & finite[1] & finite[2] & ((error > 1) | (change > 1))
+        split = (edge | coarse) & ((b - a) / 4 >= min_step)
+
+        line, a, b, fa, fb, fm, m = line[split], a[split], b[split], fa[split], fb[split], fm[split], m[split]
+        line = np.concatenate([line, line])
+        a, b = np.concatenate([a, m]), np.concatenate([m, b])
+        fa, fb = np.concatenate([fa, fm]), np.concatenate([fm, fb])
+    return _concat(tables)
+
+
+def _concat(tables):
+    return {name: np.concatenate([t[name] for t in tables]) for name in tables[0]}
+
+
+######### ADAPTIVE SWEEP ###########
+# Bisect p1 along the coarse Th lines first, then Th along every p1 line that refinement produced.
+# Returns a non-uniform table sorted by (p1, Th), each p1 line with its own Th samples. With constrained=True
+# infeasible points are pruned before they are solved and the feasibility edges are refined like any other.
+def refine(design, coarse_p1=COARSE_P1, coarse_Th=COARSE_TH, tol=TOL, change_tol=CHANGE_TOL, min_step=MIN_STEP,
+           max_rounds=8, cogeneration=False, constrained=False, backend=None, **options):
+    evaluate = _evaluator(design, cogeneration, constrained, backend, options)
+    coarse_p1 = np.unique(np.asarray(coarse_p1, dtype=float))
+    coarse_Th = np.unique(np.asarray(coarse_Th, dtype=float))
+
+    p1_pass = _refine_lines(evaluate, 'p1', coarse_Th, coarse_p1, tol, change_tol, min_step['p1'], max_rounds)
+    p1_lines = np.unique(p1_pass['p1'])
+    Th_pass = _refine_lines(evaluate, 'Th', p1_lines, coarse_Th, tol, change_tol, min_step['Th'], max_rounds,
+                            known=p1_pass)
+
+    table = _concat([p1_pass, Th_pass])
+    order = np.lexsort((table['Th'], table['p1']))
+    return {name: values[order] for name, values in table.items()}
+
+
+######### READING A REFINED TABLE ###########
+# Linear interpolation along Th on the two p1 lines around each query point, then linearly in p1
+def interpolate(table, metric, p1, Th):
+    p1, Th = np.broadcast_arrays(np.asarray(p1, dtype=float), np.asarray(Th, dtype=float))
+    lines = np.unique(table['p1'])
+    on_lines = np.empty((len(lines),) + p1.shape)
+    for k, line in enumerate(lines):
+        rows = table['p1'] == line
+        on_lines[k] = np.interp(Th, table['Th'][rows], table[metric][rows], left=np.nan, right=np.nan)
+    i = np.clip(np.searchsorted(lines, p1, side='right') - 1, 0, len(lines) - 2)
+    w = (p1 - lines[i]) / (lines[i + 1] - lines[i])
+    value = (1 - w) * np.take_along_axis(on_lines, i[None], 0)[0] + w * np.take_along_axis(on_lines, i[None] + 1, 0)[0]
+    return np.where((p1 >= lines[0]) & (p1 <= lines[-1]), value, np.nan)
+
+
+def run_refine(name, design, cogeneration=False, constrained=False, backend=None, **kwargs):
+    import properties
+    import store
+    table = refine(design, cogeneration=cogeneration, constrained=constrained, backend=backend, **kwargs)
+    meta = {
+        'design': design,
+        'cogeneration': cogeneration,
+        'constrained': constrained,
+        'backend': backend or properties.active_backend(),
+        'tol': kwargs.get('tol', TOL),
+        'change_tol': kwargs.get('change_tol', CHANGE_TOL),
+        'p1_lines': np.unique(table['p1']).tolist(),
+    }
+    store.save(name, table, meta)
+    return table
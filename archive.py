@@ -0,0 +1,120 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Reader for the Design*Data Result Archives
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import csv
+import os
+import numpy as np
+
+
+######### ARCHIVE LAYOUT ###########
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# design number: (folder, data file prefix)
+DESIGNS = {
+    1: ('Design1Data', 'noreheatdata'),
+    2: ('Design2Data', 'onereheatdata'),
+    3: ('Design3Data', 'threereheatdata'),
+}
+
+# Pressure level files written next to the data files; the data files have no p2..p5 columns
+PRESSURE_PREFIXES = {
+    1: 'noreheatpressures',
+    2: 'onereheatpressure',
+    3: 'threereheatpressure',
+}
+
+DESIGN_TITLES = {
+    1: 'Design 1',
+    2: 'Design 2',
+    3: 'Design 3',
+}
+
+# Data file headers renamed to the names used in code (graph_writer in design 3)
+COLUMN_NAMES = {
+    'P1': 'p1',
+    'P2': 'p2',
+    'P3': 'p3',
+    'P4': 'p4',
+    'P5': 'p5',
+    'm.': 'm_dot',
+    'm.cw': 'm_dot_cw',
+    'Q_out per unit mass': 'Q_out_unitmass',
+    'thermal eff': 'thermal_eff',
+    "y'": 'y1',
+    "y''": 'y2',
+    "y'''": 'y3',
+}
+
+
+######### READING ###########
+# Values written straight from 1-element numpy arrays appear as "[3264.18977354]"
+def _value(text):
+    return float(text.strip().strip('[]'))
+
+
+def read_table(path):
+    with open(path, newline='') as file:
+        rows = list(csv.reader(file))
+    header = [COLUMN_NAMES.get(name, name) for name in rows[0]]
+    values = np.array([[_value(v) for v in row] for row in rows[1:] if row], dtype=float)
+    return {name: values[:, i] for i, name in enumerate(header)}
+
+
+def write_table(path, table):
+    names = list(table)
+    with open(path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(names)
+        writer.writerows(zip(*[table[name].tolist() for name in names]))
+
+
+def archive_path(design, p1):
+    folder, prefix = DESIGNS[design]
+    return os.path.join(ROOT, folder, f'{prefix}_{p1}.csv')
+
+
+def pressure_path(design, p1):
+    return os.path.join(ROOT, DESIGNS[design][0], f'{PRESSURE_PREFIXES[design]}_{p1}.csv')
+
+
+# Boiler pressures with an archived data file, in ascending order
+def archived_pressures(design):
+    folder, prefix = DESIGNS[design]
+    pressures = []
+    for name in os.listdir(os.path.join(ROOT, folder)):
+        if name.startswith(prefix + '_') and name.endswith('.csv'):
+            pressures.append(int(name[len(prefix) + 1:-4]))
+    return sorted(pressures)
+
+
+# Data file of one p1 with the pressure levels p2..p5 of its pressure file (same Th rows)
+def _read_point(design, p1):
+    table = read_table(archive_path(design, p1))
+    levels = read_table(pressure_path(design, p1))
+    table.update({f'p{k}': levels[f'p{k}'] for k in range(2, 6)})
+    return table
+
+
+# Load the archived data for one design, for one p1 or stacked over every archived p1
+def load_archive(design, p1=None):
+    pressures = archived_pressures(design) if p1 is None else [p1]
+    tables = [_read_point(design, p) for p in pressures]
+    return {name: np.concatenate([t[name] for t in tables]) for name in tables[0]}
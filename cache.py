@@ -0,0 +1,101 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Point Result Cache for the Cycle Solver
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+from collections import OrderedDict
+import numpy as np
+
+
+######### CACHE KEYS ###########
+# A point is identified by its design, backend and inputs rounded well below any meaningful change
+KEY_INPUTS = ('p1', 'Th', 'turbEff', 'pumpEff', 'tc')
+KEY_DECIMALS = 9
+
+
+def point_keys(design, backend, inputs):
+    columns = [np.round(np.asarray(inputs[name], dtype=float), KEY_DECIMALS).tolist() for name in KEY_INPUTS]
+    return [(design, backend) + key for key in zip(*columns)]
+
+
+######### LRU CACHE ###########
+class ResultCache:
+
+    def __init__(self, max_points=200_000):
+        self.max_points = max_points
+        self.rows = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    # Returns one row per key, None where the point has not been solved
+    def get_many(self, keys):
+        rows = []
+        for key in keys:
+            row = self.rows.get(key)
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.rows.move_to_end(key)
+            rows.append(row)
+        return rows
+
+    def put_many(self, keys, table):
+        names = list(table)
+        values = np.column_stack([np.asarray(table[name], dtype=float) for name in names])
+        for key, row in zip(keys, values):
+            self.rows[key] = dict(zip(names, row))
+            self.rows.move_to_end(key)
+        while len(self.rows) > self.max_points:
+            self.rows.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'points': len(self.rows), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+    ######### PERSISTENCE ###########
+    # One result store table per (design, backend), so cached points survive restarts; tables saved by an
+    # older cycle.REVISION are skipped on load
+    def save(self, name='cache'):
+        import cycle
+        import store
+        groups = {}
+        for key, row in self.rows.items():
+            groups.setdefault(key[:2], []).append(row)
+        for (design, backend), rows in groups.items():
+            table = {c: np.array([r[c] for r in rows]) for c in rows[0]}
+            store.save(f'{name}/{backend}/design{design}', table,
+                       {'design': design, 'backend': backend, 'revision': cycle.REVISION})
+
+    def load(self, name='cache'):
+        import cycle
+        import store
+        for table_name in store.list_tables():
+            if not table_name.startswith(name + '/'):
+                continue
+            meta = store.info(table_name)['meta']
+            if meta.get('revision') != cycle.REVISION:
+                continue
+            table = store.load(table_name, mmap=False)
+            self.put_many(point_keys(meta['design'], meta['backend'], table), table)
+
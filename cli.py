@@ -0,0 +1,609 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Command Line Interface for the Rankine Cycle Studies
+
+Usage:
+    python cli.py backends
+    python cli.py validate if97 --reference pyromat
+    python cli.py regress --candidates vectorized tabulated if97
+    python cli.py sweep --design 2 --p1 10 50 90 --cogeneration --out onereheat.csv
+    python cli.py bleeds --design 1 2 --p1 10 50 100 --schedules equal enthalpy optimal
+    python cli.py reheat --p1 10 50 100 --name reheat/study --plot fronts.png
+    python cli.py refine --design 3 --tol thermal_eff=5e-4 --name refined/design3
+    python cli.py job create --name study --design 1 2 3 --p1 10 20 50 90 --turbEff 0.8 0.87 0.9
+    python cli.py job work --name study
+    python cli.py job merge --name study
+    python cli.py emissions --schedule dispatch.csv --name year --fuel natural_gas
+    python cli.py surface --design 1 2 3
+    python cli.py dispatch --demand year.csv --name year --co2-price 50
+    python cli.py surrogate --design 1 --kind poly
+    python cli.py serve --port 8765 --workers 4
+    python cli.py loadtest --requests 2000 --concurrency 64
+    python cli.py diff study/design1 if97study/design1 --tol 1e-4 --plot diff.png
+    python cli.py show --design 1 --p1 90
+    python cli.py plot --design 3 --metric thermal_eff
+    python cli.py startup
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+######### STARTUP BUDGET ###########
+# Commands that only read cached results must not import PYroMat or matplotlib.pyplot at start up
+STARTUP_BUDGET = 0.5  # (seconds) Wall time allowed for a fresh interpreter to run a cached-results command
+STARTUP_COMMANDS = [['backends'], ['show', '--design', '1', '--p1', '90']]
+
+
+######### COMMANDS ###########
+def cmd_backends(args):
+    import properties
+    for name in properties.available_backends():
+        marker = '*' if name == properties.active_backend() else ' '
+        print(f"{marker} {name}")
+
+
+# Cross-validate a backend against a reference backend over the operating envelope
+def cmd_validate(args):
+    import properties
+    failed = False
+    for name, deviation in properties.compare_backends(args.backend_name, args.reference).items():
+        status = 'ok' if deviation <= args.tol else 'FAIL'
+        failed = failed or deviation > args.tol
+        print(f"{name:<10} max rel. deviation {deviation:.2e}  {status}")
+    return 1 if failed else 0
+
+
+# Rerun the archived points with each candidate and fail if any gated column drifts past its tolerance
+def cmd_regress(args):
+    import json
+    import regression
+    gates = dict(item.split('=') for item in args.gate or [])
+    reports = regression.run(args.candidates, args.design, {k: float(v) for k, v in gates.items()}, args.stride)
+    for report in reports:
+        print(f"{report['candidate']} ({report['backend']}), gate {report['gate']:.0e}: "
+              f"{'ok' if report['passed'] else 'FAIL'}")
+        for design, result in report['designs'].items():
+            print(f"  design {design}: {result['points']} points in {result['seconds']:.1f} s  "
+                  f"{'ok' if result['passed'] else 'FAIL'}")
+            columns = sorted(result['columns'].items(), key=lambda item: -item[1]['max_rel'])
+            for name, values in columns[:args.rows] if not args.all else columns:
+                if values['excluded']:
+                    status = f"excluded, {values['excluded']}"
+                else:
+                    status = 'ok' if values['passed'] else f"FAIL at p1 {values['worst_p1']:g}, Th {values['worst_Th']:g}"
+                    if values['reference']:
+                        status += f", {values['reference']}"
+                scaled = ' (scaled)' if values['sign_change'] else ''
+                print(f"    {name:<16} max abs {values['max_abs']:.3e}  max rel {values['max_rel']:.3e}{scaled:<9} {status}")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(reports, file, indent=2)
+    return 0 if all(report['passed'] for report in reports) else 1
+
+
+# Solve a (p1, Th) grid with the vectorized solver, optionally with the district heat export coupled in
+def cmd_sweep(args):
+    import archive
+    import cycle
+    Th = range(args.th_start, args.th_stop + 1, args.th_step)
+    if args.constrained:
+        import numpy as np
+        import constraints
+        p1, T = np.meshgrid(args.p1, Th, indexing='ij')
+        options = {'UA': args.ua} if args.cogeneration else {}
+        table = constraints.solve_feasible(args.design, p1.ravel(), T.ravel(), cogeneration=args.cogeneration,
+                                           limits={'x_min': args.x_min}, bleeds=args.bleeds, **options)
+        if not args.keep_infeasible:
+            table = {name: values[table['feasible'] == 1] for name, values in table.items()}
+    elif args.cogeneration:
+        import numpy as np
+        p1, T = np.meshgrid(args.p1, Th, indexing='ij')
+        table = cycle.solve_cogeneration(args.design, p1.ravel(), T.ravel(), UA=args.ua, bleeds=args.bleeds)
+    else:
+        table = cycle.solve_grid(args.design, args.p1, Th, bleeds=args.bleeds)
+    archive.write_table(args.out, table)
+    print(f"{len(table['Th'])} points written to {args.out}")
+
+
+# Solve the same grid with each bleed pressure schedule and compare efficiency, bleeds and solve time
+def cmd_bleeds(args):
+    import numpy as np
+    import extraction
+    if args.search_backend:
+        extraction.SEARCH_BACKEND = args.search_backend
+    Th = np.arange(args.th_start, args.th_stop + 1, args.th_step, dtype=float)
+    p1, T = np.meshgrid(args.p1, Th, indexing='ij')
+    for design in args.design:
+        results = extraction.compare(design, p1.ravel(), T.ravel(), args.schedules)
+        base = results[args.schedules[0]]['regenerative_eff']
+        print(f"design {design}: {p1.size} points, gain against '{args.schedules[0]}'")
+        for name, table in results.items():
+            gain = table['regenerative_eff'] - base
+            print(f"  {name:<12} regen. eff {np.nanmean(table['regenerative_eff']):.4f}  "
+                  f"gain mean {np.nanmean(gain):+.4f} max {np.nanmax(gain):+.4f}  "
+                  f"thermal_eff {np.nanmean(table['thermal_eff']):.4f}  {table['seconds']:.2f} s")
+            print(f"  {'':<12} bleeds at p1 = {args.p1[-1]:g} bar, Th = {Th[-1]:g} K: "
+                  + ', '.join(f"{k} {table[k][-1]:.2f}" for k in ('p2', 'p3', 'p4')) + " bar")
+        if args.out:
+            import archive
+            name = args.out.replace('.csv', f'_design{design}.csv') if len(args.design) > 1 else args.out
+            archive.write_table(name, {k: v for k, v in results[args.schedules[-1]].items() if k != 'seconds'})
+
+
+# Reheat pressures and temperatures of the reheat designs: Pareto fronts of efficiency against reheater duty and,
+# at every p1, what the last design gains over the first
+def cmd_reheat(args):
+    import numpy as np
+    import reheat
+    options = {'limits': {'x_min': args.x_min}, 'samples': args.samples, 'rounds': args.rounds,
+               'search_backend': args.search_backend}
+    if args.name:
+        table, info = reheat.run_study(args.name, args.design, p1_values=args.p1, Th_values=args.th, **options)
+    else:
+        table, info = reheat.study(args.design, p1_values=args.p1, Th_values=args.th, **options)
+    for design, values in info.items():
+        print(f"design {design}: {values['evaluations']} evaluations, {values['front_points']} front points, "
+              f"{values['seconds']:.1f} s")
+    first, last = args.design[0], args.design[-1]
+    summary = reheat.compare(table, args.design)
+    print(f"{'p1':>6} {'Th':>6} {f'eff {first}':>8} {f'eff {last}':>8} {'gain':>7} "
+          f"{f'Q_reheat {first} (kW)':>18} {f'Q_reheat {last} to beat':>20}")
+    for i in range(len(summary.get('p1', []))):
+        print(f"{summary['p1'][i]:>6g} {summary['Th'][i]:>6g} {summary[f'eff_{first}'][i]:>8.4f} "
+              f"{summary[f'eff_{last}'][i]:>8.4f} {summary['gain'][i]:>+7.4f} "
+              f"{summary[f'Q_reheat_{first}'][i]:>18.0f} {summary['Q_reheat_to_beat'][i]:>20.0f}")
+    if args.name:
+        print(f"fronts written to result store as {args.name}")
+    if args.plot:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        for design, style in zip(args.design, ('-', '--', ':')):
+            for p1 in args.p1:
+                at = (table['design'] == design) & (table['p1'] == p1) & (table['Th'] == args.th[-1])
+                order = np.argsort(table['Q_reheat'][at])
+                plt.plot(table['Q_reheat'][at][order] / 1000, table['regenerative_eff'][at][order], style,
+                         label=f"design {design}, p1 = {p1:g} bar")
+        plt.xlabel('Reheater duty (MW)')
+        plt.ylabel('regenerative_eff')
+        plt.title(f"Reheat Pareto fronts at Th = {args.th[-1]:g} K")
+        plt.legend(fontsize='small')
+        plt.savefig(args.plot)
+
+
+# Adaptive (p1, Th) sweep: bisect where the metrics curve or change fast, write the non-uniform table
+def cmd_refine(args):
+    import adaptive
+    tol = dict(adaptive.TOL)
+    for item in args.tol or []:
+        name, value = item.split('=')
+        tol[name] = float(value)
+    for design in args.design:
+        name = f"{args.name}{design}" if len(args.design) > 1 else args.name
+        table = adaptive.run_refine(name, design, args.cogeneration, args.constrained, tol=tol,
+                                    max_rounds=args.max_rounds)
+        lines = len(set(table['p1'].tolist()))
+        print(f"design {design}: {len(table['p1'])} points on {lines} p1 lines, written to result store as {name}")
+
+
+# Distributed sweep: create a queue of work units, run workers against it (here or on any node sharing the
+# result store), follow progress and merge the shards
+def cmd_job(args):
+    import distributed
+    if args.action == 'create':
+        axes = {'p1': args.p1, 'Th': list(range(args.th_start, args.th_stop + 1, args.th_step))}
+        axes.update({name: getattr(args, name) for name in ('turbEff', 'pumpEff', 'tc') if getattr(args, name)})
+        distributed.create(args.name, args.design, axes, args.constrained, args.backend, args.unit_points,
+                           args.lease, chunk_points=args.chunk_points)
+    elif args.action == 'work':
+        if args.workers > 1:
+            done = distributed.run_local(args.name, args.workers)
+        else:
+            done = distributed.work(args.name)
+        print(f"{done} units solved")
+    elif args.action == 'merge':
+        for name in distributed.merge(args.name):
+            print(f"merged into result store as {name}")
+        return 0
+    report = distributed.status(args.name)
+    counts = ', '.join(f"{n} {s}" for s, n in sorted(report['counts'].items()))
+    print(f"{args.name}: {counts}; {report['solve_seconds']:.1f} s of solving")
+    for error in report['errors'][:args.rows]:
+        print(f"  unit {error['id']} (design {error['design']}, attempt {error['attempts']}): {error['error']}")
+    return 1 if report['counts'].get('failed') else 0
+
+
+# Fuel and CO2 of an operating schedule, aggregated per period and written to the result store
+def cmd_emissions(args):
+    import archive
+    import emissions
+    schedule = archive.read_table(args.schedule)
+    steps, summaries = emissions.run_schedule(args.name, schedule, args.fuel, args.periods, args.start,
+                                              args.cogeneration)
+    print(f"{len(steps['hour'])} steps, fuel {args.fuel}, written to result store as {args.name}/*")
+    for period in args.periods:
+        table = summaries[period]
+        print(f"{'per ' + period:<12} {'electricity (MWh)':>18} {'fuel (MMBtu)':>14} {'CO2 (t)':>12}")
+        for i in range(min(len(table['period']), args.rows)):
+            print(f"{table['period'][i]:<12} {table['electricity_kWh'][i] / 1000:>18.1f} "
+                  f"{table['fuel_MMBtu'][i]:>14.1f} {table['co2_kg'][i] / 1000:>12.2f}")
+
+
+# Solve and cache the (p1, Th) performance surfaces used by dispatch
+def cmd_surface(args):
+    import surfaces
+    for design in args.design:
+        surface = surfaces.build_surface(design, cogeneration=args.cogeneration, constrained=args.constrained)
+        metric = 'elec_eff' if args.cogeneration else 'thermal_eff'
+        p1, Th, eff = surface.optimum(metric)
+        print(f"{surfaces.surface_name(design, args.cogeneration)}: best {metric} {eff:.4f} at p1 {p1:.1f} bar, Th {Th:.0f} K")
+
+
+# Dispatch the fleet against an hourly demand and fuel price series using only cached surfaces
+def cmd_dispatch(args):
+    import json
+    import archive
+    import dispatch
+    series = archive.read_table(args.demand)
+    prices = {k[len('price_'):]: v for k, v in series.items() if k.startswith('price_')}
+    fuel_price = prices or series['fuel_price']
+    units = dispatch.DEFAULT_UNITS
+    if args.units:
+        with open(args.units) as file:
+            units = json.load(file)
+    result = dispatch.run_dispatch(args.name, series['demand'], fuel_price, units, args.co2_price, args.cogeneration)
+    print(f"{len(result['hour'])} hours dispatched, written to result store as dispatch/{args.name}")
+    print(f"fuel cost {result['fuel_cost'].sum():,.0f} $, CO2 {result['co2_kg'].sum() / 1000:,.0f} t, "
+          f"unserved {result['unserved'].sum() / 1000:,.1f} MWh")
+    for unit in units:
+        energy = result[f"power_{unit['name']}"].sum() / 1000
+        print(f"  {unit['name']:<12} {energy:>14,.0f} MWh")
+
+
+# Adaptive surrogate build, validated on held-out solver points and saved next to the result store
+def cmd_surrogate(args):
+    import numpy as np
+    import surrogate
+    options = {'degree': args.degree} if args.kind == 'poly' else {}
+    for design in args.design:
+        model = surrogate.build(design, args.kind, rounds=args.rounds, tol=args.tol, **options)
+        path = surrogate.surrogate_path(design, args.kind)
+        model.save(path)
+        X = surrogate.latin_hypercube(10000, np.random.default_rng(0))
+        start = time.perf_counter()
+        model.predict(X)
+        latency = (time.perf_counter() - start) / len(X) * 1e6
+        print(f"design {design} {args.kind}: {int(model.arrays['n_samples'])} solver samples, "
+              f"{latency:.1f} us/point batched, saved to {path}")
+        for name in surrogate.OUTPUTS:
+            print(f"  {name:<12} max rel. error {model.errors['maxrel'][name]:.2e}  "
+                  f"rms {model.errors['rms'][name]:.3g}  max abs {model.errors['maxabs'][name]:.3g}")
+
+
+# Run the solver as an HTTP/JSON service with micro-batching and a result cache
+def cmd_serve(args):
+    import service
+    service.serve(args.host, args.port, workers=args.workers, max_batch=args.max_batch,
+                  max_wait=args.max_wait / 1000, persist=args.persist)
+
+
+# Drive a running service with concurrent keep-alive clients and report latency and throughput
+def cmd_loadtest(args):
+    import asyncio
+    import service
+    report = asyncio.run(service.load_test(args.host, args.port, args.requests, args.concurrency, args.points,
+                                           args.design, args.grid_points))
+    latency, server = report['latency_ms'], report['server']
+    print(f"{report['requests']} requests ({report['failures']} failed) in {report['elapsed_s']:.2f} s: "
+          f"{report['requests_per_s']:.0f} req/s, {report['points_per_s']:.0f} points/s")
+    print(f"latency p50 {latency['p50']:.1f} ms  p95 {latency['p95']:.1f} ms  p99 {latency['p99']:.1f} ms  "
+          f"max {latency['max']:.1f} ms")
+    print(f"server: {server['batches']} batches, {server['mean_batch_points']:.1f} points/batch, "
+          f"{server['solved_points']} points solved, cache hit rate {server['cache']['hit_rate']:.1%}")
+    return 1 if report['failures'] else 0
+
+
+def cmd_results(args):
+    import store
+    for name in store.list_tables():
+        print(f"{name:<40} {store.info(name)['rows']:>10} rows")
+
+
+# Join two stored sweeps on their keys and summarise what moved: per-column changes, largest rows, worst regions
+def cmd_diff(args):
+    import diff
+    report = diff.compare(args.a, args.b, args.columns, args.keys, args.tol, args.chunk_rows, args.top, args.bins,
+                          args.regions, args.plot, partitions=args.partitions)
+    print(f"{report['b']} vs {report['a']} on {', '.join(report['keys'])}: {report['matched']} rows matched, "
+          f"{report['only_a']} only in A, {report['only_b']} only in B ({report['seconds']:.1f} s)")
+    if report['duplicate_keys_b']:
+        print(f"  {report['duplicate_keys_b']} rows of B repeat a key; the first of each was used")
+    columns = sorted(report['columns'].items(), key=lambda item: -item[1]['max_rel'])
+    print(f"  {'column':<16} {'changed':>9} {'max abs':>10} {'max rel':>10} {'mean abs':>10} {'NaN diff':>9}")
+    for name, values in columns[:None if args.all else args.rows]:
+        print(f"  {name:<16} {values['changed']:>9} {values['max_abs']:>10.3e} {values['max_rel']:>10.3e} "
+              f"{values['mean_abs']:>10.3e} {values['nan_mismatch']:>9}")
+    for name, values in columns[:args.top_columns]:
+        if values['max_rel'] <= report['tol']:
+            break
+        print(f"  largest changes of {name}:")
+        for row in values['largest']:
+            key = ', '.join(f"{k}={row[k]:g}" for k in report['keys'])
+            print(f"    {key}: {row['a']:.6g} -> {row['b']:.6g} ({row['rel']:.2e})")
+    for region in report['regions']:
+        print(f"  design {region['design']:g}, p1 {region['p1'][0]:g}-{region['p1'][1]:g} bar, "
+              f"Th {region['Th'][0]:g}-{region['Th'][1]:g} K: {region['disagree']}/{region['rows']} rows "
+              f"over tolerance, max rel. {region['max_rel']:.2e}")
+    if args.json:
+        import json
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.plot:
+        print(f"  disagreement map written to {args.plot}")
+
+
+def cmd_show(args):
+    import archive
+    table = archive.load_archive(args.design, args.p1)
+    columns = args.columns or ['Th', 'p1', 'm_dot', 'W_net', 'Q_in', 'thermal_eff', 'BWR']
+    print(','.join(columns))
+    for i in range(len(table['Th'])):
+        print(','.join(f"{table[c][i]:.6g}" for c in columns))
+
+
+def cmd_plot(args):
+    import archive
+    import matplotlib
+    if args.out:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    for p1 in archive.archived_pressures(args.design):
+        table = archive.load_archive(args.design, p1)
+        plt.plot(table['Th'], table[args.metric], label=f"p1 = {p1} bar")
+    plt.xlabel('T of Boiler (K)')
+    plt.ylabel(args.metric)
+    plt.title(f"{archive.DESIGN_TITLES[args.design]} - {args.metric} vs. T of Boiler")
+    plt.legend()
+    if args.out:
+        plt.savefig(args.out)
+    else:
+        plt.show()
+
+
+# Time fresh interpreters running the cached-results commands against STARTUP_BUDGET
+def cmd_startup(args):
+    script = os.path.abspath(__file__)
+    failed = False
+    for command in STARTUP_COMMANDS:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, script] + command, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        status = 'ok' if best <= args.budget else 'OVER BUDGET'
+        failed = failed or best > args.budget
+        print(f"{' '.join(command):<30} {best:.3f} s  (budget {args.budget:.2f} s)  {status}")
+    return 1 if failed else 0
+
+
+######### ARGUMENT PARSING ###########
+def build_parser():
+    parser = argparse.ArgumentParser(description="Rankine cycle nuclear plant studies")
+    parser.add_argument('--backend', help="steam property backend (default: RANKINE_BACKEND or pyromat)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('backends', help="list the registered property backends")
+    p.set_defaults(func=cmd_backends)
+
+    p = sub.add_parser('validate', help="cross-validate a backend against a reference backend")
+    p.add_argument('backend_name')
+    p.add_argument('--reference', default='pyromat')
+    p.add_argument('--tol', type=float, default=1e-3, help="max relative deviation allowed")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser('regress', help="compare candidates against the Design*Data golden archives")
+    p.add_argument('--candidates', nargs='+', choices=['vectorized', 'pyromat', 'tabulated', 'if97'],
+                   default=['vectorized', 'pyromat', 'tabulated', 'if97'])
+    p.add_argument('--design', type=int, nargs='+', choices=[1, 2, 3], default=[1, 2, 3])
+    p.add_argument('--gate', nargs='+', metavar='CANDIDATE=TOL', help="override a candidate's tolerance gate")
+    p.add_argument('--stride', type=int, default=10, help="archived points per point solved by 'pyromat'")
+    p.add_argument('--rows', type=int, default=5, help="worst columns printed per design")
+    p.add_argument('--all', action='store_true', help="print every column")
+    p.add_argument('--json', help="also write the full report to this file")
+    p.set_defaults(func=cmd_regress)
+
+    p = sub.add_parser('sweep', help="solve a design over a (p1, Th) grid")
+    p.add_argument('--design', type=int, choices=[1, 2, 3], required=True)
+    p.add_argument('--p1', type=float, nargs='+', required=True, help="boiler pressures (bar)")
+    p.add_argument('--th-start', type=int, default=673)
+    p.add_argument('--th-stop', type=int, default=873)
+    p.add_argument('--th-step', type=int, default=10)
+    p.add_argument('--cogeneration', action='store_true', help="couple the district heat export into the solve")
+    p.add_argument('--ua', type=float, help="rate an existing district heater of this UA (kW/K) instead of sizing it")
+    p.add_argument('--constrained', action='store_true',
+                   help="skip points outside the operating envelope (exhaust quality, metal temperature, pressures)")
+    p.add_argument('--x-min', type=float, default=0.88, help="lowest turbine outlet steam quality allowed")
+    p.add_argument('--keep-infeasible', action='store_true', help="write infeasible points as NaN rows")
+    p.add_argument('--bleeds', choices=['equal', 'temperature', 'enthalpy', 'optimal'],
+                   help="feedwater heater bleed pressure schedule (default: equal intervals)")
+    p.add_argument('--out', required=True)
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser('bleeds', help="compare feedwater heater bleed pressure schedules over a (p1, Th) grid")
+    p.add_argument('--design', type=int, nargs='+', choices=[1, 2, 3], default=[1, 2, 3])
+    p.add_argument('--p1', type=float, nargs='+', default=[10, 50, 100], help="boiler pressures (bar)")
+    p.add_argument('--th-start', type=int, default=673)
+    p.add_argument('--th-stop', type=int, default=873)
+    p.add_argument('--th-step', type=int, default=50)
+    p.add_argument('--schedules', nargs='+', choices=['equal', 'temperature', 'enthalpy', 'optimal'],
+                   default=['equal', 'temperature', 'enthalpy', 'optimal'], help="the first is the baseline")
+    p.add_argument('--out', help="write the last schedule's table to this csv")
+    p.add_argument('--search-backend', help="backend of the optimal search (default: --backend); tabulated is fastest")
+    p.set_defaults(func=cmd_bleeds)
+
+    p = sub.add_parser('reheat', help="Pareto fronts of reheat pressures and temperatures for the reheat designs")
+    p.add_argument('--design', type=int, nargs='+', choices=[2, 3], default=[2, 3])
+    p.add_argument('--p1', type=float, nargs='+', default=[10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+    p.add_argument('--th', type=float, nargs='+', default=[873.0], help="boiler outlet temperatures (K)")
+    p.add_argument('--x-min', type=float, default=0.88, help="lowest turbine outlet steam quality allowed")
+    p.add_argument('--samples', type=int, default=1024, help="candidates per point in every round")
+    p.add_argument('--rounds', type=int, default=6, help="rounds of sampling around the fronts")
+    p.add_argument('--search-backend', help="backend of the front search (default: --backend); tabulated is fastest")
+    p.add_argument('--name', help="result store name for the fronts")
+    p.add_argument('--plot', help="save a plot of the fronts at the last Th to this file")
+    p.set_defaults(func=cmd_reheat)
+
+    p = sub.add_parser('refine', help="adaptive (p1, Th) sweep refined where the metrics need it")
+    p.add_argument('--design', type=int, nargs='+', choices=[1, 2, 3], required=True)
+    p.add_argument('--name', required=True, help="result store name (design number appended for several designs)")
+    p.add_argument('--tol', nargs='+', metavar='METRIC=TOL', help="absolute midpoint interpolation tolerance")
+    p.add_argument('--max-rounds', type=int, default=8, help="bisection rounds per axis")
+    p.add_argument('--cogeneration', action='store_true')
+    p.add_argument('--constrained', action='store_true', help="prune infeasible points and refine the envelope edge")
+    p.set_defaults(func=cmd_refine)
+
+    p = sub.add_parser('job', help="distributed sweep over a shared work queue in the result store")
+    p.add_argument('action', choices=['create', 'work', 'status', 'merge'])
+    p.add_argument('--name', required=True, help="job name in the result store")
+    p.add_argument('--design', type=int, nargs='+', choices=[1, 2, 3], default=[1, 2, 3])
+    p.add_argument('--p1', type=float, nargs='+', default=[10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+    p.add_argument('--th-start', type=int, default=673)
+    p.add_argument('--th-stop', type=int, default=873)
+    p.add_argument('--th-step', type=int, default=10)
+    p.add_argument('--turbEff', type=float, nargs='+')
+    p.add_argument('--pumpEff', type=float, nargs='+')
+    p.add_argument('--tc', type=float, nargs='+', help="condenser temperatures (K)")
+    p.add_argument('--constrained', action='store_true', help="skip points outside the operating envelope")
+    p.add_argument('--unit-points', type=int, default=5000, help="points per work unit")
+    p.add_argument('--chunk-points', type=int, default=1000, help="points per batch between lease renewals")
+    p.add_argument('--lease', type=float, default=300.0, help="(s) time before an unfinished unit is re-queued")
+    p.add_argument('--workers', type=int, default=1, help="local worker processes for 'work'")
+    p.add_argument('--rows', type=int, default=10, help="errors printed by 'status'")
+    p.set_defaults(func=cmd_job)
+
+    p = sub.add_parser('emissions', help="fuel and CO2 accounting of an operating schedule")
+    p.add_argument('--schedule', required=True,
+                   help="CSV with hour, power (kW) and either efficiency or design, p1, Th (optional duration)")
+    p.add_argument('--name', required=True, help="result store name for the step and period tables")
+    p.add_argument('--fuel', default='natural_gas')
+    p.add_argument('--periods', nargs='+', default=['day', 'month', 'year'])
+    p.add_argument('--start', default='2026-01-01T00', help="timestamp of hour 0")
+    p.add_argument('--cogeneration', action='store_true', help="use electrical efficiency with the heat export")
+    p.add_argument('--rows', type=int, default=12, help="rows printed per period")
+    p.set_defaults(func=cmd_emissions)
+
+    p = sub.add_parser('surface', help="solve and cache the (p1, Th) performance surface of a design")
+    p.add_argument('--design', type=int, nargs='+', choices=[1, 2, 3], default=[1, 2, 3])
+    p.add_argument('--cogeneration', action='store_true')
+    p.add_argument('--constrained', action='store_true', help="leave points outside the operating envelope empty")
+    p.set_defaults(func=cmd_surface)
+
+    p = sub.add_parser('dispatch', help="economic dispatch of the three designs from cached surfaces")
+    p.add_argument('--demand', required=True,
+                   help="CSV with demand (kW) and fuel_price ($/MMBtu), or one price_<fuel> column per fuel")
+    p.add_argument('--name', required=True, help="result store name")
+    p.add_argument('--co2-price', type=float, default=0.0, help="$ per tonne CO2")
+    p.add_argument('--units', help="JSON list of units (name, design, fuel, capacity, min_load)")
+    p.add_argument('--cogeneration', action='store_true')
+    p.set_defaults(func=cmd_dispatch)
+
+    p = sub.add_parser('surrogate', help="build surrogate models of the solver with held-out error bounds")
+    p.add_argument('--design', type=int, nargs='+', choices=[1, 2, 3], default=[1, 2, 3])
+    p.add_argument('--kind', choices=['poly', 'rbf', 'spline'], default='poly')
+    p.add_argument('--degree', type=int, default=5, help="total degree of the polynomial surrogate")
+    p.add_argument('--rounds', type=int, default=10, help="adaptive refinement rounds")
+    p.add_argument('--tol', type=float, help="stop refining once committee disagreement is below this")
+    p.set_defaults(func=cmd_surrogate)
+
+    p = sub.add_parser('serve', help="serve the solver over HTTP/JSON with request micro-batching")
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8765)
+    p.add_argument('--workers', type=int, help="solver processes (default: up to 4)")
+    p.add_argument('--max-batch', type=int, default=4096, help="points per vectorized solve")
+    p.add_argument('--max-wait', type=float, default=5.0, help="(ms) time a batch waits for more requests")
+    p.add_argument('--persist', help="result store name to load the cache from and save it to on exit")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser('loadtest', help="load test a running solver service")
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8765)
+    p.add_argument('--requests', type=int, default=1000)
+    p.add_argument('--concurrency', type=int, default=32)
+    p.add_argument('--points', type=int, default=1, help="points per request")
+    p.add_argument('--design', type=int, nargs='+', choices=[1, 2, 3], default=[1, 2, 3])
+    p.add_argument('--grid-points', type=int, default=50, help="(p1, Th) grid size per axis, 0 for random points")
+    p.set_defaults(func=cmd_loadtest)
+
+    p = sub.add_parser('results', help="list the tables in the result store")
+    p.set_defaults(func=cmd_results)
+
+    p = sub.add_parser('diff', help="compare two sweeps in the result store row by row")
+    p.add_argument('a', help="result store name of the reference sweep")
+    p.add_argument('b', help="result store name of the sweep compared against it")
+    p.add_argument('--columns', nargs='+', help="columns to compare (default: every shared numeric column)")
+    p.add_argument('--keys', nargs='+', help="join columns (default: design p1 Th turbEff pumpEff tc, where present)")
+    p.add_argument('--tol', type=float, default=1e-6, help="relative change above which a row disagrees")
+    p.add_argument('--chunk-rows', type=int, default=1_000_000, help="rows of A compared per chunk")
+    p.add_argument('--partitions', type=int, help="hash partitions of B's key index (default: 20M keys each)")
+    p.add_argument('--top', type=int, default=5, help="largest changes kept per column")
+    p.add_argument('--top-columns', type=int, default=3, help="columns whose largest changes are printed")
+    p.add_argument('--bins', type=int, default=20, help="p1 and Th cells of the disagreement map")
+    p.add_argument('--regions', type=int, default=10, help="regions of disagreement printed")
+    p.add_argument('--rows', type=int, default=10, help="columns printed")
+    p.add_argument('--all', action='store_true', help="print every column")
+    p.add_argument('--json', help="also write the full report to this file")
+    p.add_argument('--plot', help="save the disagreement map to this file")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser('show', help="print archived results")
+    p.add_argument('--design', type=int, choices=[1, 2, 3], required=True)
+    p.add_argument('--p1', type=int, help="boiler pressure (bar); all archived pressures if omitted")
+    p.add_argument('--columns', nargs='+')
+    p.set_defaults(func=cmd_show)
+
+    p = sub.add_parser('plot', help="plot an archived metric against boiler temperature")
+    p.add_argument('--design', type=int, choices=[1, 2, 3], required=True)
+    p.add_argument('--metric', default='thermal_eff')
+    p.add_argument('--out', help="save to this file instead of opening a window")
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser('startup', help="measure start up time of the cached-results commands")
+    p.add_argument('--budget', type=float, default=STARTUP_BUDGET)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=cmd_startup)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.backend:
+        import properties
+        properties.set_backend(args.backend)
+    return args.func(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Turbine Exhaust Quality and Operating Envelope Constraints
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+import cycle
+import properties
+
+
+######### LIMITS ###########
+LIMITS = {
+    'x_min': 0.88,  # lowest steam quality allowed at any turbine outlet (12 % exhaust moisture)
+    'T_metal_max': 898.15,  # (Kelvin) superheater/reheater tube metal limit
+    'metal_margin': 25.0,  # (Kelvin) tube metal runs this much hotter than the steam it heats
+    'superheat_min': 10.0,  # (Kelvin) boiler outlet superheat above saturation at p1
+    'p1_max': 200.0,  # (bar) subcritical drum boiler, well below the 220.64 bar critical pressure
+    'stage_ratio_max': 1000.0,  # inlet/outlet pressure ratio of any one turbine section
+}
+
+CONSTRAINT_COLUMNS = ['feasible', 'x_exhaust', 'x_turbine_min', 'T_metal', 'superheat', 'stage_ratio_max']
+
+
+# LIMITS with the caller's overrides
+def merged_limits(limits):
+    return {**LIMITS, **(limits or {})}
+
+
+def _take(values, keep):
+    return {k: v[keep] for k, v in values.items()}
+
+
+######### ENVELOPE (BEFORE ANY TURBINE STATE IS SOLVED) ###########
+# Boiler-side limits that only need the inputs and one saturation call
+def envelope(steam, x, limits=None):
+    limits = merged_limits(limits)
+    T_metal = x['Th'] + limits['metal_margin']
+    superheat = x['Th'] - steam.Ts(p=np.minimum(x['p1'], limits['p1_max']))
+    ok = (T_metal <= limits['T_metal_max']) & (superheat >= limits['superheat_min']) & (x['p1'] <= limits['p1_max'])
+    return ok, {'T_metal': T_metal, 'superheat': superheat}
+
+
+######### TURBINE TRAIN ###########
+# Quality at every turbine outlet and the largest section pressure ratio of an expanded CycleState;
+# superheated outlets have quality above 1
+def turbine_states(steam, state, limits=None):
+    limits = merged_limits(limits)
+    outlets = [j for _, j in cycle.EXPANSIONS[state.design]]
+    p = state.levels[:, 1:].T.ravel()
+    hf, hg = steam.h(p=p, x=0), steam.h(p=p, x=1)
+    quality = (state.data[:, [j - 1 for j in outlets], 1].T.ravel() - hf) / (hg - hf)
+    quality = quality.reshape(len(outlets), -1)
+    ratio = np.max(state.levels[:, :-1] / state.levels[:, 1:], axis=1)
+    with np.errstate(invalid='ignore'):
+        ok = (quality.min(axis=0) >= limits['x_min']) & (ratio <= limits['stage_ratio_max'])
+    return ok & np.isfinite(state.P[5]), {'x_exhaust': quality[-1], 'x_turbine_min': quality.min(axis=0),
+                                          'stage_ratio_max': ratio}
+
+
+# Constraint columns of a table that has already been solved (archives, stored sweeps)
+def evaluate(design, table, limits=None, backend=None):
+    steam = properties.get_backend(backend) if backend else properties.steam
+    x = {name: np.asarray(table[name], dtype=float) for name in ('p1', 'Th')}
+    ok, values = envelope(steam, x, limits)
+    turbine_ok, turbine_values = turbine_states(steam, cycle.state_from_table(design, table), limits)
+    return {'feasible': (ok & turbine_ok).astype(float), **turbine_values, **values}
+
+
+######### CONSTRAINED SOLVE ###########
+# Prune in two stages so infeasible points cost as little as possible: boiler-side limits first, then the
+# turbine train is expanded and its outlet qualities checked before the feedwater train and performance are
+# solved for the points that are left. Infeasible rows keep their inputs and constraint values, with NaN
+# everywhere else, in the order the points were given.
+def solve_feasible(design, p1, Th, turbEff=None, pumpEff=None, tc=None, Wnet=None, Qout=None, limits=None,
+                   cogeneration=False, backend=None, bleeds=None, **cogeneration_options):
+    steam = properties.get_backend(backend) if backend else properties.steam
+    x = cycle._inputs(
+        p1=p1, Th=Th,
+        turbEff=cycle.DEFAULTS['turbEff'] if turbEff is None else turbEff,
+        pumpEff=cycle.DEFAULTS['pumpEff'] if pumpEff is None else pumpEff,
+        tc=cycle.DEFAULTS['tc'] if tc is None else tc,
+    )
+    n = len(x['p1'])
+    names = cycle.columns(design) + (cycle.COGENERATION_COLUMNS if cogeneration else [])
+    table = {name: np.full(n, np.nan) for name in names + CONSTRAINT_COLUMNS}
+    for name in x:
+        table[name] = x[name].copy()
+
+    ##### Boiler-side envelope
+    stage1, values = envelope(steam, x, limits)
+    for name, value in values.items():
+        table[name] = value
+    index = np.flatnonzero(stage1)
+
+    ##### Turbine train of the points inside the envelope
+    if len(index):
+        if bleeds is not None and not isinstance(bleeds, str):
+            bleeds = {k: np.broadcast_to(np.asarray(bleeds[k], dtype=float), (n,))[index] for k in ('p2', 'p3', 'p4')}
+        state = cycle._expand(steam, design, _take(x, index), bleeds)
+        stage2, values = turbine_states(steam, state, limits)
+        for name, value in values.items():
+            table[name][index] = value
+        keep, index = stage2, index[stage2]
+
+        ##### Feedwater train and performance of the feasible points only
+        if len(index):
+            solved = cycle.table(cycle._complete(steam, state.take(keep), Wnet, Qout))
+            if cogeneration:
+                solved = cycle.cogenerate(steam, design, solved, Wnet=Wnet, Qout=Qout, **cogeneration_options)
+            for name in names:
+                table[name][index] = solved[name]
+    table['feasible'] = np.zeros(n)
+    table['feasible'][index] = 1.0
+    return table
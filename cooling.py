@@ -0,0 +1,73 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Cooling Water / District Heat Loop (Effectiveness-NTU)
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+
+######### CONSTANTS FOR THE DISTRICT HEAT LOOP ###########
+T_RETURN = 80 + 273.15  # (Kelvin) District water returning to the heater
+T_SUPPLY = 125 + 273.15  # (Kelvin) District water leaving the heater
+MIN_APPROACH = 5.0  # (Kelvin) Smallest allowed gap between condensing steam and the supply temperature
+
+
+######### DISTRICT WATER STATES ###########
+# Saturated liquid at the return and supply temperatures, and the water flow that carries Qout between them
+def district_water(steam, Qout, T_return=T_RETURN, T_supply=T_SUPPLY):
+    h_return = steam.h(T=T_return, x=0)
+    h_supply = steam.h(T=T_supply, x=0)
+    return h_return, h_supply, Qout / (h_supply - h_return)
+
+
+######### EFFECTIVENESS-NTU RELATIONS ###########
+# Counterflow exchanger; Cr = Cmin/Cmax, Cr = 0 for a condensing hot side
+def effectiveness(NTU, Cr=0.0):
+    NTU, Cr = np.broadcast_arrays(np.asarray(NTU, dtype=float), np.asarray(Cr, dtype=float))
+    balanced = np.isclose(Cr, 1.0)
+    Cr_safe = np.where(balanced, 0.0, Cr)
+    e = np.exp(-NTU * (1 - Cr_safe))
+    return np.where(balanced, NTU / (1 + NTU), (1 - e) / (1 - Cr_safe * e))
+
+
+def ntu(eps, Cr=0.0):
+    eps, Cr = np.broadcast_arrays(np.asarray(eps, dtype=float), np.asarray(Cr, dtype=float))
+    balanced = np.isclose(Cr, 1.0)
+    Cr_safe = np.where(balanced, 0.0, Cr)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(balanced, eps / (1 - eps), np.log((1 - Cr_safe * eps) / (1 - eps)) / (1 - Cr_safe))
+
+
+######### DISTRICT HEATER ###########
+# Sizing: UA needed for steam condensing at T_hot to heat m_dot_cw from T_return to T_supply
+# Points where the steam is not at least MIN_APPROACH hotter than the supply come back as NaN
+def size_heater(T_hot, m_dot_cw, cp_cw, T_return=T_RETURN, T_supply=T_SUPPLY, approach=MIN_APPROACH):
+    C = m_dot_cw * cp_cw
+    feasible = T_hot >= T_supply + approach
+    eps = np.where(feasible, (T_supply - T_return) / np.where(feasible, T_hot - T_return, 1.0), np.nan)
+    NTU = ntu(eps)
+    return eps, NTU, NTU * C
+
+
+# Rating: heat delivered and supply temperature of an existing heater of size UA
+def rate_heater(T_hot, UA, m_dot_cw, cp_cw, T_return=T_RETURN):
+    C = m_dot_cw * cp_cw
+    eps = effectiveness(UA / C)
+    Q = eps * C * np.maximum(T_hot - T_return, 0.0)
+    return Q, T_return + Q / C, eps
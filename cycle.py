@@ -0,0 +1,412 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Vectorized Rankine Cycle Solver for the Three Designs
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+import cooling
+import properties
+from state import CycleState
+
+
+######### CONSTANTS FOR THE THERMO CYCLE ###########
+# Same defaults as the design scripts
+DEFAULTS = {
+    'turbEff': 0.87,  # must be decimal | 0 <= turbEff <= 1 |
+    'pumpEff': 0.8,  # must be decimal | 0<= pumpEff <= 1 |
+    'tc': 30 + 273.15,  # (Kelvin) The cold temperature/temperature of the condenser
+    'Wnet': 80000,  # 80000 kWe required electricity generated
+    'Qout': 25000,  # 25000 kWth required heat generated
+}
+
+TH_RANGE = range(673, 874, 10)  # (Kelvin) Boiler temperatures swept by the design scripts
+
+DESIGN_NAMES = {1: 'noreheat', 2: 'onereheat', 3: 'threereheat'}
+
+# Bumped whenever solved values change, so results persisted by an older solver (cache, surfaces) are not reused
+REVISION = 2
+
+# Feedwater states are numbered after the turbine states, so they shift by the number of extra reheat states
+STATE_OFFSET = {1: 0, 2: 1, 3: 3}
+
+# Turbine inlet/outlet state pairs, reheater inlet/outlet pairs and the bleed states at p2, p3, p4
+EXPANSIONS = {
+    1: ((1, 2), (2, 3), (3, 4), (4, 5)),
+    2: ((1, 2), (3, 4), (4, 5), (5, 6)),
+    3: ((1, 2), (3, 4), (5, 6), (7, 8)),
+}
+REHEATS = {
+    1: (),
+    2: ((2, 3),),
+    3: ((2, 3), (4, 5), (6, 7)),
+}
+BLEEDS = {
+    1: (2, 3, 4),
+    2: (2, 4, 5),
+    3: (2, 4, 6),
+}
+
+
+# Pressure level (1 boiler, 2-4 bleeds, 5 condenser) of every steam and feedwater state, as the scripts set them
+def state_levels(design):
+    o = STATE_OFFSET[design]
+    levels = {1: 1}
+    for (i, j), level in zip(EXPANSIONS[design], (2, 3, 4, 5)):
+        levels[j] = level
+    for i, j in REHEATS[design]:
+        levels[j] = levels[i]
+    feedwater = {6: 5, 7: 4, 8: 4, 9: 3, 10: 3, 11: 1, 12: 1, 13: 2, 14: 3, 15: 4, 16: 5}
+    levels.update({n + o: level for n, level in feedwater.items()})
+    return levels
+
+
+def n_states(design):
+    return 18 + STATE_OFFSET[design]
+
+
+# Column order of the <design>data_<p1>.csv files, followed by the pressures and inputs of each point
+def columns(design):
+    return (['Th', 'p1', 'm_dot', 'm_dot_cw', 'W_net', 'Q_in', 'Q_out_unitmass', 'Q_out_steam', 'thermal_eff', 'BWR']
+            + [f'h{i}' for i in range(1, n_states(design) + 1)]
+            + ['y1', 'y2', 'y3', 'p2', 'p3', 'p4', 'p5', 'turbEff', 'pumpEff', 'tc'])
+
+
+######### STATE FUNCTIONS ###########
+# Vectorized versions of the helpers in the design scripts; every argument may be an array of points
+
+# Calculate the intermediate pressures
+def set_pressure_intervals(p1, p5):
+    i = (p1 - p5) / 4
+    p4 = p5 + i
+    p3 = p4 + i
+    p2 = p3 + i
+    return p4, p3, p2
+
+
+# Bleed pressures p4, p3, p2: equal intervals as in the scripts (None), a named schedule of extraction.py,
+# or given pressures {'p2': ..., 'p3': ..., 'p4': ...}
+def bleed_pressures(steam, design, x, p1, p5, bleeds=None):
+    if bleeds is None:
+        return set_pressure_intervals(p1, p5)
+    if isinstance(bleeds, str):
+        import extraction
+        return extraction.schedule(bleeds, steam, design, x, p1, p5)
+    return tuple(np.asarray(bleeds[k], dtype=float) for k in ('p4', 'p3', 'p2'))
+
+
+# Fix superheated state
+def superheat(steam, pi, ti):
+    return steam.h(T=ti, p=pi), steam.s(T=ti, p=pi)
+
+
+def turbine(steam, hi, si, pi, turbEff):
+    hn = steam.h(s=si, p=pi)  # isentropic outlet
+    hj = hi - turbEff * (hi - hn)
+    return hj, steam.s(h=hj, p=pi)
+
+
+def saturated_liquid(steam, type, i):
+    if type == "T":
+        hn, sn, dn = steam.h(T=i, x=0), steam.s(T=i, x=0), steam.d(T=i, x=0)
+    elif type == "P":
+        hn, sn, dn = steam.h(p=i, x=0), steam.s(p=i, x=0), steam.d(p=i, x=0)
+    else:
+        raise ValueError(f"Invalid type '{type}', expected 'T' or 'P'")
+    return hn, sn, dn, 1 / dn
+
+
+def pump(vi, hi, po, pi, pumpEff):
+    return hi + vi * (po - pi) / pumpEff
+
+
+######### TURBINE TRAINS ###########
+# State numbering and entropy hand-offs follow design1noreheat.py, design2onereheat.py and design3threereheats.py;
+# h, s and P are StateViews of a CycleState, so every assignment lands in its array block
+def _expansion_noreheat(steam, h, s, P, Th, turbEff):
+    h[2], s[2] = turbine(steam, h[1], s[1], P[2], turbEff)
+    h[3], s[3] = turbine(steam, h[2], s[2], P[3], turbEff)
+    h[4], s[4] = turbine(steam, h[3], s[3], P[4], turbEff)
+    h[5], s[5] = turbine(steam, h[4], s[3], P[5], turbEff)
+
+
+def _expansion_onereheat(steam, h, s, P, Th, turbEff):
+    h[2], s[2] = turbine(steam, h[1], s[1], P[2], turbEff)
+    h[3], s[3] = superheat(steam, P[2], Th)
+    h[4], s[4] = turbine(steam, h[3], s[3], P[3], turbEff)
+    h[5], s[5] = turbine(steam, h[4], s[4], P[4], turbEff)
+    h[6], s[6] = turbine(steam, h[5], s[5], P[5], turbEff)
+
+
+def _expansion_threereheat(steam, h, s, P, Th, turbEff):
+    h[2], s[2] = turbine(steam, h[1], s[1], P[2], turbEff)
+    h[3], s[3] = superheat(steam, P[2], Th)
+    h[4], s[4] = turbine(steam, h[3], s[3], P[3], turbEff)
+    h[5], s[5] = superheat(steam, P[3], Th)
+    h[6], s[6] = turbine(steam, h[5], s[5], P[4], turbEff)
+    h[7], s[7] = superheat(steam, P[4], Th)
+    h[8], s[8] = turbine(steam, h[7], s[1], P[5], turbEff)
+
+
+EXPANSION_TRAINS = {1: _expansion_noreheat, 2: _expansion_onereheat, 3: _expansion_threereheat}
+
+
+######### FEEDWATER TRAIN ###########
+# Condenser outlet, pumps, feedwater heater outlets and traps; o is the design's STATE_OFFSET
+def _feedwater(steam, state, o, tc, pumpEff):
+    h, s, v, P = state.h, state.s, state.v, state.P
+    h[6 + o], s[6 + o], d, v[6 + o] = saturated_liquid(steam, "T", tc)
+    h[8 + o], s[8 + o], d, v[8 + o] = saturated_liquid(steam, "P", P[4])
+    h[10 + o], s[10 + o], d, v[10 + o] = saturated_liquid(steam, "P", P[3])
+    h[12 + o], s[12 + o], d, v[12 + o] = saturated_liquid(steam, "P", P[1])
+
+    h[7 + o] = pump(v[6 + o], h[6 + o], P[4] * 100, P[5] * 100, pumpEff)
+    h[9 + o] = pump(v[8 + o], h[8 + o], P[3] * 100, P[4] * 100, pumpEff)
+    h[11 + o] = pump(v[10 + o], h[10 + o], P[1] * 100, P[3] * 100, pumpEff)
+    for n in (7, 9, 11):  # the scripts' isentropic, incompressible pumps keep s and v of their inlet
+        s[n + o], v[n + o] = s[n - 1 + o], v[n - 1 + o]
+
+    h[13 + o], s[13 + o], d, v[13 + o] = saturated_liquid(steam, "P", P[2])  # Second CFW outlet
+    h[14 + o] = h[13 + o]  # OFW inlet after trap
+    h[15 + o], s[15 + o], d, v[15 + o] = saturated_liquid(steam, "P", P[4])  # First CFW outlet
+    h[16 + o] = h[15 + o]  # Condenser inlet after trap
+
+
+def _mass_fractions(h, o, bleeds):
+    b1, b2, b3 = bleeds
+    y1 = np.abs((h[11 + o] - h[12 + o]) / (h[b1] - h[13 + o]))
+    y2 = np.abs((h[10 + o] - h[9 + o] - y1 * (h[14 + o] - h[9 + o])) / (h[b2] - h[9 + o]))
+    y3 = np.abs(((1 - y1 - y2) * (h[7 + o] - h[8 + o])) / (h[b3] - h[15 + o]))
+    return y1, y2, y3
+
+
+######### PERFORMANCE METRICS ###########
+# Flow through a turbine section or reheater starting at state i: what is left after the bleeds at or before i
+def _flows(design, y1, y2, y3):
+    taken = tuple(zip(BLEEDS[design], (y1, y2, y3)))
+    return lambda i: 1 - sum(y for bleed, y in taken if bleed <= i)
+
+
+# Each design's work, heat and efficiency on its own state numbers. The design scripts evaluate these with
+# design 1's numbers for every design (legacy=True), which puts design 2 and 3's bleed and reheat states in
+# the turbine work and can take their efficiency past Carnot.
+def _performance(h, design, y1, y2, y3, Wnet, legacy=False):
+    numbering = 1 if legacy else design
+    o = STATE_OFFSET[numbering]
+    flow = _flows(numbering, y1, y2, y3)
+    exhaust = EXPANSIONS[numbering][-1][1]
+    W_out = sum(flow(i) * (h[i] - h[j]) for i, j in EXPANSIONS[numbering])
+    W_in = (1 - y1 - y2) * (h[7 + o] - h[6 + o]) + (1 - y1 - y2) * (h[9 + o] - h[8 + o]) + (h[11 + o] - h[10 + o])
+
+    W_net = W_out - W_in
+    Q_in = h[1] - h[12 + o] + sum(flow(i) * (h[j] - h[i]) for i, j in REHEATS[numbering])
+    m_dot = Wnet / W_net
+    Q_out_unitmass = (1 - y1 - y2 - y3) * h[exhaust] + y3 * h[16 + o] - (1 - y1 - y2) * h[6 + o]
+    return {
+        'm_dot': m_dot,
+        'W_net': W_net,
+        'Q_in': Q_in,
+        'Q_out_unitmass': Q_out_unitmass,
+        'Q_out_steam': m_dot * Q_out_unitmass,
+        'thermal_eff': W_net / Q_in,
+        'BWR': W_in / W_out,
+    }
+
+
+######### MAIN SOLVER ###########
+def _inputs(**values):
+    names = list(values)
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(values[n], dtype=float)) for n in names])
+    return {n: a.ravel() for n, a in zip(names, arrays)}
+
+
+# Solve one design for every (p1, Th, turbEff, pumpEff, tc) point in a single pass of array property calls
+# legacy=True reproduces the design scripts (their turbine trains and design 1's state numbers for every design),
+# which is what the archived design*data files hold; see regression.py
+def solve(design, p1, Th, turbEff=None, pumpEff=None, tc=None, Wnet=None, Qout=None, backend=None, bleeds=None,
+          legacy=False):
+    return table(solve_state(design, p1, Th, turbEff, pumpEff, tc, Wnet, Qout, backend, bleeds, legacy))
+
+
+# Same solve, returning the CycleState (every state's p, h, s, v plus the metrics) instead of the flat table
+def solve_state(design, p1, Th, turbEff=None, pumpEff=None, tc=None, Wnet=None, Qout=None, backend=None,
+                bleeds=None, legacy=False):
+    if design not in DESIGN_NAMES:
+        raise ValueError(f"Unknown design {design}, expected one of {sorted(DESIGN_NAMES)}")
+    steam = properties.get_backend(backend) if backend else properties.steam
+    given = {} if bleeds is None or isinstance(bleeds, str) else {k: bleeds[k] for k in ('p2', 'p3', 'p4')}
+    x = _inputs(
+        p1=p1, Th=Th,
+        turbEff=DEFAULTS['turbEff'] if turbEff is None else turbEff,
+        pumpEff=DEFAULTS['pumpEff'] if pumpEff is None else pumpEff,
+        tc=DEFAULTS['tc'] if tc is None else tc,
+        **given,
+    )
+    if given:
+        bleeds = {k: x.pop(k) for k in given}
+    return _complete(steam, _expand(steam, design, x, bleeds, legacy), Wnet, Qout, legacy)
+
+
+# Boiler outlet, bleed pressures and the turbine train; the part of a solve that fixes the
+# turbine states, so constraints on them can be checked before the feedwater train is solved
+def _expand(steam, design, x, bleeds=None, legacy=False):
+    if not legacy:
+        return expand_train(steam, design, x, bleeds)
+    state = CycleState(design, n_states(design), x)
+    h, s, P = state.h, state.s, state.P
+    P[1] = x['p1']
+    h[1], s[1] = superheat(steam, x['p1'], x['Th'])
+    P[5] = steam.p(T=x['tc'], s=s[1])
+    P[4], P[3], P[2] = bleed_pressures(steam, design, x, P[1], P[5], bleeds)
+    EXPANSION_TRAINS[design](steam, h, s, P, x['Th'], x['turbEff'])
+    return state
+
+
+# Turbine train without the scripts' entropy hand-offs (design 1's last section starts from s3, design 3's from
+# s1): every section expands from its own inlet state, and each reheater may have its own outlet temperature
+# (Th by default). Every solve uses this one, since the hand-offs inflate the last section's work; only
+# solve(..., legacy=True) keeps the scripts' trains.
+def expand_train(steam, design, x, bleeds=None, reheat_T=None):
+    state = CycleState(design, n_states(design), x)
+    h, s, P = state.h, state.s, state.P
+    P[1] = x['p1']
+    h[1], s[1] = superheat(steam, x['p1'], x['Th'])
+    P[5] = steam.p(T=x['tc'], s=s[1])
+    P[4], P[3], P[2] = bleed_pressures(steam, design, x, P[1], P[5], bleeds)
+    level = state_levels(design)
+    reheat_T = [x['Th']] * len(REHEATS[design]) if reheat_T is None else reheat_T
+    outlets = {i: (j, T) for (i, j), T in zip(REHEATS[design], reheat_T)}
+    for i, j in EXPANSIONS[design]:
+        h[j], s[j] = turbine(steam, h[i], s[i], P[level[j]], x['turbEff'])
+        if j in outlets:
+            k, T = outlets[j]
+            h[k], s[k] = superheat(steam, P[level[j]], T)
+    return state
+
+
+# Feedwater train, cooling water, mass fractions and performance of points already expanded
+def _complete(steam, state, Wnet=None, Qout=None, legacy=False):
+    Wnet = DEFAULTS['Wnet'] if Wnet is None else Wnet
+    Qout = DEFAULTS['Qout'] if Qout is None else Qout
+    design, x, h = state.design, state.inputs, state.h
+    o = STATE_OFFSET[design]
+
+    _feedwater(steam, state, o, x['tc'], x['pumpEff'])
+    h[17 + o], h[18 + o], m_dot_cw = cooling.district_water(steam, Qout)
+    levels = state_levels(design)
+    state.data[:, [n - 1 for n in levels], 0] = state.levels[:, [level - 1 for level in levels.values()]]
+
+    y1, y2, y3 = _mass_fractions(h, o, BLEEDS[design])
+    performance = _performance(h, design, y1, y2, y3, Wnet, legacy)
+    metrics = {'m_dot_cw': m_dot_cw, **performance, 'y1': y1, 'y2': y2, 'y3': y3}
+    n = len(state)
+    state.metrics = {k: np.broadcast_to(np.asarray(v, dtype=float), (n,)).copy() for k, v in metrics.items()}
+    return state
+
+
+# Flat table in columns(design) order, one row per point
+def table(state):
+    result = {**state.inputs, **state.metrics}
+    result.update({f'h{i}': state.h[i] for i in range(1, state.n_states + 1)})
+    result.update({f'p{k}': state.P[k] for k in range(2, 6)})
+    return {c: np.array(result[c], dtype=float) for c in columns(state.design)}
+
+
+# Rebuild the enthalpies, pressure levels, inputs and metrics of a solved table (archives, stored sweeps)
+def state_from_table(design, values):
+    x = {name: np.asarray(values[name], dtype=float) for name in ('p1', 'Th', 'turbEff', 'pumpEff', 'tc')
+         if name in values}
+    state = CycleState(design, n_states(design), x)
+    for i in range(1, n_states(design) + 1):
+        state.h[i] = values[f'h{i}']
+    for k in range(1, 6):
+        state.P[k] = values[f'p{k}']
+    state.metrics = {name: np.asarray(values[name], dtype=float) for name in columns(design)
+                     if name in values and name not in x and not name.startswith(('h', 'p'))}
+    return state
+
+
+# Solve the same (p1, Th) grid the design scripts sweep, one row per point
+def solve_grid(design, p1_values, Th_values=TH_RANGE, **kwargs):
+    p1, Th = np.meshgrid(np.asarray(p1_values, dtype=float), np.asarray(Th_values, dtype=float), indexing='ij')
+    return solve(design, p1.ravel(), Th.ravel(), **kwargs)
+
+
+######### COGENERATION (DISTRICT HEAT EXPORT) ###########
+COGENERATION_COLUMNS = ['p_dh', 'T_dh', 'm_dot_dh', 'Q_dh', 'T_supply_dh', 'eps_dh', 'NTU_dh', 'UA_dh',
+                        'm_dot_boiler', 'Q_boiler', 'elec_eff', 'chp_eff']
+
+
+# Steam for the district heater is bled at the lowest of p4, p3, p2 that is hot enough for the supply temperature
+# and condenses in the heater; its drain returns to the feedwater as saturated liquid.
+# The cycle flow is then re-solved so that turbine work still meets Wnet with the heater steam taken out.
+# Without UA the heater is sized for Qout; with UA (kW/K) the heat actually delivered at each point is rated.
+def solve_cogeneration(design, p1, Th, UA=None, T_return=cooling.T_RETURN, T_supply=cooling.T_SUPPLY,
+                       approach=cooling.MIN_APPROACH, backend=None, **kwargs):
+    steam = properties.get_backend(backend) if backend else properties.steam
+    result = solve(design, p1, Th, backend=backend, **kwargs)
+    return cogenerate(steam, design, result, UA, T_return, T_supply, approach, kwargs.get('Wnet'), kwargs.get('Qout'))
+
+
+# District heat export added to a table that is already solved (constraints.solve_feasible reuses its own
+# expanded states this way); the table gains COGENERATION_COLUMNS in place and is returned
+def cogenerate(steam, design, result, UA=None, T_return=cooling.T_RETURN, T_supply=cooling.T_SUPPLY,
+               approach=cooling.MIN_APPROACH, Wnet=None, Qout=None):
+    Wnet = DEFAULTS['Wnet'] if Wnet is None else Wnet
+    Qout = DEFAULTS['Qout'] if Qout is None else Qout
+
+    ##### Pick the bleed point
+    candidates = []
+    for bleed, pressure in zip(reversed(BLEEDS[design]), ('p4', 'p3', 'p2')):
+        p = result[pressure]
+        T_sat = steam.Ts(p=p)
+        work = sum(result[f'h{i}'] - result[f'h{j}'] for i, j in EXPANSIONS[design] if j <= bleed)
+        reheat = sum(result[f'h{j}'] - result[f'h{i}'] for i, j in REHEATS[design] if j <= bleed)
+        candidates.append((T_sat >= T_supply + approach, p, T_sat, result[f'h{bleed}'], work, reheat))
+    hot_enough = [c[0] for c in candidates]
+    p_dh, T_dh, h_dh, w_up, q_reheat = [np.select(hot_enough, [c[k] for c in candidates], np.nan) for k in range(1, 6)]
+    h_drain = steam.h(p=np.where(np.isnan(p_dh), result['p1'], p_dh), x=0)
+
+    ##### District heater
+    h_return, h_supply, m_dot_cw = cooling.district_water(steam, Qout, T_return, T_supply)
+    cp_cw = (h_supply - h_return) / (T_supply - T_return)
+    if UA is None:
+        eps, NTU, UA_dh = cooling.size_heater(T_dh, m_dot_cw, cp_cw, T_return, T_supply, approach)
+        Q_dh = np.where(np.isnan(eps), np.nan, Qout)
+        T_out = np.where(np.isnan(eps), np.nan, T_supply)
+    else:
+        Q_dh, T_out, eps = cooling.rate_heater(T_dh, UA, m_dot_cw, cp_cw, T_return)
+        UA_dh = np.full_like(Q_dh, UA)
+        NTU = UA_dh / (m_dot_cw * cp_cw)
+
+    ##### Coupled steam cycle
+    m_dot_dh = Q_dh / (h_dh - h_drain)
+    m_dot_cycle = (Wnet - m_dot_dh * w_up) / result['W_net']
+    Q_boiler = m_dot_cycle * result['Q_in'] + m_dot_dh * (result['h1'] - h_drain + q_reheat)
+
+    n = len(result['p1'])
+    result.update({
+        'p_dh': p_dh, 'T_dh': T_dh, 'm_dot_dh': m_dot_dh, 'Q_dh': Q_dh, 'T_supply_dh': T_out,
+        'eps_dh': eps, 'NTU_dh': NTU, 'UA_dh': UA_dh,
+        'm_dot_boiler': m_dot_cycle + m_dot_dh, 'Q_boiler': Q_boiler,
+        'elec_eff': Wnet / Q_boiler, 'chp_eff': (Wnet + Q_dh) / Q_boiler,
+    })
+    for c in COGENERATION_COLUMNS:
+        result[c] = np.broadcast_to(np.asarray(result[c], dtype=float), (n,)).copy()
+    return result
@@ -0,0 +1,340 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Row-Matched Comparison of Two Stored Sweeps
+
+The rows of sweep A are joined to the rows of sweep B on their key columns (design, p1, Th and the solver
+parameters) through a sorted index of B's keys. A is streamed in store.iter_chunks slices and the matching
+rows of B are read from its memory-mapped columns. B's keys are split into hash partitions of at most
+INDEX_ROWS rows, one indexed per pass over A, so only one partition's keys and one chunk are held in memory.
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import time
+import numpy as np
+
+import store
+
+
+######### SETTINGS ###########
+KEY_COLUMNS = ('design', 'p1', 'Th', 'turbEff', 'pumpEff', 'tc')
+KEY_DECIMALS = 6  # keys are rounded to this many decimals before matching
+TOL = 1e-6  # relative change above which a row counts as disagreeing
+ATOL = 1e-12  # floor of the relative change denominator
+CHUNK_ROWS = 1_000_000
+INDEX_ROWS = 20_000_000  # B keys indexed per pass over A; larger tables are split into hash partitions
+TOP = 5  # largest changes kept per column
+BINS = 20  # cells per axis of the disagreement map
+REGION_AXES = ('p1', 'Th')
+
+
+######### KEYS AND INDEX ###########
+# Key columns shared by both tables; a design stored only in the meta of a table counts as a constant column
+def key_columns(info_a, info_b, keys=None):
+    def available(info):
+        return set(info['columns']) | ({'design'} if 'design' in info['meta'] else set())
+    keys = keys or KEY_COLUMNS
+    return [k for k in keys if k in available(info_a) and k in available(info_b)]
+
+
+def _stored(info, keys):
+    stored = [k for k in keys if k in info['columns']]
+    if not stored:
+        raise ValueError("At least one key column must be stored as a column")
+    return stored
+
+
+def _key_values(chunk, info, keys):
+    n = len(next(iter(chunk.values())))
+    values = {}
+    for k in keys:
+        values[k] = chunk[k] if k in chunk else np.full(n, float(info['meta'][k]))
+    return values
+
+
+# (rows, keys) block of rounded key values
+def _records(values, keys):
+    return np.column_stack([np.round(np.asarray(values[k], dtype=float), KEY_DECIMALS) for k in keys])
+
+
+# 64-bit hash of every key row, so the index sorts and searches plain integers; a match is confirmed on the keys
+def _hash(records):
+    quantized = np.nan_to_num(records * 10.0 ** KEY_DECIMALS, nan=-1.0).astype(np.int64).view(np.uint64)
+    h = np.zeros(len(records), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for column in quantized.T:
+            h = (h ^ column) * np.uint64(0x9E3779B97F4A7C15)
+            h ^= h >> np.uint64(29)
+    return h
+
+
+def _in_partition(hashes, partition, partitions):
+    return hashes % np.uint64(partitions) == np.uint64(partition)
+
+
+def _same(x, y):
+    return np.all((x == y) | (np.isnan(x) & np.isnan(y)), axis=1)
+
+
+# Sorted key hashes of one hash partition of a table (all of it by default) and the row each came from, built one
+# chunk at a time; rows with a repeated key keep the first. Rows are only merged when their keys are equal, not
+# just their hashes: in the rare case of two keys sharing a hash, the run is re-sorted by key so both stay in the
+# index.
+class KeyIndex:
+
+    def __init__(self, name, keys, chunk_rows=CHUNK_ROWS, root=None, partition=0, partitions=1):
+        self.info = store.info(name, root)
+        parts, numbers = [], []
+        for start, chunk in store.iter_chunks(name, chunk_rows, _stored(self.info, keys), root):
+            records = _records(_key_values(chunk, self.info, keys), keys)
+            mine = _in_partition(_hash(records), partition, partitions)
+            parts.append(records[mine])
+            numbers.append(start + np.flatnonzero(mine))
+        records = np.concatenate(parts) if parts else np.empty((0, len(keys)))
+        numbers = np.concatenate(numbers) if numbers else np.zeros(0, dtype=np.int64)
+        del parts
+        hashes = _hash(records)
+        order = np.argsort(hashes, kind='stable')
+        first = np.r_[True, hashes[order][1:] != hashes[order][:-1]] if len(hashes) else np.zeros(0, dtype=bool)
+        repeat = np.flatnonzero(~first)
+        if not np.all(_same(records[order[repeat]], records[order[repeat - 1]])):
+            order = np.lexsort(tuple(records.T[::-1]) + (hashes,))
+            repeat = np.arange(1, len(order))
+            first[1:] = (hashes[order][1:] != hashes[order][:-1]) | ~_same(records[order[repeat]],
+                                                                            records[order[repeat - 1]])
+        hashes = hashes[order]
+        self.hashes, self.rows, self.keys = hashes[first], numbers[order[first]], records[order[first]]
+        self.duplicates = int(len(hashes) - first.sum())
+
+    # Row of B for each key row, -1 where B has no such key
+    def lookup(self, records):
+        entries = self.find(records)
+        rows = np.full(len(records), -1)
+        rows[entries >= 0] = self.rows[entries[entries >= 0]]
+        return rows
+
+    # Index entry of each key row, -1 where there is none; a row whose hash matches but whose keys do not moves
+    # on to the next entry with the same hash
+    def find(self, records, hashes=None):
+        hashes = _hash(records) if hashes is None else hashes
+        entries = np.full(len(records), -1)
+        pending = np.arange(len(records))
+        position = np.searchsorted(self.hashes, hashes)
+        while len(pending):
+            pending = pending[position[pending] < len(self.hashes)]
+            pending = pending[self.hashes[position[pending]] == hashes[pending]]
+            found = np.all(self.keys[position[pending]] == records[pending], axis=1)
+            entries[pending[found]] = position[pending[found]]
+            pending = pending[~found]
+            position[pending] += 1
+        return entries
+
+
+######### STREAMING ACCUMULATORS ###########
+class ColumnStats:
+
+    def __init__(self, top=TOP):
+        self.top = top
+        self.count = 0
+        self.nan_mismatch = 0
+        self.changed = 0
+        self.sum_abs = 0.0
+        self.max_abs = 0.0
+        self.max_rel = 0.0
+        self.worst = []  # (rel, key row, a, b)
+
+    def add(self, a, b, keys, tol):
+        both = np.isfinite(a) & np.isfinite(b)
+        self.nan_mismatch += int(np.sum(np.isnan(a) != np.isnan(b)))
+        a, b, keys = a[both], b[both], keys[both]
+        if not len(a):
+            return np.zeros(0), both
+        delta = np.abs(b - a)
+        rel = delta / np.maximum(np.maximum(np.abs(a), np.abs(b)), ATOL)
+        self.count += len(a)
+        self.changed += int(np.sum(rel > tol))
+        self.sum_abs += float(np.sum(delta))
+        self.max_abs = max(self.max_abs, float(np.max(delta)))
+        self.max_rel = max(self.max_rel, float(np.max(rel)))
+        changed = np.flatnonzero(rel > 0)  # rows that did not change never make the list
+        k = min(self.top, len(changed))
+        best = changed[np.argpartition(-rel[changed], k - 1)[:k]] if k else changed
+        self.worst = sorted(self.worst + [(float(rel[i]), keys[i], float(a[i]), float(b[i])) for i in best],
+                            key=lambda item: -item[0])[:self.top]
+        return rel, both
+
+    def summary(self, keys):
+        return {
+            'matched': self.count,
+            'nan_mismatch': self.nan_mismatch,
+            'changed': self.changed,
+            'mean_abs': self.sum_abs / self.count if self.count else 0.0,
+            'max_abs': self.max_abs,
+            'max_rel': self.max_rel,
+            'largest': [{**dict(zip(keys, key.tolist())), 'rel': rel, 'a': a, 'b': b}
+                        for rel, key, a, b in self.worst],
+        }
+
+
+# Disagreement per (design, p1 bin, Th bin) cell: rows compared, rows over tolerance and the largest change
+class RegionMap:
+
+    def __init__(self, designs, edges):
+        self.designs = list(designs)
+        self.edges = edges
+        shape = (len(self.designs),) + tuple(len(e) - 1 for e in edges)
+        self.rows = np.zeros(shape, dtype=np.int64)
+        self.disagree = np.zeros(shape, dtype=np.int64)
+        self.max_rel = np.zeros(shape)
+
+    def add(self, design, axes, worst_rel, tol):
+        index = (np.searchsorted(self.designs, design),)
+        for e, v in zip(self.edges, axes):
+            index += (np.clip(np.searchsorted(e, v, side='right') - 1, 0, len(e) - 2),)
+        np.add.at(self.rows, index, 1)
+        np.add.at(self.disagree, index, (worst_rel > tol).astype(np.int64))
+        np.maximum.at(self.max_rel, index, worst_rel)
+
+    def regions(self, limit):
+        flat = np.lexsort((-self.max_rel.ravel(), -self.disagree.ravel()))[:limit]
+        found = []
+        for i in flat:
+            index = np.unravel_index(i, self.rows.shape)
+            if not self.disagree[index]:
+                break
+            region = {'design': self.designs[index[0]], 'rows': int(self.rows[index]),
+                      'disagree': int(self.disagree[index]), 'max_rel': float(self.max_rel[index])}
+            for axis, e, j in zip(REGION_AXES, self.edges, index[1:]):
+                region[axis] = (float(e[j]), float(e[j + 1]))
+            found.append(region)
+        return found
+
+
+######### COMPARISON ###########
+# First pass over A's key columns: designs present and the bin edges of the disagreement map
+def _region_map(name, info, keys, chunk_rows, bins, root):
+    low, high, designs = {}, {}, set()
+    for _, chunk in store.iter_chunks(name, chunk_rows, _stored(info, keys), root):
+        values = _key_values(chunk, info, keys)
+        designs.update(np.unique(_designs(values)).tolist())
+        for axis in REGION_AXES:
+            low[axis] = min(low.get(axis, np.inf), float(np.nanmin(values[axis], initial=np.inf)))
+            high[axis] = max(high.get(axis, -np.inf), float(np.nanmax(values[axis], initial=-np.inf)))
+    if not designs:
+        return None
+    edges = [np.linspace(low[a], high[a] if high[a] > low[a] else low[a] + 1.0, bins + 1) for a in REGION_AXES]
+    return RegionMap(sorted(designs), edges)
+
+
+def _designs(key_values):
+    n = len(key_values[REGION_AXES[0]])
+    return key_values['design'] if 'design' in key_values else np.zeros(n)
+
+
+def _numeric(name, columns, root):
+    table = store.load(name, columns, mmap=True, root=root)
+    return [c for c in columns if table[c].dtype.kind in 'fiu']
+
+
+# Join A to B on the key columns and summarise the change of every shared numeric column (B - A): rows matched and
+# unmatched, largest absolute and relative changes with their keys, and the (design, p1, Th) cells where the most
+# rows disagree by more than tol. A NaN on one side only counts as a relative change of 1. B's keys are indexed in
+# `partitions` hash partitions (enough for INDEX_ROWS keys each by default), and A is streamed once per partition.
+def compare(a, b, columns=None, keys=None, tol=TOL, chunk_rows=CHUNK_ROWS, top=TOP, bins=BINS, regions=10,
+            plot=None, root=None, partitions=None):
+    start = time.perf_counter()
+    info_a, info_b = store.info(a, root), store.info(b, root)
+    keys = key_columns(info_a, info_b, keys)
+    if not keys:
+        raise ValueError(f"'{a}' and '{b}' share none of the key columns {list(KEY_COLUMNS)}")
+    shared = [c for c in info_a['columns'] if c in info_b['columns'] and c not in keys]
+    columns = _numeric(a, columns or shared, root)
+    columns = [c for c in columns if c in _numeric(b, columns, root)]
+    partitions = partitions or max(1, -(-info_b['rows'] // INDEX_ROWS))
+
+    table_b = store.load(b, columns, mmap=True, root=root)
+    stats = {c: ColumnStats(top) for c in columns}
+    region_map = _region_map(a, info_a, keys, chunk_rows, bins, root) if set(REGION_AXES) <= set(keys) else None
+    matched = seen_b = duplicates = 0
+
+    for partition in range(partitions):
+        index = KeyIndex(b, keys, chunk_rows, root, partition, partitions)
+        duplicates += index.duplicates
+        seen = np.zeros(len(index.rows), dtype=bool)
+        for _, chunk in store.iter_chunks(a, chunk_rows, _stored(info_a, keys) + columns, root):
+            key_values = _key_values(chunk, info_a, keys)
+            records = _records(key_values, keys)
+            hashes = _hash(records)
+            entries = np.full(len(records), -1)
+            mine = _in_partition(hashes, partition, partitions)
+            entries[mine] = index.find(records[mine], hashes[mine])
+            hit = entries >= 0
+            if not hit.any():
+                continue
+            seen[entries[hit]] = True
+            selected = index.rows[entries[hit]]
+            order = np.argsort(selected, kind='stable')  # read B in row order, then put the rows back
+            matched += len(selected)
+            worst = np.zeros(len(selected))
+            for c in columns:
+                values_b = np.empty(len(selected))
+                values_b[order] = table_b[c][selected[order]]
+                values_a = np.asarray(chunk[c][hit], dtype=float)
+                rel, both = stats[c].add(values_a, values_b, records[hit], tol)
+                worst[both] = np.maximum(worst[both], rel)
+                mismatch = np.isnan(values_a) != np.isnan(values_b)
+                worst[mismatch] = np.maximum(worst[mismatch], 1.0)
+            if region_map is not None:
+                region_map.add(_designs(key_values)[hit], [key_values[axis][hit] for axis in REGION_AXES], worst,
+                               tol)
+        seen_b += int(seen.sum())
+        del index, seen
+
+    report = {
+        'a': a, 'b': b, 'keys': keys, 'tol': tol,
+        'rows_a': info_a['rows'], 'rows_b': info_b['rows'], 'matched': matched,
+        'only_a': info_a['rows'] - matched, 'only_b': info_b['rows'] - seen_b,
+        'duplicate_keys_b': duplicates, 'partitions': partitions,
+        'columns': {c: stats[c].summary(keys) for c in columns},
+        'regions': region_map.regions(regions) if region_map is not None else [],
+        'seconds': time.perf_counter() - start,
+    }
+    if plot and region_map is not None:
+        plot_regions(region_map, plot, f"{b} vs {a}")
+    return report
+
+
+######### PLOT ###########
+# Largest relative change per (p1, Th) cell, one panel per design
+def plot_regions(region_map, out, title):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    designs = region_map.designs
+    fig, axes = plt.subplots(1, len(designs), figsize=(5 * len(designs), 4), squeeze=False)
+    x_edges, y_edges = region_map.edges
+    for d, (ax, design) in enumerate(zip(axes[0], designs)):
+        values = np.where(region_map.rows[d] > 0, np.log10(np.maximum(region_map.max_rel[d], 1e-16)), np.nan)
+        mesh = ax.pcolormesh(x_edges, y_edges, values.T, shading='flat', cmap='viridis')
+        ax.set_xlabel(REGION_AXES[0])
+        ax.set_ylabel(REGION_AXES[1])
+        ax.set_title(f"design {design:g}")
+        fig.colorbar(mesh, ax=ax, label='log10 max rel. change')
+    fig.suptitle(title)
+    fig.tight_layout()
+    fig.savefig(out)
+    plt.close(fig)
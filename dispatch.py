@@ -0,0 +1,128 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Economic Dispatch of the Three Plant Designs
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+import emissions
+import surfaces
+
+
+######### FLEET ###########
+# One unit per design, each rated at the design scripts' Wnet
+DEFAULT_UNITS = [
+    {'name': 'design1', 'design': 1, 'fuel': 'natural_gas', 'capacity': 80000, 'min_load': 0.3},
+    {'name': 'design2', 'design': 2, 'fuel': 'natural_gas', 'capacity': 80000, 'min_load': 0.3},
+    {'name': 'design3', 'design': 3, 'fuel': 'natural_gas', 'capacity': 80000, 'min_load': 0.3},
+]
+
+
+######### OPERATING POINTS ###########
+# Fuel burn and CO2 are both proportional to 1/efficiency at a given output, so the (p1, Th) point that
+# minimizes one minimizes the other; each unit runs at the most efficient point of its cached surface
+def operating_points(units, cogeneration=False, p1_bounds=None, Th_bounds=None):
+    metric = 'elec_eff' if cogeneration else 'thermal_eff'
+    points = []
+    for unit in units:
+        surface = surfaces.load_surface(unit['design'], cogeneration)
+        p1, Th, eff = surface.optimum(metric, unit.get('p1_bounds', p1_bounds), unit.get('Th_bounds', Th_bounds))
+        points.append({'p1': p1, 'Th': Th, 'efficiency': eff})
+    return points
+
+
+# Price of fuel for each unit and hour ($/MMBtu); fuel_price is one series for every fuel or a dict per fuel
+def _unit_prices(units, fuel_price, n_hours):
+    rows = []
+    for unit in units:
+        price = fuel_price[unit['fuel']] if isinstance(fuel_price, dict) else fuel_price
+        rows.append(np.broadcast_to(np.asarray(price, dtype=float), (n_hours,)))
+    return np.array(rows)
+
+
+######### MERIT ORDER DISPATCH ###########
+# Every hour, units are committed in order of marginal cost ($/kWh of electricity, fuel plus CO2 price)
+# until their capacity covers demand; committed units run at least at min load and the rest of the demand
+# is filled in merit order. All hours are dispatched at once along the second array axis.
+def dispatch(demand, fuel_price, units=DEFAULT_UNITS, co2_price=0.0, cogeneration=False, points=None):
+    demand = np.atleast_1d(np.asarray(demand, dtype=float))
+    n_units, n_hours = len(units), len(demand)
+    points = points or operating_points(units, cogeneration)
+
+    eff = np.array([p['efficiency'] for p in points])[:, None]
+    factor = np.array([emissions.fuel_factor(u['fuel']) for u in units])[:, None]  # kg CO2 per kWh fuel
+    capacity = np.array([u['capacity'] for u in units], dtype=float)[:, None] * np.ones(n_hours)
+    minimum = capacity * np.array([u['min_load'] for u in units])[:, None]
+    price = _unit_prices(units, fuel_price, n_hours) / emissions.ENERGY_UNITS['MMBtu']  # $ per kWh fuel
+    marginal = (price + co2_price / 1000 * factor) / eff
+
+    ##### Commit and load in merit order
+    order = np.argsort(marginal, axis=0)
+    cap_s = np.take_along_axis(capacity, order, 0)
+    min_s = np.take_along_axis(minimum, order, 0)
+    before = np.cumsum(cap_s, axis=0) - cap_s
+    committed = before < demand
+    base = np.where(committed, min_s, 0.0)
+    headroom = np.where(committed, cap_s - min_s, 0.0)
+    remaining = np.maximum(demand - base.sum(0), 0.0)
+    filled = np.clip(remaining - (np.cumsum(headroom, axis=0) - headroom), 0.0, headroom)
+    power_s = base + filled
+    power = np.empty_like(power_s)
+    np.put_along_axis(power, order, power_s, 0)
+
+    ##### Fuel, CO2 and cost per unit and hour
+    fuel = power / eff  # kWh of fuel heat per hour
+    co2 = fuel * factor
+    cost = fuel * price
+    generation = power.sum(0)
+    result = {
+        'hour': np.arange(n_hours, dtype=float),
+        'demand': demand,
+        'generation': generation,
+        'unserved': np.maximum(demand - generation, 0.0),
+        'spill': np.maximum(generation - demand, 0.0),
+        'fuel_cost': cost.sum(0),
+        'co2_kg': co2.sum(0),
+        'fuel_MMBtu': fuel.sum(0) / emissions.ENERGY_UNITS['MMBtu'],
+    }
+    for k, unit in enumerate(units):
+        result[f"power_{unit['name']}"] = power[k]
+        result[f"p1_{unit['name']}"] = np.where(power[k] > 0, points[k]['p1'], np.nan)
+        result[f"Th_{unit['name']}"] = np.where(power[k] > 0, points[k]['Th'], np.nan)
+    return result
+
+
+# Total fuel cost against total CO2 for a range of CO2 prices ($/t)
+def pareto(demand, fuel_price, co2_prices, units=DEFAULT_UNITS, cogeneration=False):
+    points = operating_points(units, cogeneration)
+    front = {'co2_price': np.asarray(co2_prices, dtype=float), 'fuel_cost': [], 'co2_t': []}
+    for co2_price in front['co2_price']:
+        result = dispatch(demand, fuel_price, units, co2_price, cogeneration, points)
+        front['fuel_cost'].append(result['fuel_cost'].sum())
+        front['co2_t'].append(result['co2_kg'].sum() / 1000)
+    front['fuel_cost'] = np.array(front['fuel_cost'])
+    front['co2_t'] = np.array(front['co2_t'])
+    return front
+
+
+def run_dispatch(name, demand, fuel_price, units=DEFAULT_UNITS, co2_price=0.0, cogeneration=False):
+    import store
+    result = dispatch(demand, fuel_price, units, co2_price, cogeneration)
+    store.save(f'dispatch/{name}', result, {'units': units, 'co2_price': co2_price, 'cogeneration': cogeneration})
+    return result
@@ -0,0 +1,246 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Distributed Parameter Sweeps over a Shared SQLite Work Queue
+
+Layout in the result store (RANKINE_RESULTS, shared by every node):
+    <job>/queue.sqlite          job spec and one row per work unit
+    <job>/shards/unit<id>_<n>   result table of one work unit, written by the worker that held its lease
+    <job>/design<d>             merged sweep of one design, in grid order
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import numpy as np
+
+import store
+
+
+######### JOB SETTINGS ###########
+AXES = ('p1', 'Th', 'turbEff', 'pumpEff', 'tc')
+UNIT_POINTS = 5000  # points per work unit
+CHUNK_POINTS = 1000  # points per vectorized batch; the worker renews its lease between batches
+LEASE = 300.0  # (seconds) a claimed unit goes back to the queue if its lease is not renewed within this
+MAX_ATTEMPTS = 3  # a unit that fails, or loses its lease, this many times is marked failed instead of retried
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS job (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY, design INTEGER, start INTEGER, stop INTEGER,
+    status TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0, worker TEXT, lease_until REAL,
+    shard TEXT, error TEXT, seconds REAL
+);
+CREATE INDEX IF NOT EXISTS units_status ON units (status);
+'''
+
+
+def queue_path(job):
+    return os.path.join(store.ROOT, *job.split('/'), 'queue.sqlite')
+
+
+def _connect(job):
+    connection = sqlite3.connect(queue_path(job), timeout=60, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+######### CREATING A JOB ###########
+# Every design is swept over the full product of the axes; a design's grid is cut into contiguous ranges
+# of its flat (C order) index, one work unit each
+def create(job, designs, axes, constrained=False, backend=None, unit_points=UNIT_POINTS, lease=LEASE,
+           max_attempts=MAX_ATTEMPTS, chunk_points=CHUNK_POINTS):
+    import cycle
+    import properties
+    path = queue_path(job)
+    if os.path.exists(path):
+        raise FileExistsError(f"Job '{job}' already exists at {path}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    axes = {name: [float(v) for v in np.atleast_1d(axes.get(name, cycle.DEFAULTS.get(name)))] for name in AXES}
+    spec = {
+        'designs': [int(d) for d in designs],
+        'axes': axes,
+        'constrained': bool(constrained),
+        'backend': backend or properties.active_backend(),
+        'unit_points': int(unit_points),
+        'chunk_points': int(chunk_points),
+        'lease': float(lease),
+        'max_attempts': int(max_attempts),
+    }
+    n_points = int(np.prod([len(v) for v in axes.values()]))
+    with contextlib.closing(_connect(job)) as connection:
+        connection.executescript(SCHEMA)
+        connection.execute("INSERT INTO job VALUES ('spec', ?)", (json.dumps(spec),))
+        connection.executemany("INSERT INTO units (design, start, stop) VALUES (?, ?, ?)",
+                               [(d, start, min(start + unit_points, n_points))
+                                for d in spec['designs'] for start in range(0, n_points, unit_points)])
+    return spec
+
+
+def load_spec(job):
+    with contextlib.closing(_connect(job)) as connection:
+        return json.loads(connection.execute("SELECT value FROM job WHERE key = 'spec'").fetchone()[0])
+
+
+def unit_points(spec, start, stop):
+    shape = [len(spec['axes'][name]) for name in AXES]
+    index = np.unravel_index(np.arange(start, stop), shape)
+    return {name: np.asarray(spec['axes'][name])[i] for name, i in zip(AXES, index)}
+
+
+######### LEASES ###########
+# Claim the oldest pending unit, or one whose lease has run out; BEGIN IMMEDIATE takes the database write
+# lock, so two workers can never claim the same unit. An expired unit that has used all its attempts (its
+# workers keep dying) is marked failed instead of being leased again.
+def claim(connection, worker, lease, max_attempts=MAX_ATTEMPTS):
+    now = time.time()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.execute(
+            "UPDATE units SET status = 'failed', error = 'lease expired after ' || attempts || ' attempts', "
+            "lease_until = NULL WHERE status = 'leased' AND lease_until < ? AND attempts >= ?", (now, max_attempts))
+        row = connection.execute(
+            "SELECT * FROM units WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+            "ORDER BY id LIMIT 1", (now,)).fetchone()
+        if row is not None:
+            connection.execute("UPDATE units SET status = 'leased', worker = ?, lease_until = ?, "
+                               "attempts = attempts + 1 WHERE id = ?", (worker, now + lease, row['id']))
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    return row
+
+
+# Heartbeat: extend the lease of a unit the worker still holds; False once it has been re-claimed elsewhere
+def renew(connection, unit, worker, lease):
+    cursor = connection.execute(
+        "UPDATE units SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+        (time.time() + lease, unit, worker))
+    return cursor.rowcount == 1
+
+
+# A result only counts if the worker still holds the lease; otherwise the unit was re-claimed elsewhere
+def complete(connection, unit, worker, shard, seconds):
+    cursor = connection.execute(
+        "UPDATE units SET status = 'done', shard = ?, seconds = ?, error = NULL "
+        "WHERE id = ? AND worker = ? AND status = 'leased'", (shard, seconds, unit, worker))
+    return cursor.rowcount == 1
+
+
+def fail(connection, unit, worker, error, max_attempts):
+    connection.execute(
+        "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ?, "
+        "lease_until = NULL WHERE id = ? AND worker = ? AND status = 'leased'", (max_attempts, error, unit, worker))
+
+
+######### WORKERS ###########
+def solve_unit(spec, design, points):
+    if spec['constrained']:
+        import constraints
+        return constraints.solve_feasible(design, points['p1'], points['Th'], points['turbEff'], points['pumpEff'],
+                                          points['tc'], backend=spec['backend'])
+    import cycle
+    return cycle.solve(design, points['p1'], points['Th'], points['turbEff'], points['pumpEff'], points['tc'],
+                       backend=spec['backend'])
+
+
+# Solve a unit in batches of chunk_points, renewing the lease between batches so a slow but healthy worker
+# keeps it; None if the lease was lost to another worker on the way
+def solve_leased(connection, spec, unit, worker):
+    points = unit_points(spec, unit['start'], unit['stop'])
+    step = spec.get('chunk_points', CHUNK_POINTS)
+    parts = []
+    for start in range(0, unit['stop'] - unit['start'], step):
+        if parts and not renew(connection, unit['id'], worker, spec['lease']):
+            return None
+        parts.append(solve_unit(spec, unit['design'], {name: v[start:start + step] for name, v in points.items()}))
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+# Claim, solve and write units until the queue is empty (or max_units have been done)
+def work(job, worker=None, max_units=None):
+    worker = worker or worker_id()
+    spec = load_spec(job)
+    connection = _connect(job)
+    done = 0
+    try:
+        while max_units is None or done < max_units:
+            unit = claim(connection, worker, spec['lease'], spec['max_attempts'])
+            if unit is None:
+                break
+            start = time.perf_counter()
+            shard = f"{job}/shards/unit{unit['id']:06d}_{unit['attempts'] + 1}"
+            try:
+                table = solve_leased(connection, spec, unit, worker)
+                if table is None:
+                    continue
+                store.save(shard, table, {'job': job, 'unit': unit['id'], 'design': unit['design'],
+                                          'start': unit['start'], 'worker': worker})
+            except Exception as error:
+                fail(connection, unit['id'], worker, repr(error), spec['max_attempts'])
+                continue
+            if complete(connection, unit['id'], worker, shard, time.perf_counter() - start):
+                done += 1
+            else:
+                store.delete(shard)
+    finally:
+        connection.close()
+    return done
+
+
+# Stand-in for several nodes: independent worker processes sharing only the queue and the store
+def run_local(job, workers=4):
+    import multiprocessing
+    with multiprocessing.Pool(workers) as pool:
+        return sum(pool.starmap(work, [(job, f"{socket.gethostname()}:local{k}") for k in range(workers)]))
+
+
+######### PROGRESS AND MERGE ###########
+def status(job):
+    with contextlib.closing(_connect(job)) as connection:
+        counts = dict(connection.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall())
+        seconds = connection.execute("SELECT SUM(seconds) FROM units WHERE status = 'done'").fetchone()[0] or 0.0
+        errors = [dict(row) for row in connection.execute(
+            "SELECT id, design, attempts, error FROM units WHERE error IS NOT NULL ORDER BY id")]
+    return {'counts': counts, 'solve_seconds': seconds, 'errors': errors}
+
+
+# Concatenate each design's shards in grid order into <job>/design<d>, column by column
+def merge(job):
+    spec = load_spec(job)
+    with contextlib.closing(_connect(job)) as connection:
+        open_units = connection.execute("SELECT COUNT(*) FROM units WHERE status != 'done'").fetchone()[0]
+        if open_units:
+            raise RuntimeError(f"Job '{job}' has {open_units} unfinished units; see 'python cli.py job status'")
+        rows = connection.execute("SELECT design, shard FROM units ORDER BY design, start").fetchall()
+    merged = []
+    for design in spec['designs']:
+        shards = [row['shard'] for row in rows if row['design'] == design]
+        name = f"{job}/design{design}"
+        store.concat(name, shards, {'job': job, 'design': design, 'axes': spec['axes'],
+                                    'constrained': spec['constrained'], 'backend': spec['backend']})
+        merged.append(name)
+    return merged
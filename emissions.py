@@ -0,0 +1,151 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Fuel and CO2 Emissions Accounting
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+
+######### UNITS ###########
+# Conversion factors to kWh and kg
+ENERGY_UNITS = {
+    'kWh': 1.0,
+    'MWh': 1000.0,
+    'GJ': 1e6 / 3600,
+    'MMBtu': 293.07107,  # 1 MMBtu = 1.05505585 GJ
+}
+MASS_UNITS = {
+    'kg': 1.0,
+    't': 1000.0,
+    'lb': 0.45359237,
+}
+
+
+######### FUEL FACTORS ###########
+# name: (CO2 per unit of fuel heat, mass unit, energy unit)
+# natural_gas is the 52.91 kg/MMBtu the design scripts were written with
+FUELS = {
+    'natural_gas': (52.91, 'kg', 'MMBtu'),
+    'distillate_oil': (73.96, 'kg', 'MMBtu'),
+    'bituminous_coal': (93.28, 'kg', 'MMBtu'),
+    'nuclear': (0.0, 'kg', 'MMBtu'),
+}
+
+
+def add_fuel(name, value, mass='kg', energy='MMBtu'):
+    if mass not in MASS_UNITS or energy not in ENERGY_UNITS:
+        raise ValueError(f"Unknown units {mass}/{energy}")
+    FUELS[name] = (value, mass, energy)
+
+
+# CO2 factor of a fuel converted to the requested units (default kg CO2 per kWh of fuel heat)
+def fuel_factor(fuel, mass='kg', energy='kWh'):
+    if fuel not in FUELS:
+        raise ValueError(f"Unknown fuel '{fuel}', choose from {sorted(FUELS)}")
+    value, fuel_mass, fuel_energy = FUELS[fuel]
+    return value * MASS_UNITS[fuel_mass] / MASS_UNITS[mass] * ENERGY_UNITS[energy] / ENERGY_UNITS[fuel_energy]
+
+
+######### RATES ###########
+# Q_in_mass is the boiler heat rate in kW; returns kg CO2 per hour
+def co2_rate(Q_in_mass, fuel='natural_gas'):
+    return np.asarray(Q_in_mass) * fuel_factor(fuel)
+
+
+######### TIME SERIES ###########
+PERIODS = ('hour', 'day', 'week', 'month', 'year')
+
+
+# Period label of every step for a schedule of hours counted from `start`
+def period_labels(hours, period, start='2026-01-01T00'):
+    stamps = np.datetime64(start, 'h') + np.asarray(hours).astype('timedelta64[h]')
+    if period == 'hour':
+        return stamps
+    if period == 'week':
+        # datetime64[W] counts weeks from the 1970 epoch, a Thursday; shift so each week starts on its ISO Monday
+        shift = np.timedelta64(3, 'D')
+        return (stamps.astype('datetime64[D]') + shift).astype('datetime64[W]').astype('datetime64[D]') - shift
+    units = {'day': 'D', 'month': 'M', 'year': 'Y'}
+    if period not in units:
+        raise ValueError(f"Unknown period '{period}', choose from {PERIODS}")
+    return stamps.astype(f'datetime64[{units[period]}]')
+
+
+# Sum every column over the periods with one bincount per column
+def aggregate(table, hours, period, start='2026-01-01T00'):
+    labels, index = np.unique(period_labels(hours, period, start), return_inverse=True)
+    out = {'period': labels.astype(str)}
+    for name, values in table.items():
+        out[name] = np.bincount(index, weights=values, minlength=len(labels))
+    return out
+
+
+# Fuel heat and CO2 of an operating schedule.
+# hours: hour index of each step, power: electrical output (kW) held for `duration` hours,
+# efficiency: electrical efficiency of each step (net work / boiler heat)
+def account(hours, power, efficiency, duration=1.0, fuel='natural_gas'):
+    hours, power, efficiency, duration = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(a, dtype=float)) for a in (hours, power, efficiency, duration)])
+    electricity = power * duration  # kWh
+    fuel_heat = electricity / efficiency  # kWh
+    return {
+        'hour': hours,
+        'electricity_kWh': electricity,
+        'fuel_kWh': fuel_heat,
+        'fuel_MMBtu': fuel_heat / ENERGY_UNITS['MMBtu'],
+        'co2_kg': fuel_heat * fuel_factor(fuel),
+    }
+
+
+######### SCHEDULE EFFICIENCIES ###########
+# Electrical efficiency of every (design, p1, Th) step, solving each distinct point only once. The solves use
+# each design's own state numbers; the scripts' numbers (cycle.solve(..., legacy=True)) overstate designs 2 and 3
+def schedule_efficiency(design, p1, Th, cogeneration=False, backend=None):
+    import cycle
+    design, p1, Th = np.broadcast_arrays(*[np.atleast_1d(np.asarray(a, dtype=float)) for a in (design, p1, Th)])
+    points, index = np.unique(np.column_stack([design, p1, Th]), axis=0, return_inverse=True)
+    eff_points = np.empty(len(points))
+    for d in np.unique(points[:, 0]).astype(int):
+        rows = points[:, 0] == d
+        if cogeneration:
+            eff_points[rows] = cycle.solve_cogeneration(d, points[rows, 1], points[rows, 2], backend=backend)['elec_eff']
+        else:
+            eff_points[rows] = cycle.solve(d, points[rows, 1], points[rows, 2], backend=backend)['thermal_eff']
+    return eff_points[index.ravel()]
+
+
+# Account a whole schedule and write the step table plus one table per period to the result store
+def run_schedule(name, schedule, fuel='natural_gas', periods=('day', 'month', 'year'), start='2026-01-01T00',
+                 cogeneration=False, backend=None):
+    import store
+    if 'efficiency' in schedule:
+        efficiency = schedule['efficiency']
+    else:
+        efficiency = schedule_efficiency(schedule['design'], schedule['p1'], schedule['Th'], cogeneration, backend)
+    steps = account(schedule['hour'], schedule['power'], efficiency, schedule.get('duration', 1.0), fuel)
+    steps['efficiency'] = np.broadcast_to(efficiency, steps['hour'].shape).astype(float)
+
+    meta = {'fuel': fuel, 'factor_kg_per_kWh': fuel_factor(fuel), 'start': start}
+    store.save(f'{name}/steps', steps, meta)
+    totals = {k: v for k, v in steps.items() if k not in ('hour', 'efficiency')}
+    summaries = {}
+    for period in periods:
+        summaries[period] = aggregate(totals, steps['hour'], period, start)
+        store.save(f'{name}/{period}', summaries[period], meta)
+    return steps, summaries
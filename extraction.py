@@ -0,0 +1,222 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Feedwater Heater Extraction Pressure Schedules
+
+Every schedule returns the bleed pressures (p4, p3, p2) of a batch of points, like set_pressure_intervals,
+and is selected in a solve with cycle.solve(..., bleeds='<name>'):
+    equal        four equal pressure steps between p5 and p1, as in the design scripts
+    temperature  equal saturation temperature rise per heater
+    enthalpy     equal saturated liquid enthalpy rise per heater
+    optimal      bleeds that maximise the regenerative efficiency at each (p1, Th), by a batched pattern search
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import itertools
+import time
+import numpy as np
+
+import constraints
+import cycle
+import properties
+
+
+######### SEARCH SETTINGS ###########
+OBJECTIVE = 'regenerative_eff'
+SEARCH_BACKEND = None  # None searches on the solve's own backend; a name (e.g. 'tabulated') searches on that one
+STEP = 0.1  # first pattern step, as a fraction of the saturation temperature span between p5 and p1
+TOL = 1e-3  # a point stops once its step is below this
+MIN_GAP = 0.02  # smallest fraction of the span between two neighbouring bleeds (and the ends)
+MAX_ROUNDS = 40
+
+# Moves of the pattern search in (p4, p3, p2) fraction space; row 13 is the centre (0, 0, 0)
+OFFSETS = np.array(list(itertools.product((-1.0, 0.0, 1.0), repeat=3)))
+CENTRE = 13
+
+N_SATURATION = 4001  # points on the cached saturation line
+_saturation = {}
+
+
+######### SATURATION LINE ###########
+# Saturated liquid enthalpy against temperature, solved once per backend and reused by every schedule
+def saturation_line(steam):
+    if isinstance(steam, properties.LazySteam):
+        steam = properties.get_backend(steam.name)
+    if steam not in _saturation:
+        T = np.linspace(273.16, 646.0, N_SATURATION)
+        _saturation[steam] = {'T': T, 'hf': np.asarray(steam.h(T=T, x=0), dtype=float)}
+    return _saturation[steam]
+
+
+# Saturation temperature span of each point's feedwater heating, condenser (p5) to boiler (p1)
+def saturation_span(steam, p1, p5):
+    return np.asarray(steam.Ts(p=p5), dtype=float), np.asarray(steam.Ts(p=p1), dtype=float)
+
+
+# Bleed pressures (p4, p3, p2) at the saturation temperatures in the columns of T
+def saturation_pressures(steam, T):
+    return tuple(np.asarray(steam.ps(T=T[:, k]), dtype=float) for k in range(3))
+
+
+######### HEURISTIC SCHEDULES ###########
+def equal(steam, design, x, p1, p5):
+    return cycle.set_pressure_intervals(p1, p5)
+
+
+def temperature(steam, design, x, p1, p5):
+    T_low, T_high = saturation_span(steam, p1, p5)
+    fractions = np.array([0.25, 0.5, 0.75])
+    return saturation_pressures(steam, T_low[:, None] + fractions * (T_high - T_low)[:, None])
+
+
+def enthalpy(steam, design, x, p1, p5):
+    line = saturation_line(steam)
+    T_low, T_high = saturation_span(steam, p1, p5)
+    hf_low, hf_high = np.interp(T_low, line['T'], line['hf']), np.interp(T_high, line['T'], line['hf'])
+    hf = hf_low[:, None] + np.array([0.25, 0.5, 0.75]) * (hf_high - hf_low)[:, None]
+    return saturation_pressures(steam, np.interp(hf, line['hf'], line['T']))
+
+
+######### REGENERATIVE HEAT BALANCE ###########
+# The solver's performance block pins the boiler inlet at saturated liquid at p1 (Q_in = h1 - h12) and takes
+# the mass fractions as absolute values, so its thermal_eff does not reward regeneration and is highest with
+# every bleed next to the condenser. Bleeds are optimized on this balance instead: cycle.expand_train, open
+# heaters that each bring the feedwater to saturated liquid at their bleed pressure, drains mixed into the
+# feedwater and pump work neglected. hf holds the saturated liquid enthalpies at (p5, p4, p3, p2).
+def regenerative_balance(state, hf):
+    design, h = state.design, state.h
+    hf5, hf4, hf3, hf2 = hf
+    b1, b2, b3 = [h[b] for b in cycle.BLEEDS[design]]
+    y1 = (hf2 - hf3) / (b1 - hf3)
+    y2 = (1 - y1) * (hf3 - hf4) / (b2 - hf4)
+    y3 = (1 - y1 - y2) * (hf4 - hf5) / (b3 - hf5)
+    taken = [(b, y) for b, y in zip(cycle.BLEEDS[design], (y1, y2, y3))]
+
+    def flow(i):
+        return 1 - sum(y for b, y in taken if b <= i)
+
+    work = sum(flow(i) * (h[i] - h[j]) for i, j in cycle.EXPANSIONS[design])
+    q_reheat = sum(flow(i) * (h[j] - h[i]) for i, j in cycle.REHEATS[design]) + np.zeros_like(work)
+    Q_in = h[1] - hf2 + q_reheat
+    return {'regenerative_eff': work / Q_in, 'Q_in_regenerative': Q_in, 'y1_regenerative': y1,
+            'y2_regenerative': y2, 'y3_regenerative': y3, 'w_turbine': work, 'q_reheat': q_reheat}
+
+
+# Regenerative balance of solved points (any schedule), on cycle.expand_train at their pressure levels so it
+# matches the search objective
+def regenerative_eff(steam, state):
+    train = cycle.expand_train(steam, state.design, state.inputs, {k: state.P[int(k[1])] for k in ('p2', 'p3', 'p4')})
+    hf = [np.asarray(steam.h(p=train.P[k], x=0), dtype=float) for k in (5, 4, 3, 2)]
+    return regenerative_balance(train, hf)
+
+
+######### DIRECT OPTIMIZATION ###########
+# Objective of every (point, candidate) pair in one batched evaluation; fractions are (m, 3) rows of (p4, p3, p2).
+# The regenerative objective only needs the turbine train: the bleed saturation temperatures come from the
+# fractions, so their liquid enthalpies are read off the cached saturation line without a property call.
+# Any other objective is a column of a full cycle.solve. Candidates whose turbine outlets break the quality or
+# stage ratio limits of constraints.py score -inf, so the search never moves onto them.
+def _evaluate(steam, design, x, index, fractions, T_low, T_high, objective, limits=None):
+    T = T_low[index, None] + fractions * (T_high - T_low)[index, None]
+    p4, p3, p2 = saturation_pressures(steam, T)
+    points = {name: values[index] for name, values in x.items()}
+    bleeds = {'p2': p2, 'p3': p3, 'p4': p4}
+    state = cycle.expand_train(steam, design, points, bleeds)
+    feasible, _ = constraints.turbine_states(steam, state, limits)
+    if objective == 'regenerative_eff':
+        line = saturation_line(steam)
+        hf = np.interp(np.column_stack([T_low[index], T]), line['T'], line['hf']).T
+        values = regenerative_balance(state, hf)[objective]
+    else:
+        values = cycle.table(cycle._complete(steam, state))[objective]
+    return np.where(feasible & np.isfinite(values), values, -np.inf)
+
+
+# Rows of (p4, p3, p2) fractions that are ordered and keep min_gap from each other and from the span ends
+def valid_fractions(fractions, min_gap):
+    gaps = np.diff(fractions, prepend=0.0, append=1.0, axis=-1)
+    return np.all(gaps >= min_gap - 1e-12, axis=-1)
+
+
+# Pattern search over the three heater fractions of every point at once: each round tries the 26 neighbours of
+# each active point in one batched solve, moves to the best one that improves, and halves the step otherwise.
+# It starts from equal temperature steps, or from the (n, 3) fractions of `start` where those score better
+# (optimal() passes the equal pressure steps, so the search never ends below the scripts' schedule).
+def search(steam, design, x, T_low, T_high, objective=OBJECTIVE, step=STEP, tol=TOL, min_gap=MIN_GAP,
+           max_rounds=MAX_ROUNDS, limits=None, start=None):
+    n = len(x['p1'])
+    fractions = np.tile([0.25, 0.5, 0.75], (n, 1))
+    steps = np.full(n, float(step))
+    best = _evaluate(steam, design, x, np.arange(n), fractions, T_low, T_high, objective, limits)
+    evaluations = n
+    if start is not None:
+        index = np.flatnonzero(valid_fractions(start, min_gap))
+        values = _evaluate(steam, design, x, index, start[index], T_low, T_high, objective, limits)
+        evaluations += len(index)
+        better = values > best[index]
+        fractions[index[better]], best[index[better]] = start[index[better]], values[better]
+    for _ in range(max_rounds):
+        active = np.flatnonzero(steps >= tol)
+        if not len(active):
+            break
+        candidates = fractions[active, None, :] + steps[active, None, None] * OFFSETS
+        valid = valid_fractions(candidates, min_gap)
+        valid[:, CENTRE] = False  # already known
+        rows, moves = np.nonzero(valid)
+        values = np.full(valid.shape, -np.inf)
+        values[rows, moves] = _evaluate(steam, design, x, active[rows], candidates[rows, moves], T_low, T_high,
+                                        objective, limits)
+        evaluations += len(rows)
+        k = np.argmax(values, axis=1)
+        improved = values[np.arange(len(active)), k] > best[active]
+        fractions[active[improved]] = candidates[improved, k[improved]]
+        best[active[improved]] = values[improved, k[improved]]
+        steps[active[~improved]] *= 0.5
+    return fractions, {'evaluations': evaluations, 'converged': int(np.sum(steps < tol))}
+
+
+# Searched on the backend of the solve unless SEARCH_BACKEND (or search_backend=) names another one
+def optimal(steam, design, x, p1, p5, search_backend=None, **options):
+    name = SEARCH_BACKEND if search_backend is None else search_backend
+    search_steam = properties.get_backend(name) if name else steam
+    T_low, T_high = saturation_span(search_steam, p1, p5)
+    T_equal = np.column_stack([search_steam.Ts(p=p) for p in cycle.set_pressure_intervals(p1, p5)])
+    start = (T_equal - T_low[:, None]) / (T_high - T_low)[:, None]
+    fractions, _ = search(search_steam, design, x, T_low, T_high, start=start, **options)
+    return saturation_pressures(search_steam, T_low[:, None] + fractions * (T_high - T_low)[:, None])
+
+
+SCHEDULES = {'equal': equal, 'temperature': temperature, 'enthalpy': enthalpy, 'optimal': optimal}
+
+
+def schedule(name, steam, design, x, p1, p5):
+    if name not in SCHEDULES:
+        raise ValueError(f"Unknown bleed schedule '{name}', choose from {sorted(SCHEDULES)}")
+    return SCHEDULES[name](steam, design, x, p1, p5)
+
+
+######### COMPARISON ###########
+# Solve the same points with each schedule; each table gets the regenerative balance columns and the solve time
+def compare(design, p1, Th, schedules=tuple(SCHEDULES), backend=None, **kwargs):
+    steam = properties.get_backend(backend) if backend else properties.steam
+    results = {}
+    for name in schedules:
+        start = time.perf_counter()
+        state = cycle.solve_state(design, p1, Th, backend=backend, bleeds=name, **kwargs)
+        seconds = time.perf_counter() - start
+        results[name] = {**cycle.table(state), **regenerative_eff(steam, state), 'seconds': seconds}
+    return results
@@ -0,0 +1,329 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: IAPWS-IF97 Regions 1, 2 and 4 in NumPy
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+
+######### CONSTANTS ###########
+R = 0.461526  # (kJ/kg/K) Specific gas constant of water in IF97
+P_ATM = 1.01325  # (bar) PYroMat default pressure when only T is given
+T_REGION_LIMIT = 623.15  # (Kelvin) Regions 1 and 2 meet along the saturation line only below this temperature
+T_MAX = 1073.15  # (Kelvin) Upper temperature limit of region 2
+P_RANGE = (1e-6, 100.0)  # (MPa) Pressures searched by p(T, s) outside the dome
+
+
+######### REGION 1 - COMPRESSED LIQUID ###########
+R1_P, R1_T = 16.53, 1386.0  # (MPa, Kelvin) Reducing pressure and temperature
+R1_I = np.array([0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 8, 8, 21, 23, 29, 30, 31, 32], dtype=float)
+R1_J = np.array([-2, -1, 0, 1, 2, 3, 4, 5, -9, -7, -1, 0, 1, 3, -3, 0, 1, 3, 17, -4, 0, 6, -5, -2, 10, -8, -11, -6, -29, -31, -38, -39, -40, -41], dtype=float)
+R1_N = np.array([
+    0.14632971213167, -0.84548187169114, -0.37563603672040e1, 0.33855169168385e1,
+    -0.95791963387872, 0.15772038513228, -0.16616417199501e-1, 0.81214629983568e-3,
+    0.28319080123804e-3, -0.60706301565874e-3, -0.18990068218419e-1, -0.32529748770505e-1,
+    -0.21841717175414e-1, -0.52838357969930e-4, -0.47184321073267e-3, -0.30001780793026e-3,
+    0.47661393906987e-4, -0.44141845330846e-5, -0.72694996297594e-15, -0.31679644845054e-4,
+    -0.28270797985312e-5, -0.85205128120103e-9, -0.22425281908000e-5, -0.65171222895601e-6,
+    -0.14341729937924e-12, -0.40516996860117e-6, -0.12734301741641e-8, -0.17424871230634e-9,
+    -0.68762131295531e-18, 0.14478307828521e-19, 0.26335781662795e-22, -0.11947622640071e-22,
+    0.18228094581404e-23, -0.93537087292458e-25,
+])
+
+
+######### REGION 2 - SUPERHEATED VAPOUR ###########
+R2_P, R2_T = 1.0, 540.0  # (MPa, Kelvin) Reducing pressure and temperature
+R2_J0 = np.array([0, 1, -5, -4, -3, -2, -1, 2, 3], dtype=float)
+R2_N0 = np.array([
+    -0.96927686500217e1, 0.10086655968018e2, -0.56087911283020e-2, 0.71452738081455e-1,
+    -0.40710498223928, 0.14240819171444e1, -0.43839511319450e1, -0.28408632460772,
+    0.21268463753307e-1,
+])
+R2_I = np.array([1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 4, 4, 4, 5, 6, 6, 6, 7, 7, 7, 8, 8, 9, 10, 10, 10, 16, 16, 18, 20, 20, 20, 21, 22, 23, 24, 24, 24], dtype=float)
+R2_J = np.array([0, 1, 2, 3, 6, 1, 2, 4, 7, 36, 0, 1, 3, 6, 35, 1, 2, 3, 7, 3, 16, 35, 0, 11, 25, 8, 36, 13, 4, 10, 14, 29, 50, 57, 20, 35, 48, 21, 53, 39, 26, 40, 58], dtype=float)
+R2_N = np.array([
+    -0.17731742473213e-2, -0.17834862292358e-1, -0.45996013696365e-1, -0.57581259083432e-1,
+    -0.50325278727930e-1, -0.33032641670203e-4, -0.18948987516315e-3, -0.39392777243355e-2,
+    -0.43797295650573e-1, -0.26674547914087e-4, 0.20481737692309e-7, 0.43870667284435e-6,
+    -0.32277677238570e-4, -0.15033924542148e-2, -0.40668253562649e-1, -0.78847309559367e-9,
+    0.12790717852285e-7, 0.48225372718507e-6, 0.22922076337661e-5, -0.16714766451061e-10,
+    -0.21171472321355e-2, -0.23895741934104e2, -0.59059564324270e-17, -0.12621808899101e-5,
+    -0.38946842435739e-1, 0.11256211360459e-10, -0.82311340897998e1, 0.19809712802088e-7,
+    0.10406965210174e-18, -0.10234747095929e-12, -0.10018179379511e-8, -0.80882908646985e-10,
+    0.10693031879409, -0.33662250574171, 0.89185845355421e-24, 0.30629316876232e-12,
+    -0.42002467698208e-5, -0.59056029685639e-25, 0.37826947613457e-5, -0.12768608934681e-14,
+    0.73087610595061e-28, 0.55414715350778e-16, -0.94369707241210e-6,
+])
+
+
+######### REGION 4 - SATURATION LINE ###########
+R4_N = np.array([
+    0.11670521452767e4, -0.72421316703206e6, -0.17073846940092e2, 0.12020824702470e5,
+    -0.32325550322333e7, 0.14915108613530e2, -0.48232657361591e4, 0.40511340542057e6,
+    -0.23855557567849, 0.65017534844798e3,
+])
+
+
+# Saturation pressure (MPa) from temperature (K)
+def psat(T):
+    n = R4_N
+    theta = T + n[8] / (T - n[9])
+    A = theta**2 + n[0] * theta + n[1]
+    B = n[2] * theta**2 + n[3] * theta + n[4]
+    C = n[5] * theta**2 + n[6] * theta + n[7]
+    return (2 * C / (-B + np.sqrt(B**2 - 4 * A * C)))**4
+
+
+# Saturation temperature (K) from pressure (MPa)
+def Tsat(p):
+    n = R4_N
+    beta = p**0.25
+    E = beta**2 + n[2] * beta + n[5]
+    F = n[0] * beta**2 + n[3] * beta + n[6]
+    G = n[1] * beta**2 + n[4] * beta + n[7]
+    D = 2 * G / (-F - np.sqrt(F**2 - 4 * E * G))
+    return (n[9] + D - np.sqrt((n[9] + D)**2 - 4 * (n[8] + n[9] * D))) / 2
+
+
+######### REGION BOUNDARIES ###########
+P_REGION_LIMIT = psat(T_REGION_LIMIT)  # (MPa) Saturation pressure at T_REGION_LIMIT
+B23_N = (0.34805185628969e3, -0.11671859879975e1, 0.10192970039326e-2, 0.57254459862746e3, 0.13918839778870e2)
+
+
+# Boundary between regions 2 and 3, temperature (K) from pressure (MPa)
+def T_B23(p):
+    n = B23_N
+    return n[3] + np.sqrt((p - n[4]) / n[2])
+
+
+# Highest region 1 and lowest region 2 temperature at p (MPa): the saturation temperature up to P_REGION_LIMIT,
+# then T_REGION_LIMIT and the B23 line with region 3, which is not implemented, in between
+def _region_limits(p):
+    high = p > P_REGION_LIMIT
+    Ts = Tsat(np.minimum(p, P_REGION_LIMIT))
+    return np.where(high, T_REGION_LIMIT, Ts), np.where(high, T_B23(np.maximum(p, P_REGION_LIMIT)), Ts)
+
+
+######### GIBBS FREE ENERGY AND DERIVATIVES ###########
+# Returns gamma and its derivatives gamma_pi, gamma_tau, gamma_tautau for points of shape (n,)
+def _gamma_region1(pi, tau):
+    a = (7.1 - pi)[:, None]
+    b = (tau - 1.222)[:, None]
+    g = R1_N * a**R1_I * b**R1_J
+    g_pi = -R1_N * R1_I * a**(R1_I - 1) * b**R1_J
+    g_tau = R1_N * a**R1_I * R1_J * b**(R1_J - 1)
+    g_tautau = R1_N * a**R1_I * R1_J * (R1_J - 1) * b**(R1_J - 2)
+    return g.sum(1), g_pi.sum(1), g_tau.sum(1), g_tautau.sum(1)
+
+
+def _gamma_region2(pi, tau):
+    t = tau[:, None]
+    p = pi[:, None]
+    b = t - 0.5
+    g0 = np.log(pi) + (R2_N0 * t**R2_J0).sum(1)
+    g0_pi = 1 / pi
+    g0_tau = (R2_N0 * R2_J0 * t**(R2_J0 - 1)).sum(1)
+    g0_tautau = (R2_N0 * R2_J0 * (R2_J0 - 1) * t**(R2_J0 - 2)).sum(1)
+    gr = (R2_N * p**R2_I * b**R2_J).sum(1)
+    gr_pi = (R2_N * R2_I * p**(R2_I - 1) * b**R2_J).sum(1)
+    gr_tau = (R2_N * p**R2_I * R2_J * b**(R2_J - 1)).sum(1)
+    gr_tautau = (R2_N * p**R2_I * R2_J * (R2_J - 1) * b**(R2_J - 2)).sum(1)
+    return g0 + gr, g0_pi + gr_pi, g0_tau + gr_tau, g0_tautau + gr_tautau
+
+
+# Properties from the Gibbs derivatives: h (kJ/kg), s (kJ/kg/K), v (m^3/kg), cp (kJ/kg/K)
+def _region_properties(region, T, p):
+    if region == 1:
+        pi, tau = p / R1_P, R1_T / T
+        g, g_pi, g_tau, g_tautau = _gamma_region1(pi, tau)
+    else:
+        pi, tau = p / R2_P, R2_T / T
+        g, g_pi, g_tau, g_tautau = _gamma_region2(pi, tau)
+    return {
+        'h': R * T * tau * g_tau,
+        's': R * (tau * g_tau - g),
+        'v': R * T * pi * g_pi / (p * 1000),
+        'cp': -R * tau**2 * g_tautau,
+    }
+
+
+# Region 1 below the saturation temperature, region 2 above it; NaN in region 3
+def properties_Tp(T, p):
+    T, p = _broadcast(T, p)
+    T1, T2 = _region_limits(p)
+    liquid = T < T1
+    out = {key: np.full_like(T, np.nan) for key in ('h', 's', 'v', 'cp')}
+    for region, mask in ((1, liquid), (2, ~liquid & (T >= T2))):
+        if mask.any():
+            props = _region_properties(region, T[mask], p[mask])
+            for key in out:
+                out[key][mask] = props[key]
+    return out
+
+
+######### BACKWARD FUNCTIONS ###########
+# T(p,h) and T(p,s) inside a single-phase region, solved by Newton iteration on the forward equations
+# so that h(p,s) and s(p,h) are consistent with h(T,p) and s(T,p) to round-off
+def _invert(region, key, value, p, T0, tol=1e-10, max_iter=50):
+    T = T0.copy()
+    for _ in range(max_iter):
+        props = _region_properties(region, T, p)
+        slope = props['cp'] if key == 'h' else props['cp'] / T
+        step = (props[key] - value) / slope
+        T = T - step
+        if np.all(np.abs(step) < tol * T):
+            break
+    return T
+
+
+def T_ph(p, h):
+    return _T_single_phase('h', p, h)
+
+
+def T_ps(p, s):
+    return _T_single_phase('s', p, s)
+
+
+def _T_single_phase(key, p, value):
+    p, value = _broadcast(p, value)
+    T1, T2 = _region_limits(p)
+    f = _region_properties(1, T1, p)[key]
+    g = _region_properties(2, T2, p)[key]
+    T = np.where(p > P_REGION_LIMIT, np.nan, T1)  # wet states sit at the saturation temperature
+    liquid, vapour = value < f, value > g
+    if liquid.any():
+        guess = T1[liquid] - 10.0
+        T[liquid] = _invert(1, key, value[liquid], p[liquid], guess)
+    if vapour.any():
+        guess = T2[vapour] + 10.0
+        T[vapour] = _invert(2, key, value[vapour], p[vapour], guess)
+    return T
+
+
+# Single-phase pressure (MPa) at (T, s) by bisection in log p, since s falls with p at constant T: compressed
+# liquid (region 1) between psat and the top of P_RANGE, vapour (region 2) between the bottom of P_RANGE and psat.
+# Only defined below T_REGION_LIMIT, where no point of regions 1 and 2 borders region 3; NaN elsewhere.
+def p_Ts(T, s, iterations=60):
+    T, s = _broadcast(T, s)
+    p = np.full(T.shape, np.nan)
+    valid = (T >= 273.15) & (T <= T_REGION_LIMIT)
+    ps = psat(np.where(valid, T, T_REGION_LIMIT))
+    for region, mask, low, high in ((1, valid & (s < _region_properties(1, T, ps)['s']), ps, P_RANGE[1]),
+                                    (2, valid & (s > _region_properties(2, T, ps)['s']), P_RANGE[0], ps)):
+        if not mask.any():
+            continue
+        Tm, sm = T[mask], s[mask]
+        lo, hi = np.log(np.broadcast_to(low, T.shape)[mask]), np.log(np.broadcast_to(high, T.shape)[mask])
+        inside = (_region_properties(region, Tm, np.exp(hi))['s'] <= sm) & (
+            _region_properties(region, Tm, np.exp(lo))['s'] >= sm)
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            above = _region_properties(region, Tm, np.exp(mid))['s'] > sm  # the pressure is higher than mid
+            lo, hi = np.where(above, mid, lo), np.where(above, hi, mid)
+        p[mask] = np.where(inside, np.exp((lo + hi) / 2), np.nan)
+    return p
+
+
+def _broadcast(*args):
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(a, dtype=float)) for a in args])
+    return [a.ravel().copy() for a in arrays]
+
+
+######### PYROMAT-STYLE STEAM OBJECT ###########
+# Same call style and units as pyro.get('mp.H2O'): K, bar, kJ/kg, kJ/kg/K, kg/m^3
+class IF97Steam:
+
+    ######### SATURATION ###########
+    def ps(self, T):
+        T, = _broadcast(T)
+        return psat(T) * 10
+
+    def Ts(self, p):
+        p, = _broadcast(p)
+        return Tsat(p / 10)
+
+    # Saturated liquid (x=0) and vapour (x=1) properties, mixed linearly by quality
+    def _saturation(self, key, T, p, x):
+        if T is not None:
+            T, x = _broadcast(T, x)
+            p = psat(T)
+        else:
+            p, x = _broadcast(p, x)
+            p = p / 10
+            T = Tsat(p)
+        f = _region_properties(1, T, p)[key]
+        g = _region_properties(2, T, p)[key]
+        return (1 - x) * f + x * g
+
+    ######### PROPERTY CALLS ###########
+    # Pressure of a (T, p) call; PYroMat takes the standard atmosphere when only T is given
+    @staticmethod
+    def _pressure(p):
+        return np.asarray(P_ATM if p is None else p, dtype=float)
+
+    def h(self, T=None, p=None, s=None, x=None):
+        if x is not None:
+            return self._saturation('h', T, p, x)
+        if s is not None:
+            return self._from_pair('h', 's', s, p)
+        return properties_Tp(T, self._pressure(p) / 10)['h']
+
+    def s(self, T=None, p=None, h=None, x=None):
+        if x is not None:
+            return self._saturation('s', T, p, x)
+        if h is not None:
+            return self._from_pair('s', 'h', h, p)
+        return properties_Tp(T, self._pressure(p) / 10)['s']
+
+    def d(self, T=None, p=None, x=None):
+        if x is not None:
+            return 1 / self._saturation('v', T, p, x)
+        return 1 / properties_Tp(T, self._pressure(p) / 10)['v']
+
+    def T(self, p=None, h=None, s=None):
+        p = np.asarray(p) / 10
+        return T_ph(p, h) if h is not None else T_ps(p, s)
+
+    # Pressure from temperature and entropy: the saturation pressure inside the dome, the single-phase pressure
+    # (p_Ts) outside it; NaN above T_REGION_LIMIT, where region 3 is not implemented
+    def p(self, T=None, s=None, x=None):
+        if s is None:
+            T, = _broadcast(T)
+            return psat(T) * 10 if x is not None else np.full(T.shape, P_ATM)
+        T, s = _broadcast(T, s)
+        p = psat(T)
+        inside = (s >= _region_properties(1, T, p)['s']) & (s <= _region_properties(2, T, p)['s'])
+        return np.where(inside, p * 10, p_Ts(T, s) * 10)
+
+    ######### INVERSE CALLS ###########
+    # Property `key` at pressure p (bar) given the other property `given`: wet states use the quality,
+    # single-phase states use the backward temperature
+    def _from_pair(self, key, given, value, p):
+        value, p = _broadcast(value, p)
+        p = p / 10
+        Ts = Tsat(p)
+        f = _region_properties(1, Ts, p)
+        g = _region_properties(2, Ts, p)
+        x = (value - f[given]) / (g[given] - f[given])
+        out = (1 - x) * f[key] + x * g[key]
+        single = (x < 0) | (x > 1)
+        if single.any():
+            T = _T_single_phase(given, p[single], value[single])
+            out[single] = properties_Tp(T, p[single])[key]
+        return out
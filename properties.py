@@ -0,0 +1,153 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Steam Property Backends
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import os
+
+
+######### BACKEND REGISTRY ###########
+# Every backend exposes the PYroMat call style used by the design scripts:
+#   h(T=, p=), s(T=, p=), h(s=, p=), s(h=, p=), p(T=, s=), and h/s/d(T= or p=, x=0)
+# Units follow the PYroMat defaults: K, bar, kJ/kg, kJ/kg/K, kg/m^3
+# A backend is only imported and built the first time a property is requested from it
+
+DEFAULT_BACKEND = os.environ.get('RANKINE_BACKEND', 'pyromat')
+
+_loaders = {}
+_loaded = {}
+_active = [DEFAULT_BACKEND]
+
+
+# Register a loader under a name; the loader takes no arguments and returns the steam object
+def register_backend(name, loader):
+    _loaders[name] = loader
+    _loaded.pop(name, None)
+
+
+def available_backends():
+    return sorted(_loaders)
+
+
+def loaded_backends():
+    return sorted(_loaded)
+
+
+# Return the steam object for a backend, building it on first use
+def get_backend(name=None):
+    if name is None:
+        name = _active[0]
+    if name not in _loaded:
+        if name not in _loaders:
+            raise ValueError(f"Unknown property backend '{name}', choose from {available_backends()}")
+        _loaded[name] = _loaders[name]()
+    return _loaded[name]
+
+
+# Select the backend used by the shared `steam` object
+def set_backend(name):
+    if name not in _loaders:
+        raise ValueError(f"Unknown property backend '{name}', choose from {available_backends()}")
+    _active[0] = name
+
+
+def active_backend():
+    return _active[0]
+
+
+######### LAZY STEAM OBJECT ###########
+# Drop-in replacement for `steam = pyro.get('mp.H2O')` in the design scripts
+class LazySteam:
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_backend(self.name), attr)
+
+    def __repr__(self):
+        return f"LazySteam({self.name or active_backend()!r})"
+
+
+steam = LazySteam()
+
+
+######### BUILT-IN BACKENDS ###########
+def _load_pyromat():
+    import pyromat as pyro
+    return pyro.get('mp.H2O')
+
+
+def _load_tabulated():
+    import tabulated
+    return tabulated.load_tables(os.environ.get('RANKINE_TABLE_SOURCE', 'pyromat'))
+
+
+def _load_if97():
+    import if97
+    return if97.IF97Steam()
+
+
+register_backend('pyromat', _load_pyromat)
+register_backend('tabulated', _load_tabulated)
+register_backend('if97', _load_if97)
+
+
+######### CROSS-VALIDATION ###########
+# Operating envelope of the design studies
+ENVELOPE_P1 = (10, 100)  # (bar) Boiler pressures
+ENVELOPE_TH = (673, 873)  # (Kelvin) Boiler outlet temperatures
+ENVELOPE_TC = 30 + 273.15  # (Kelvin) Condenser temperature
+ENVELOPE_TCW = (80 + 273.15, 125 + 273.15)  # (Kelvin) Cooling water temperatures
+
+
+# Evaluate every call the cycle makes over the envelope and return the max relative deviation per call
+def compare_backends(candidate, reference='pyromat', n=12):
+    import numpy as np
+    a, b = get_backend(candidate), get_backend(reference)
+
+    p1, Th = np.meshgrid(np.linspace(*ENVELOPE_P1, n), np.linspace(*ENVELOPE_TH, n))
+    p1, Th = p1.ravel(), Th.ravel()
+    s1 = b.s(T=Th, p=p1)
+    p5 = b.p(T=ENVELOPE_TC, s=s1)
+    fraction = np.linspace(0.0, 1.0, n)[:, None]
+    p = (p5 + fraction * (p1 - p5)).ravel()  # intermediate pressures down to the condenser
+    s = np.tile(s1, n)
+    h_ex = b.h(s=s, p=p)
+    p_sat = np.geomspace(p5[0], ENVELOPE_P1[1], 4 * n)
+    T_sat = np.array([ENVELOPE_TC, *ENVELOPE_TCW])
+
+    calls = {
+        'h(T,p)': lambda st: st.h(T=Th, p=p1),
+        's(T,p)': lambda st: st.s(T=Th, p=p1),
+        'h(s,p)': lambda st: st.h(s=s, p=p),
+        's(h,p)': lambda st: st.s(h=h_ex, p=p),
+        'p(T,s)': lambda st: st.p(T=ENVELOPE_TC, s=s1),
+        'h(p,x=0)': lambda st: st.h(p=p_sat, x=0),
+        's(p,x=0)': lambda st: st.s(p=p_sat, x=0),
+        'd(p,x=0)': lambda st: st.d(p=p_sat, x=0),
+        'h(T,x=0)': lambda st: st.h(T=T_sat, x=0),
+        's(T,x=0)': lambda st: st.s(T=T_sat, x=0),
+        'd(T,x=0)': lambda st: st.d(T=T_sat, x=0),
+    }
+    deviation = {}
+    for name, call in calls.items():
+        ref = np.asarray(call(b), dtype=float)
+        deviation[name] = float(np.max(np.abs(np.asarray(call(a), dtype=float) - ref) / np.abs(ref)))
+    return deviation
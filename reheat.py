@@ -0,0 +1,211 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Reheat Pressure and Reheat Temperature Study of the Reheat Designs
+
+For each (design, p1, Th) point the three pressure levels and the outlet temperature of every reheater are
+chosen independently, subject to the turbine exhaust quality limits of constraints.py. The result is the Pareto
+front of regenerative efficiency (extraction.regenerative_balance) against reheater duty.
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import time
+import numpy as np
+
+import constraints
+import cycle
+import extraction
+import properties
+
+
+######### STUDY SETTINGS ###########
+DESIGNS = (2, 3)
+STUDY_P1 = np.linspace(10, 100, 10)  # (bar)
+STUDY_TH = (873.0,)  # (Kelvin)
+SAMPLES = 1024  # candidates per point in every round
+ROUNDS = 6  # rounds of sampling around the current front after the first
+SPREAD = 0.1  # first perturbation of a front member, in fractions of each variable's range
+SEARCH_BACKEND = extraction.SEARCH_BACKEND
+SEED = 0
+
+FRONT_COLUMNS = ['design', 'p1', 'Th', 'regenerative_eff', 'Q_reheat', 'q_reheat', 'w_turbine', 'm_dot', 'p2', 'p3',
+                 'p4', 'Tr1', 'Tr2', 'Tr3', 'x_exhaust', 'x_turbine_min']
+
+
+######### BATCHED EVALUATION ###########
+# Candidates are rows of fractions: three for the pressure levels (p4, p3, p2) along the saturation temperature
+# span, as in extraction.search, and one per reheater along its outlet temperature range, from superheat_min
+# above saturation up to the tube metal limit
+def evaluate(steam, design, x, fractions, limits=None, Wnet=None):
+    limits = constraints.merged_limits(limits)
+    Wnet = cycle.DEFAULTS['Wnet'] if Wnet is None else Wnet
+    s1 = steam.s(T=x['Th'], p=x['p1'])
+    p5 = steam.p(T=x['tc'], s=s1)
+    T_low, T_high = extraction.saturation_span(steam, x['p1'], p5)
+    T_levels = T_low[:, None] + fractions[:, :3] * (T_high - T_low)[:, None]
+    levels = extraction.saturation_pressures(steam, T_levels)
+
+    T_sat = {2: T_levels[:, 2], 3: T_levels[:, 1], 4: T_levels[:, 0]}
+    level = cycle.state_levels(design)
+    T_max = limits['T_metal_max'] - limits['metal_margin']
+    Tr, room = [], np.ones(len(fractions), dtype=bool)
+    for r, (i, j) in enumerate(cycle.REHEATS[design]):
+        T_min = T_sat[level[i]] + limits['superheat_min']
+        Tr.append(T_min + fractions[:, 3 + r] * (T_max - T_min))
+        room &= T_min <= T_max
+    state = cycle.expand_train(steam, design, x, dict(zip(('p4', 'p3', 'p2'), levels)), Tr)
+
+    line = extraction.saturation_line(steam)
+    hf = np.interp(np.column_stack([T_low, T_levels]), line['T'], line['hf']).T
+    balance = extraction.regenerative_balance(state, hf)
+    boiler_ok, _ = constraints.envelope(steam, x, limits)
+    turbine_ok, qualities = constraints.turbine_states(steam, state, limits)
+    ok = boiler_ok & turbine_ok & room & extraction.valid_fractions(fractions[:, :3], extraction.MIN_GAP)
+    ok &= np.isfinite(balance['regenerative_eff']) & (balance['w_turbine'] > 0)
+    for i, j in cycle.REHEATS[design]:
+        ok &= state.h[j] >= state.h[i]  # a reheater may not cool the steam
+    m_dot = Wnet / balance['w_turbine']
+    result = {
+        'feasible': ok, 'regenerative_eff': balance['regenerative_eff'], 'q_reheat': balance['q_reheat'],
+        'Q_reheat': m_dot * balance['q_reheat'], 'w_turbine': balance['w_turbine'], 'm_dot': m_dot,
+        'p2': levels[2], 'p3': levels[1], 'p4': levels[0], **qualities,
+    }
+    for r in range(3):
+        result[f'Tr{r + 1}'] = Tr[r] if r < len(Tr) else np.full(len(ok), np.nan)
+    return result
+
+
+######### PARETO FRONTS ###########
+# Points no other candidate of the same group beats on both efficiency (higher) and reheater duty (lower)
+def pareto_mask(group, eff, duty):
+    mask = np.zeros(len(eff), dtype=bool)
+    order = np.lexsort((-eff, duty, group))
+    sorted_group, sorted_eff = group[order], eff[order]
+    starts = np.flatnonzero(np.r_[True, sorted_group[1:] != sorted_group[:-1]])
+    for start, stop in zip(starts, np.r_[starts[1:], len(order)]):
+        best = np.maximum.accumulate(sorted_eff[start:stop])
+        mask[order[start:stop]] = sorted_eff[start:stop] >= np.r_[-np.inf, best[:-1]] + 1e-12
+    return mask
+
+
+def _repeat(x, group):
+    return {name: values[group] for name, values in x.items()}
+
+
+def _sample(rng, n, dims, min_gap):
+    levels = np.sort(rng.uniform(min_gap, 1 - min_gap, (n, 3)), axis=1)
+    return np.column_stack([levels, rng.uniform(0, 1, (n, dims - 3))])
+
+
+def _front(group, values):
+    eff = np.where(values['feasible'], values['regenerative_eff'], -np.inf)
+    keep = values['feasible'] & pareto_mask(group, eff, values['Q_reheat'])
+    order = np.flatnonzero(keep)[np.argsort(group[keep], kind='stable')]
+    return order
+
+
+# Front of every point of x: random candidates in one batch, then rounds of candidates sampled around each
+# point's current front members with a shrinking spread; every round is one batched evaluation over all points
+def search(steam, design, x, samples=SAMPLES, rounds=ROUNDS, spread=SPREAD, limits=None, Wnet=None, seed=SEED):
+    rng = np.random.default_rng(seed)
+    n, dims = len(x['p1']), 3 + len(cycle.REHEATS[design])
+    group = np.repeat(np.arange(n), samples)
+    fractions = _sample(rng, len(group), dims, extraction.MIN_GAP)
+    values = evaluate(steam, design, _repeat(x, group), fractions, limits, Wnet)
+    evaluations = len(group)
+    for k in range(rounds + 1):
+        front = _front(group, values)
+        group, fractions = group[front], fractions[front]
+        values = {name: v[front] for name, v in values.items()}
+        if k == rounds or not len(group):
+            break
+        counts = np.bincount(group, minlength=n)
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        target = np.repeat(np.flatnonzero(counts), samples)
+        members = starts[target] + (rng.uniform(0, 1, len(target)) * counts[target]).astype(int)
+        new = np.clip(fractions[members] + rng.normal(0, spread * 0.5 ** k, (len(members), dims)), 0, 1)
+        new[:, :3] = np.sort(new[:, :3], axis=1)
+        added = evaluate(steam, design, _repeat(x, target), new, limits, Wnet)
+        evaluations += len(target)
+        group, fractions = np.r_[group, target], np.r_[fractions, new]
+        values = {name: np.r_[values[name], added[name]] for name in values}
+    return group, fractions, values, evaluations
+
+
+######### STUDY ###########
+# Pareto fronts of every design over the (p1, Th) grid. The fronts are searched on search_backend (the requested
+# backend when None) and their members are then re-evaluated, and re-filtered, on the requested backend.
+def study(designs=DESIGNS, p1_values=STUDY_P1, Th_values=STUDY_TH, turbEff=None, pumpEff=None, tc=None,
+          limits=None, Wnet=None, backend=None, search_backend=SEARCH_BACKEND, **options):
+    steam = properties.get_backend(backend) if backend else properties.steam
+    search_steam = properties.get_backend(search_backend) if search_backend else steam
+    p1, Th = np.meshgrid(np.asarray(p1_values, dtype=float), np.asarray(Th_values, dtype=float), indexing='ij')
+    x = cycle._inputs(
+        p1=p1.ravel(), Th=Th.ravel(),
+        turbEff=cycle.DEFAULTS['turbEff'] if turbEff is None else turbEff,
+        pumpEff=cycle.DEFAULTS['pumpEff'] if pumpEff is None else pumpEff,
+        tc=cycle.DEFAULTS['tc'] if tc is None else tc,
+    )
+    parts, info = [], {}
+    for design in designs:
+        start = time.perf_counter()
+        group, fractions, _, evaluations = search(search_steam, design, x, limits=limits, Wnet=Wnet, **options)
+        values = evaluate(steam, design, _repeat(x, group), fractions, limits, Wnet)
+        front = _front(group, values)
+        part = {name: values[name][front] for name in FRONT_COLUMNS if name in values}
+        part.update({name: x[name][group[front]] for name in ('p1', 'Th')})
+        part['design'] = np.full(len(front), float(design))
+        parts.append(part)
+        info[design] = {'evaluations': evaluations, 'front_points': len(front), 'seconds': time.perf_counter() - start}
+    table = {name: np.concatenate([part[name] for part in parts]) for name in FRONT_COLUMNS}
+    return table, info
+
+
+# Per (p1, Th): best efficiency of each design, the gain of the last design over the first and the least reheater
+# duty at which the last design's front passes the first design's best efficiency (NaN where it never does)
+def compare(table, designs=DESIGNS):
+    first, last = designs[0], designs[-1]
+    rows = []
+    points = sorted({(p1, Th) for p1, Th in zip(table['p1'].tolist(), table['Th'].tolist())})
+    for p1, Th in points:
+        at = (table['p1'] == p1) & (table['Th'] == Th)
+        row = {'p1': p1, 'Th': Th}
+        for design in designs:
+            mine = at & (table['design'] == design)
+            best = np.argmax(np.where(mine, table['regenerative_eff'], -np.inf)) if mine.any() else None
+            row[f'eff_{design}'] = table['regenerative_eff'][best] if best is not None else np.nan
+            row[f'Q_reheat_{design}'] = table['Q_reheat'][best] if best is not None else np.nan
+        beats = at & (table['design'] == last) & (table['regenerative_eff'] > row[f'eff_{first}'])
+        row['gain'] = row[f'eff_{last}'] - row[f'eff_{first}']
+        row['Q_reheat_to_beat'] = np.min(table['Q_reheat'][beats]) if beats.any() else np.nan
+        row['extra_duty'] = row['Q_reheat_to_beat'] - row[f'Q_reheat_{first}']
+        rows.append(row)
+    return {name: np.array([row[name] for row in rows], dtype=float) for name in rows[0]} if rows else {}
+
+
+def run_study(name, designs=DESIGNS, backend=None, **kwargs):
+    import store
+    table, info = study(designs, backend=backend, **kwargs)
+    meta = {
+        'designs': list(designs),
+        'backend': backend or properties.active_backend(),
+        'search_backend': kwargs.get('search_backend') or backend or properties.active_backend(),
+        'search': {str(design): values for design, values in info.items()},
+        'limits': constraints.merged_limits(kwargs.get('limits')),
+    }
+    store.save(name, table, meta)
+    return table, info
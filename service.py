@@ -0,0 +1,400 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Asyncio Solver Service with Request Micro-Batching
+
+Protocol (HTTP/1.1, JSON, keep-alive):
+    POST /solve    {"design": 1, "p1": [10, 50], "Th": 773, "turbEff": 0.87, "pumpEff": 0.8, "tc": 303.15,
+                    "outputs": ["thermal_eff", "m_dot"]}   -> {"design": 1, "backend": ..., "results": {...}}
+    GET  /metrics  latency percentiles, throughput, batch sizes and cache statistics
+    GET  /health
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import time
+import numpy as np
+
+import cache
+
+
+######### SERVICE SETTINGS ###########
+HOST = '127.0.0.1'
+PORT = 8765
+MAX_BATCH = 4096  # points per vectorized solve
+MAX_WAIT = 0.005  # (seconds) how long the first request of a batch waits for others to join it
+LATENCY_WINDOW = 10000  # requests kept for the latency percentiles
+MAX_BODY = 4 * 1024 * 1024  # (bytes) larger request bodies are refused with 413 before they are read
+
+
+######### WORKER PROCESSES ###########
+# Load the property backend once per worker so the first batch does not pay for it
+def _init_worker(backend):
+    import properties
+    properties.get_backend(backend)
+
+
+def _solve_batch(design, backend, inputs):
+    import cycle
+    result = cycle.solve(design, inputs['p1'], inputs['Th'], turbEff=inputs['turbEff'], pumpEff=inputs['pumpEff'],
+                         tc=inputs['tc'], backend=backend)
+    return {name: np.asarray(values, dtype=float) for name, values in result.items()}
+
+
+######### METRICS ###########
+class Metrics:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.points = 0
+        self.errors = 0
+        self.batches = 0
+        self.batch_points = 0
+        self.solved_points = 0
+
+    def request(self, latency, points):
+        self.latencies.append(latency)
+        self.requests += 1
+        self.points += points
+
+    def batch(self, points, solved):
+        self.batches += 1
+        self.batch_points += points
+        self.solved_points += solved
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started
+        latency = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            'uptime_s': uptime,
+            'requests': self.requests,
+            'points': self.points,
+            'errors': self.errors,
+            'requests_per_s': self.requests / uptime,
+            'points_per_s': self.points / uptime,
+            'latency_ms': {'mean': float(latency.mean()), 'p50': float(np.percentile(latency, 50)),
+                           'p95': float(np.percentile(latency, 95)), 'p99': float(np.percentile(latency, 99)),
+                           'max': float(latency.max())},
+            'batches': self.batches,
+            'mean_batch_points': self.batch_points / self.batches if self.batches else 0.0,
+            'solved_points': self.solved_points,
+        }
+
+
+######### MICRO-BATCHING ###########
+# One batcher per design: requests that arrive within MAX_WAIT of each other are concatenated, looked up in
+# the result cache, and only the missing points go to the worker pool as one vectorized solve
+class Batcher:
+
+    def __init__(self, service, design):
+        self.service = service
+        self.design = design
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    def submit(self, inputs):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((inputs, future))
+        return future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        points = len(batch[0][0]['p1'])
+        deadline = time.perf_counter() + self.service.max_wait
+        while points < self.service.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            points += len(item[0]['p1'])
+        return batch
+
+    # A failed batch is solved again one request at a time, so only the requests that fail get the error
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                results = await self._solve([inputs for inputs, _ in batch])
+            except Exception as error:
+                if len(batch) == 1:
+                    results = [error]
+                else:
+                    alone = await asyncio.gather(*[self._solve([inputs]) for inputs, _ in batch],
+                                                 return_exceptions=True)
+                    results = [r if isinstance(r, Exception) else r[0] for r in alone]
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _solve(self, requests):
+        service = self.service
+        sizes = [len(inputs['p1']) for inputs in requests]
+        inputs = {name: np.concatenate([r[name] for r in requests]) for name in cache.KEY_INPUTS}
+        keys = cache.point_keys(self.design, service.backend, inputs)
+        rows = service.cache.get_many(keys)
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            subset = {name: values[missing] for name, values in inputs.items()}
+            loop = asyncio.get_running_loop()
+            solved = await loop.run_in_executor(service.pool, _solve_batch, self.design, service.backend, subset)
+            service.cache.put_many([keys[i] for i in missing], solved)
+            for j, i in enumerate(missing):
+                rows[i] = {name: solved[name][j] for name in solved}
+        service.metrics.batch(len(keys), len(missing))
+        bounds = np.cumsum([0] + sizes)
+        return [rows[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+######### REQUEST PARSING ###########
+def _request_inputs(body):
+    import cycle
+    design = int(body['design'])
+    if design not in cycle.DESIGN_NAMES:
+        raise ValueError(f"Unknown design {design}, choose from {sorted(cycle.DESIGN_NAMES)}")
+    values = {name: body.get(name, cycle.DEFAULTS.get(name)) for name in cache.KEY_INPUTS}
+    missing = [name for name, value in values.items() if value is None]
+    if missing:
+        raise ValueError(f"Missing inputs {missing}")
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(values[name], dtype=float)) for name in cache.KEY_INPUTS])
+    inputs = {name: np.ascontiguousarray(a).ravel() for name, a in zip(cache.KEY_INPUTS, arrays)}
+    outputs = body.get('outputs') or cycle.columns(design)
+    unknown = set(outputs) - set(cycle.columns(design))
+    if unknown:
+        raise ValueError(f"Unknown outputs {sorted(unknown)}")
+    return design, inputs, outputs
+
+
+def _json_value(value):
+    return None if not np.isfinite(value) else float(value)
+
+
+######### HTTP SERVER ###########
+class SolverService:
+
+    def __init__(self, backend=None, workers=None, max_batch=MAX_BATCH, max_wait=MAX_WAIT, cache_points=200_000,
+                 persist=None, max_body=MAX_BODY):
+        import properties
+        self.backend = backend or properties.active_backend()
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_body = max_body
+        self.persist = persist
+        self.cache = cache.ResultCache(cache_points)
+        self.metrics = Metrics()
+        self.batchers = {}
+        self.pool = None
+        self.server = None
+
+    async def start(self, host=HOST, port=PORT):
+        if self.persist:
+            self.cache.load(self.persist)
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                           initargs=(self.backend,))
+        self.server = await asyncio.start_server(self._connection, host, port)
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for batcher in self.batchers.values():
+            batcher.task.cancel()
+        # waiting for the workers to exit would block the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.pool.shutdown)
+        if self.persist:
+            self.cache.save(self.persist)
+
+    async def solve(self, body):
+        design, inputs, outputs = _request_inputs(body)
+        if design not in self.batchers:
+            self.batchers[design] = Batcher(self, design)
+        rows = await self.batchers[design].submit(inputs)
+        results = {name: [_json_value(row[name]) for row in rows] for name in outputs}
+        return {'design': design, 'backend': self.backend, 'results': results}
+
+    async def _handle(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'backend': self.backend}
+        if method == 'GET' and path == '/metrics':
+            return 200, {**self.metrics.snapshot(), 'cache': self.cache.stats()}
+        if method == 'POST' and path == '/solve':
+            start = time.perf_counter()
+            response = await self.solve(json.loads(body or b'{}'))
+            self.metrics.request(time.perf_counter() - start, len(next(iter(response['results'].values()), [])))
+            return 200, response
+        return 404, {'error': f"No route {method} {path}"}
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader, self.max_body)
+                except ValueError as error:
+                    # the stream position after a malformed head or an unread body is unknown, so answer and close
+                    self.metrics.errors += 1
+                    _write_response(writer, 413 if isinstance(error, BodyTooLarge) else 400, {'error': str(error)})
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, response = await self._handle(method, path, body)
+                except (KeyError, ValueError, TypeError) as error:
+                    self.metrics.errors += 1
+                    status, response = 400, {'error': str(error)}
+                except Exception as error:
+                    self.metrics.errors += 1
+                    status, response = 500, {'error': repr(error)}
+                _write_response(writer, status, response)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class BodyTooLarge(ValueError):
+    pass
+
+
+async def _read_request(reader, max_body=MAX_BODY):
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError:
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, path, _ = lines[0].split(' ', 2)
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        if length < 0:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Malformed request head {lines[0]!r}") from None
+    if length > max_body:
+        raise BodyTooLarge(f"Request body of {length} bytes is over the {max_body} byte limit")
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+def _write_response(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    length = next(int(line.split(':', 1)[1]) for line in lines if line.lower().startswith('content-length'))
+    return status, json.loads(await reader.readexactly(length))
+
+
+def serve(host=HOST, port=PORT, **options):
+    async def main():
+        service = SolverService(**options)
+        server = await service.start(host, port)
+        print(f"serving {service.backend} on http://{host}:{port} with {service.workers} workers")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await service.stop()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+######### LOAD TEST CLIENT ###########
+# Each connection sends its share of requests back to back over keep-alive. Points are drawn from a
+# (p1, Th) grid of grid_points values so repeated points exercise the cache; grid_points=0 draws them at random.
+async def load_test(host=HOST, port=PORT, requests=1000, concurrency=32, points=1, designs=(1, 2, 3),
+                    grid_points=50, seed=0):
+    rng = np.random.default_rng(seed)
+    latencies = []
+    failures = 0
+
+    def body():
+        if grid_points:
+            p1 = rng.choice(np.linspace(10, 100, grid_points), points)
+            Th = rng.choice(np.linspace(673, 873, grid_points), points)
+        else:
+            p1, Th = rng.uniform(10, 100, points), rng.uniform(673, 873, points)
+        return {'design': int(rng.choice(designs)), 'p1': p1.tolist(), 'Th': Th.tolist(), 'outputs': ['thermal_eff']}
+
+    async def client(n):
+        nonlocal failures
+        reader, writer = await asyncio.open_connection(host, port)
+        for _ in range(n):
+            payload = json.dumps(body()).encode()
+            start = time.perf_counter()
+            writer.write(f"POST /solve HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+            await writer.drain()
+            status, _ = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            failures += status != 200
+        writer.close()
+
+    shares = [requests // concurrency + (k < requests % concurrency) for k in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*[client(n) for n in shares if n])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    _, server_metrics = await _read_response(reader)
+    writer.close()
+
+    latency = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'failures': failures,
+        'elapsed_s': elapsed,
+        'requests_per_s': len(latencies) / elapsed,
+        'points_per_s': len(latencies) * points / elapsed,
+        'latency_ms': {'p50': float(np.percentile(latency, 50)), 'p95': float(np.percentile(latency, 95)),
+                       'p99': float(np.percentile(latency, 99)), 'max': float(latency.max())},
+        'server': server_metrics,
+    }
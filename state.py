@@ -0,0 +1,120 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Array-Backed Thermodynamic States of a Batch of Cycle Points
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+
+######### LAYOUT ###########
+# One float64 block of shape (points, states, properties); state n of the design scripts is row n - 1.
+# Pressure levels P1..P5 (boiler, the three bleeds, condenser) are kept in a (points, 5) block of their own.
+PROPERTIES = ('p', 'h', 's', 'v')  # (bar, kJ/kg, kJ/kg/K, m^3/kg)
+N_LEVELS = 5
+
+
+# All points of one property (or of the pressure levels), indexed by state number like h[5] in the scripts.
+# Reads are views into the block and writes go straight into it, so nothing is allocated per state.
+class StateView:
+    __slots__ = ('block',)
+
+    def __init__(self, block):
+        self.block = block
+
+    def __getitem__(self, n):
+        return self.block[:, n - 1]
+
+    def __setitem__(self, n, values):
+        self.block[:, n - 1] = values
+
+
+######### SINGLE-POINT ACCESS ###########
+class StatePoint:
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        self.values = values
+
+    p = property(lambda self: float(self.values[0]))
+    h = property(lambda self: float(self.values[1]))
+    s = property(lambda self: float(self.values[2]))
+    v = property(lambda self: float(self.values[3]))
+
+
+# One operating point: point[5].h is h5, point.pressures is (P1..P5), and inputs and metrics read as
+# attributes (point.Th, point.m_dot, point.y1)
+class CyclePoint:
+    __slots__ = ('state', 'index')
+
+    def __init__(self, state, index):
+        self.state = state
+        self.index = index
+
+    def __getitem__(self, n):
+        return StatePoint(self.state.data[self.index, n - 1])
+
+    @property
+    def pressures(self):
+        return self.state.levels[self.index]
+
+    def __getattr__(self, name):
+        for values in (self.state.inputs, self.state.metrics):
+            if name in values:
+                return float(values[name][self.index])
+        raise AttributeError(name)
+
+
+######### BATCH CONTAINER ###########
+class CycleState:
+    __slots__ = ('design', 'data', 'levels', 'inputs', 'metrics')
+
+    def __init__(self, design, n_states, inputs):
+        n = len(next(iter(inputs.values())))
+        self.design = design
+        self.data = np.full((n, n_states, len(PROPERTIES)), np.nan)
+        self.levels = np.full((n, N_LEVELS), np.nan)
+        self.inputs = inputs
+        self.metrics = {}
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __iter__(self):
+        return (CyclePoint(self, i) for i in range(len(self)))
+
+    def point(self, i):
+        return CyclePoint(self, i)
+
+    @property
+    def n_states(self):
+        return self.data.shape[1]
+
+    p = property(lambda self: StateView(self.data[:, :, 0]))
+    h = property(lambda self: StateView(self.data[:, :, 1]))
+    s = property(lambda self: StateView(self.data[:, :, 2]))
+    v = property(lambda self: StateView(self.data[:, :, 3]))
+    P = property(lambda self: StateView(self.levels))
+
+    # Copy of a subset of the points (boolean mask or index array)
+    def take(self, index):
+        subset = CycleState(self.design, self.n_states, {k: v[index] for k, v in self.inputs.items()})
+        subset.data = self.data[index]
+        subset.levels = self.levels[index]
+        subset.metrics = {k: v[index] for k, v in self.metrics.items()}
+        return subset
@@ -0,0 +1,119 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Columnar Result Store
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import json
+import os
+import shutil
+import numpy as np
+
+
+######### STORE LAYOUT ###########
+# results/<name>/meta.json   column order, row count and free-form metadata
+# results/<name>/<column>.npy one float64 (or string) array per column, memory-mapped on load
+# Names may contain '/' to group related tables, e.g. 'emissions/year/hourly'
+ROOT = os.environ.get('RANKINE_RESULTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results'))
+
+
+def _path(name, root=None):
+    return os.path.join(root or ROOT, *name.split('/'))
+
+
+def exists(name, root=None):
+    return os.path.exists(os.path.join(_path(name, root), 'meta.json'))
+
+
+######### WRITING ###########
+# Columns are written first and meta.json last, so a table without meta.json is an unfinished write
+def save(name, table, meta=None, root=None):
+    path = _path(name, root)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    names = list(table)
+    n_rows = len(table[names[0]]) if names else 0
+    for column in names:
+        values = np.asarray(table[column])
+        if len(values) != n_rows:
+            raise ValueError(f"Column '{column}' has {len(values)} rows, expected {n_rows}")
+        np.save(os.path.join(path, f'{column}.npy'), values)
+    with open(os.path.join(path, 'meta.json'), 'w') as file:
+        json.dump({'columns': names, 'rows': n_rows, 'meta': meta or {}}, file, indent=2)
+    return path
+
+
+# Concatenate stored tables row-wise into a new table one column at a time, so the result can be far larger
+# than memory; every part must have the same columns
+def concat(name, parts, meta=None, root=None):
+    infos = [info(part, root) for part in parts]
+    names = infos[0]['columns']
+    n_rows = sum(i['rows'] for i in infos)
+    path = _path(name, root)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    for column in names:
+        first = np.load(os.path.join(_path(parts[0], root), f'{column}.npy'), mmap_mode='r')
+        out = np.lib.format.open_memmap(os.path.join(path, f'{column}.npy'), mode='w+', dtype=first.dtype,
+                                        shape=(n_rows,))
+        start = 0
+        for part, part_info in zip(parts, infos):
+            out[start:start + part_info['rows']] = np.load(os.path.join(_path(part, root), f'{column}.npy'),
+                                                           mmap_mode='r')
+            start += part_info['rows']
+        out.flush()
+        del out
+    with open(os.path.join(path, 'meta.json'), 'w') as file:
+        json.dump({'columns': names, 'rows': n_rows, 'meta': meta or {}}, file, indent=2)
+    return path
+
+
+######### READING ###########
+def info(name, root=None):
+    with open(os.path.join(_path(name, root), 'meta.json')) as file:
+        return json.load(file)
+
+
+def load(name, columns=None, mmap=True, root=None):
+    path = _path(name, root)
+    columns = columns or info(name, root)['columns']
+    mode = 'r' if mmap else None
+    return {c: np.load(os.path.join(path, f'{c}.npy'), mmap_mode=mode) for c in columns}
+
+
+# Yield the table in row slices so large sweeps never need to be fully in memory
+def iter_chunks(name, chunk_rows=1_000_000, columns=None, root=None):
+    table = load(name, columns, mmap=True, root=root)
+    n_rows = info(name, root)['rows']
+    for start in range(0, n_rows, chunk_rows):
+        yield start, {c: np.asarray(v[start:start + chunk_rows]) for c, v in table.items()}
+
+
+def list_tables(root=None):
+    root = root or ROOT
+    names = []
+    for folder, dirs, files in os.walk(root):
+        if 'meta.json' in files:
+            names.append(os.path.relpath(folder, root).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def delete(name, root=None):
+    shutil.rmtree(_path(name, root))
@@ -0,0 +1,119 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Performance Response Surfaces from Cached Sweeps
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import numpy as np
+
+import properties
+import store
+
+
+######### SURFACE GRID ###########
+# Same boiler pressures as the Design*Data archives and the design scripts' Th range
+SURFACE_P1 = np.arange(10, 101, 10)  # (bar)
+SURFACE_TH = np.arange(673, 874, 10)  # (Kelvin)
+
+# Load does not enter the cycle model: Wnet only scales the mass flow, so every metric per unit mass
+# (efficiencies, BWR, y-fractions) is a function of (p1, Th) alone and flow-type metrics scale with load
+
+
+def surface_name(design, cogeneration=False):
+    return f"surfaces/design{design}" + ("_chp" if cogeneration else "")
+
+
+# Solve the grid once and cache it in the result store; constrained surfaces are NaN where a point breaks
+# the operating envelope, so optimum() never picks it
+def build_surface(design, p1_values=SURFACE_P1, Th_values=SURFACE_TH, cogeneration=False, constrained=False,
+                  backend=None):
+    import cycle
+    p1, Th = np.meshgrid(np.asarray(p1_values, dtype=float), np.asarray(Th_values, dtype=float), indexing='ij')
+    if constrained:
+        import constraints
+        table = constraints.solve_feasible(design, p1.ravel(), Th.ravel(), cogeneration=cogeneration, backend=backend)
+    elif cogeneration:
+        table = cycle.solve_cogeneration(design, p1.ravel(), Th.ravel(), backend=backend)
+    else:
+        table = cycle.solve(design, p1.ravel(), Th.ravel(), backend=backend)
+    meta = {
+        'design': design,
+        'cogeneration': cogeneration,
+        'constrained': constrained,
+        'backend': backend or properties.active_backend(),
+        'revision': cycle.REVISION,
+        'p1_axis': [float(v) for v in p1_values],
+        'Th_axis': [float(v) for v in Th_values],
+    }
+    store.save(surface_name(design, cogeneration), table, meta)
+    return Surface(table, meta)
+
+
+# Surfaces cached by an older solver (cycle.REVISION) hold the scripts' efficiencies and must be rebuilt
+def load_surface(design, cogeneration=False):
+    import cycle
+    name = surface_name(design, cogeneration)
+    build = f"python cli.py surface --design {design}" + (" --cogeneration" if cogeneration else "")
+    if not store.exists(name):
+        raise LookupError(f"No cached surface '{name}'; build it first with '{build}'")
+    meta = store.info(name)['meta']
+    if meta.get('revision') != cycle.REVISION:
+        raise LookupError(f"Cached surface '{name}' was built by an older solver; rebuild it with '{build}'")
+    return Surface(store.load(name, mmap=False), meta)
+
+
+######### INTERPOLATION ###########
+def _cell(axis, x):
+    i = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+    w = (x - axis[i]) / (axis[i + 1] - axis[i])
+    inside = (x >= axis[0]) & (x <= axis[-1])
+    return i, w, inside
+
+
+class Surface:
+
+    def __init__(self, table, meta):
+        self.meta = meta
+        self.design = meta['design']
+        self.p1 = np.asarray(meta['p1_axis'])
+        self.Th = np.asarray(meta['Th_axis'])
+        shape = (len(self.p1), len(self.Th))
+        self.grids = {name: np.asarray(values, dtype=float).reshape(shape) for name, values in table.items()}
+
+    def bounds(self):
+        return (self.p1[0], self.p1[-1]), (self.Th[0], self.Th[-1])
+
+    # Bilinear interpolation of one metric; points outside the solved grid are NaN
+    def __call__(self, metric, p1, Th):
+        p1, Th = np.broadcast_arrays(np.asarray(p1, dtype=float), np.asarray(Th, dtype=float))
+        grid = self.grids[metric]
+        i, u, in_p = _cell(self.p1, p1)
+        j, w, in_T = _cell(self.Th, Th)
+        value = ((1 - u) * (1 - w) * grid[i, j] + u * (1 - w) * grid[i + 1, j]
+                 + (1 - u) * w * grid[i, j + 1] + u * w * grid[i + 1, j + 1])
+        return np.where(in_p & in_T, value, np.nan)
+
+    # Best value of a metric on a refined grid inside optional (p1, Th) bounds
+    def optimum(self, metric, p1_bounds=None, Th_bounds=None, n=201, maximize=True):
+        (p_lo, p_hi), (T_lo, T_hi) = self.bounds()
+        p_lo, p_hi = p1_bounds or (p_lo, p_hi)
+        T_lo, T_hi = Th_bounds or (T_lo, T_hi)
+        p1, Th = np.meshgrid(np.linspace(p_lo, p_hi, n), np.linspace(T_lo, T_hi, n), indexing='ij')
+        values = self(metric, p1, Th)
+        k = np.nanargmax(values) if maximize else np.nanargmin(values)
+        return float(p1.flat[k]), float(Th.flat[k]), float(values.flat[k])
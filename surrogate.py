@@ -0,0 +1,240 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Surrogate Models of the Cycle Solver
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import itertools
+import os
+import numpy as np
+
+
+######### INPUTS AND OUTPUTS ###########
+INPUTS = ('p1', 'Th', 'turbEff', 'pumpEff')
+OUTPUTS = ('thermal_eff', 'm_dot', 'BWR', 'Q_out_steam')
+
+# (low, high) of every input the surrogates are trained over
+DOMAIN = {
+    'p1': (10.0, 100.0),  # (bar)
+    'Th': (673.0, 873.0),  # (Kelvin)
+    'turbEff': (0.70, 0.95),
+    'pumpEff': (0.60, 0.95),
+}
+
+KINDS = ('poly', 'rbf', 'spline')
+
+
+def _bounds():
+    return np.array([DOMAIN[name] for name in INPUTS]).T
+
+
+def _scale(X, lo, hi):
+    return 2 * (X - lo) / (hi - lo) - 1
+
+
+# Latin hypercube sample of the domain, shape (n, len(INPUTS))
+def latin_hypercube(n, rng):
+    lo, hi = _bounds()
+    u = (np.argsort(rng.random((len(INPUTS), n)), axis=1).T + rng.random((n, len(INPUTS)))) / n
+    return lo + u * (hi - lo)
+
+
+######### BASIS FUNCTIONS ###########
+# Monomials of total degree <= degree in the scaled inputs
+def _poly_exponents(degree, dims=len(INPUTS)):
+    return np.array([e for e in itertools.product(range(degree + 1), repeat=dims) if sum(e) <= degree])
+
+
+def _poly_basis(Z, exponents):
+    return np.prod(Z[:, None, :] ** exponents[None, :, :], axis=2)
+
+
+# Uniform cubic B-splines on [-1, 1], tensor product over all inputs
+def _bspline_1d(z, n_basis):
+    h = 2.0 / (n_basis - 3)
+    t = np.abs((z[:, None] + 1) / h - (np.arange(n_basis) - 1))
+    return np.where(t < 1, (4 - 6 * t**2 + 3 * t**3) / 6, np.where(t < 2, (2 - t)**3 / 6, 0.0))
+
+
+def _spline_basis(Z, n_basis):
+    A = np.ones((len(Z), 1))
+    for d in range(Z.shape[1]):
+        A = (A[:, :, None] * _bspline_1d(Z[:, d], n_basis)[:, None, :]).reshape(len(Z), -1)
+    return A
+
+
+def _rbf_kernel(Z, centers):
+    r = np.sqrt(((Z[:, None, :] - centers[None, :, :])**2).sum(axis=2))
+    return r**3
+
+
+# Coefficients a fit solves for per output: 126 monomials at degree 5, n_basis**4 tensor splines (625 at 5);
+# the RBF interpolates its samples and only needs enough of them for its linear tail
+def basis_size(kind, degree=4, n_basis=5, dims=len(INPUTS)):
+    if kind == 'poly':
+        return len(_poly_exponents(degree, dims))
+    if kind == 'spline':
+        return n_basis ** dims
+    return dims + 1
+
+
+######### SURROGATE MODEL ###########
+class Surrogate:
+
+    def __init__(self, kind, design, arrays, errors=None):
+        self.kind = kind
+        self.design = design
+        self.arrays = arrays
+        self.errors = errors or {}
+
+    # Vectorized prediction: X is (n, len(INPUTS)); returns {output: (n,)}
+    def predict(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        Z = _scale(X, self.arrays['lo'], self.arrays['hi'])
+        a = self.arrays
+        if self.kind == 'poly':
+            Y = _poly_basis(Z, a['exponents']) @ a['coef']
+        elif self.kind == 'spline':
+            Y = _spline_basis(Z, int(a['n_basis'])) @ a['coef']
+        else:
+            Y = _rbf_kernel(Z, a['centers']) @ a['weights'] + np.column_stack([np.ones(len(Z)), Z]) @ a['tail']
+        Y = Y * a['y_std'] + a['y_mean']
+        return {name: Y[:, k] for k, name in enumerate(OUTPUTS)}
+
+    def __call__(self, p1, Th, turbEff=0.87, pumpEff=0.8):
+        X = np.column_stack(np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float))
+                                                  for v in (p1, Th, turbEff, pumpEff)]))
+        return self.predict(X)
+
+    ######### SERIALIZATION ###########
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        errors = {f'err_{stat}_{name}': value for stat, values in self.errors.items() for name, value in values.items()}
+        np.savez_compressed(path, kind=self.kind, design=self.design, **self.arrays, **errors)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            arrays = {k: data[k] for k in data.files if k not in ('kind', 'design') and not k.startswith('err_')}
+            errors = {}
+            for key in data.files:
+                if key.startswith('err_'):
+                    stat, name = key[4:].split('_', 1)
+                    errors.setdefault(stat, {})[name] = float(data[key])
+            return Surrogate(str(data['kind']), int(data['design']), arrays, errors)
+
+
+######### FITTING ###########
+def fit(kind, design, X, Y, degree=4, n_basis=5, ridge=1e-8):
+    size = basis_size(kind, degree, n_basis)
+    if len(X) < size:
+        raise ValueError(f"A {kind} surrogate fits {size} coefficients per output, got only {len(X)} samples")
+    lo, hi = _bounds()
+    Z = _scale(X, lo, hi)
+    y_mean, y_std = Y.mean(axis=0), Y.std(axis=0)
+    y_std = np.where(y_std > 0, y_std, 1.0)
+    T = (Y - y_mean) / y_std
+    arrays = {'lo': lo, 'hi': hi, 'y_mean': y_mean, 'y_std': y_std}
+
+    if kind == 'poly':
+        exponents = _poly_exponents(degree)
+        arrays['exponents'] = exponents
+        arrays['coef'] = np.linalg.lstsq(_poly_basis(Z, exponents), T, rcond=None)[0]
+    elif kind == 'spline':
+        A = _spline_basis(Z, n_basis)
+        arrays['n_basis'] = np.array(n_basis)
+        arrays['coef'] = np.linalg.solve(A.T @ A + ridge * len(Z) * np.eye(A.shape[1]), A.T @ T)
+    elif kind == 'rbf':
+        # Cubic RBF interpolant with a linear polynomial tail
+        n, d = Z.shape
+        P = np.column_stack([np.ones(n), Z])
+        M = np.block([[_rbf_kernel(Z, Z), P], [P.T, np.zeros((d + 1, d + 1))]])
+        rhs = np.vstack([T, np.zeros((d + 1, T.shape[1]))])
+        sol = np.linalg.lstsq(M, rhs, rcond=None)[0]
+        arrays['centers'] = Z
+        arrays['weights'] = sol[:n]
+        arrays['tail'] = sol[n:]
+    else:
+        raise ValueError(f"Unknown surrogate kind '{kind}', choose from {KINDS}")
+    return Surrogate(kind, design, arrays)
+
+
+######### SAMPLING THE REAL SOLVER ###########
+def sample_solver(design, X, backend=None):
+    import cycle
+    result = cycle.solve(design, X[:, 0], X[:, 1], turbEff=X[:, 2], pumpEff=X[:, 3], backend=backend)
+    Y = np.column_stack([result[name] for name in OUTPUTS])
+    ok = np.all(np.isfinite(Y), axis=1)
+    return X[ok], Y[ok]
+
+
+def error_bounds(model, X, Y):
+    P = np.column_stack([model.predict(X)[name] for name in OUTPUTS])
+    err = np.abs(P - Y)
+    scale = np.maximum(np.abs(Y), 1e-12)
+    return {
+        'maxabs': dict(zip(OUTPUTS, err.max(axis=0).tolist())),
+        'rms': dict(zip(OUTPUTS, np.sqrt((err**2).mean(axis=0)).tolist())),
+        'maxrel': dict(zip(OUTPUTS, (err / scale).max(axis=0).tolist())),
+    }
+
+
+# Committee members are fit on this fraction of the samples, and the initial design holds OVERSAMPLE times
+# the basis size in every member, so no round fits more coefficients than it has samples
+COMMITTEE_FRACTION = 0.8
+OVERSAMPLE = 1.5
+
+
+# Adaptive build: start from a Latin hypercube, then each round fit a committee of models on random
+# subsets and solve the candidates where the committee disagrees most. Error bounds come from
+# held-out points that are never used for fitting. tol stops early once the largest disagreement,
+# in units of each output's standard deviation, falls below it. n_initial is raised to what the basis needs.
+def build(design, kind='poly', n_initial=60, n_add=30, rounds=6, n_test=300, n_candidates=3000,
+          committee=5, tol=None, seed=0, backend=None, **fit_options):
+    rng = np.random.default_rng(seed)
+    size = basis_size(kind, fit_options.get('degree', 4), fit_options.get('n_basis', 5))
+    n_initial = max(n_initial, int(np.ceil(OVERSAMPLE * size / COMMITTEE_FRACTION)))
+    X, Y = sample_solver(design, latin_hypercube(n_initial, rng), backend)
+    history = []
+    for _ in range(rounds):
+        candidates = latin_hypercube(n_candidates, rng)
+        predictions = []
+        for _ in range(committee):
+            keep = rng.random(len(X)) < COMMITTEE_FRACTION
+            member = fit(kind, design, X[keep], Y[keep], **fit_options)
+            P = member.predict(candidates)
+            predictions.append(np.column_stack([P[name] for name in OUTPUTS]) / np.maximum(Y.std(axis=0), 1e-12))
+        spread = np.std(predictions, axis=0).max(axis=1)
+        history.append(float(spread.max()))
+        if tol is not None and history[-1] < tol:
+            break
+        picks = candidates[np.argsort(spread)[-n_add:]]
+        X_new, Y_new = sample_solver(design, picks, backend)
+        X, Y = np.vstack([X, X_new]), np.vstack([Y, Y_new])
+
+    model = fit(kind, design, X, Y, **fit_options)
+    X_test, Y_test = sample_solver(design, latin_hypercube(n_test, np.random.default_rng(seed + 1)), backend)
+    model.errors = error_bounds(model, X_test, Y_test)
+    model.arrays['n_samples'] = np.array(len(X))
+    model.arrays['spread_history'] = np.array(history)
+    return model
+
+
+def surrogate_path(design, kind):
+    import store
+    return os.path.join(store.ROOT, 'surrogates', f'design{design}_{kind}.npz')
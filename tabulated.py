@@ -0,0 +1,243 @@
+# --------------------------------------------------------------------------------------------------------
+
+
+'''
+Names:
+
+
+Bagalavan Thurai
+George D.
+Hamza Hashemi
+Hamzah Chamas
+Mohammad Ali
+
+
+Code Title: Tabulated Steam Property Backend
+'''
+
+
+# --------------------------------------------------------------------------------------------------------
+
+
+import os
+import numpy as np
+
+
+######### TABLE SETTINGS ###########
+TABLE_VERSION = 1
+CACHE_DIR = os.environ.get('RANKINE_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+T_TRIPLE = 273.16  # (Kelvin) Lowest saturation temperature in the table
+T_SAT_MAX = 645.0  # (Kelvin) Highest saturation temperature, just under the critical point
+T_MAX = 1000.0  # (Kelvin) Highest superheated temperature in the table
+P_MIN = 0.006  # (bar) Lowest pressure row of the superheated table
+P_MAX = 200.0  # (bar) Highest pressure row of the superheated table
+P_ATM = 1.01325  # (bar) PYroMat default pressure when only T is given
+
+N_SAT = 800
+N_P = 160
+N_THETA = 120
+
+
+######### TABLE GENERATION ###########
+# Superheated rows are stored against theta = (T - Ts(p)) / (T_MAX - Ts(p)) so that no row crosses the dome
+def build_tables(source):
+    from properties import get_backend
+    steam = get_backend(source)
+
+    Tsat = np.linspace(T_TRIPLE, T_SAT_MAX, N_SAT)
+    sat = {
+        'Tsat': Tsat,
+        'lpsat': np.log(steam.p(T=Tsat, x=0)),
+        'hf': steam.h(T=Tsat, x=0),
+        'hg': steam.h(T=Tsat, x=1),
+        'sf': steam.s(T=Tsat, x=0),
+        'sg': steam.s(T=Tsat, x=1),
+        'df': steam.d(T=Tsat, x=0),
+    }
+
+    lp = np.linspace(np.log(P_MIN), np.log(P_MAX), N_P)
+    theta = np.linspace(0.0, 1.0, N_THETA)**2
+    theta[0] = 1e-5
+    p = np.exp(lp)[:, None] * np.ones(N_THETA)
+    Ts = np.interp(lp, sat['lpsat'], Tsat)[:, None]
+    T = Ts + theta * (T_MAX - Ts)
+
+    vap = {
+        'lp': lp,
+        'theta': theta,
+        'h': steam.h(T=T.ravel(), p=p.ravel()).reshape(T.shape),
+        's': steam.s(T=T.ravel(), p=p.ravel()).reshape(T.shape),
+        'd': steam.d(T=T.ravel(), p=p.ravel()).reshape(T.shape),
+    }
+    return dict(sat, **vap)
+
+
+# Load cached tables for a source backend, building and saving them on first use
+def load_tables(source='pyromat'):
+    path = os.path.join(CACHE_DIR, f'steam_tables_{source}_v{TABLE_VERSION}.npz')
+    if os.path.exists(path):
+        with np.load(path) as data:
+            tables = {key: data[key] for key in data.files}
+    else:
+        tables = build_tables(source)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.savez_compressed(path, **tables)
+    return TabulatedSteam(tables)
+
+
+######### INTERPOLATION HELPERS ###########
+# Linear interpolation along the last axis where every row has its own monotonic x values
+def _interp_rows(x_rows, y_rows, xq):
+    x_rows = np.broadcast_to(x_rows, y_rows.shape)
+    j = (x_rows <= xq[:, None]).sum(axis=1) - 1
+    j = np.clip(j, 0, x_rows.shape[1] - 2)
+    r = np.arange(len(xq))
+    x0, x1 = x_rows[r, j], x_rows[r, j + 1]
+    y0, y1 = y_rows[r, j], y_rows[r, j + 1]
+    return y0 + (y1 - y0) * (xq - x0) / (x1 - x0)
+
+
+def _array(*args):
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(a, dtype=float)) for a in args])
+    return [a.ravel() for a in arrays]
+
+
+class TabulatedSteam:
+
+    def __init__(self, tables):
+        self.t = tables
+
+    ######### SATURATION ###########
+    def _sat_T(self, T, key):
+        return np.interp(T, self.t['Tsat'], self.t[key], left=np.nan, right=np.nan)
+
+    def _sat_p(self, p, key):
+        return np.interp(np.log(p), self.t['lpsat'], self.t[key], left=np.nan, right=np.nan)
+
+    def _sat(self, key, T=None, p=None):
+        if T is not None:
+            return self._sat_T(T, key)
+        return self._sat_p(p, key)
+
+    def Ts(self, p):
+        p, = _array(p)
+        return self._sat_p(p, 'Tsat')
+
+    def ps(self, T):
+        T, = _array(T)
+        return np.exp(self._sat_T(T, 'lpsat'))
+
+    ######### SUPERHEATED ROWS ###########
+    # Interpolate whole theta rows to the requested pressures (linear in log p)
+    def _rows(self, p, key):
+        lp = np.log(p)
+        i = np.clip(np.searchsorted(self.t['lp'], lp) - 1, 0, len(self.t['lp']) - 2)
+        w = ((lp - self.t['lp'][i]) / (self.t['lp'][i + 1] - self.t['lp'][i]))[:, None]
+        return self.t[key][i] * (1 - w) + self.t[key][i + 1] * w
+
+    def _theta(self, T, p):
+        Ts = self.Ts(p)
+        theta = (T - Ts) / (T_MAX - Ts)
+        return np.where(theta >= 0, theta, np.nan)
+
+    def _vapour_Tp(self, key, T, p):
+        return _interp_rows(self.t['theta'], self._rows(p, key), self._theta(T, p))
+
+    ######### COMPRESSED LIQUID ###########
+    # Below Ts(p): saturated liquid at T corrected to p with (dh/dp)_T = v (1 - T beta) and (ds/dp)_T = -v beta,
+    # beta being the thermal expansion along the saturated liquid line; the density is taken as incompressible
+    def _liquid_Tp(self, key, T, p):
+        df = self._sat_T(T, 'df')
+        if key == 'd':
+            return df
+        beta = -np.interp(T, self.t['Tsat'], np.gradient(np.log(self.t['df']), self.t['Tsat']))
+        dp = (p - self.ps(T)) * 100 / df  # (kJ/kg) v (p - ps)
+        if key == 'h':
+            return self._sat_T(T, 'hf') + dp * (1 - T * beta)
+        return self._sat_T(T, 'sf') - dp * beta
+
+    # Temperature of a liquid state from its entropy or enthalpy at p, with one correction step for the pressure
+    def _liquid_T(self, key, value, p):
+        line = self.t[key + 'f']
+        T = np.interp(value, line, self.t['Tsat'], left=np.nan, right=np.nan)
+        saturated = value - (self._liquid_Tp(key, T, p) - self._sat_T(T, key + 'f'))
+        return np.interp(saturated, line, self.t['Tsat'], left=np.nan, right=np.nan)
+
+    def _Tp(self, key, T, p):
+        T, p = _array(T, P_ATM if p is None else p)
+        liquid = T < self.Ts(p)
+        return np.where(liquid, self._liquid_Tp(key, T, p), self._vapour_Tp(key, T, p))
+
+    # Invert a vapour row for theta, then read another property at that theta
+    def _vapour_inverse(self, key_in, value, p, key_out):
+        theta = _interp_rows(self._rows(p, key_in), np.broadcast_to(self.t['theta'], (len(p), N_THETA)), value)
+        return _interp_rows(self.t['theta'], self._rows(p, key_out), theta)
+
+    ######### PROPERTY CALLS ###########
+    def h(self, T=None, p=None, s=None, x=None):
+        if x is not None:
+            return self._quality('h', *self._saturation_args(T, p, x))
+        if s is not None:
+            s, p = _array(s, p)
+            return self._from_entropy('h', s, p)
+        return self._Tp('h', T, p)
+
+    def s(self, T=None, p=None, h=None, x=None):
+        if x is not None:
+            return self._quality('s', *self._saturation_args(T, p, x))
+        if h is not None:
+            h, p = _array(h, p)
+            return self._from_enthalpy('s', h, p)
+        return self._Tp('s', T, p)
+
+    def d(self, T=None, p=None, x=None):
+        if x is not None:
+            if T is not None:
+                T, x = _array(T, x)
+                df = self._sat_T(T, 'df')
+            else:
+                p, x = _array(p, x)
+                df = self._sat_p(p, 'df')
+            if np.any(x != 0):
+                raise ValueError("Tabulated backend only stores saturated liquid density (x=0)")
+            return df
+        return self._Tp('d', T, p)
+
+    # Pressure from temperature and entropy, which is the saturation pressure inside the dome
+    def p(self, T=None, s=None, x=None):
+        if s is None:
+            T, = _array(T)
+            return self.ps(T) if x is not None else np.full(T.shape, P_ATM)
+        T, s = _array(T, s)
+        inside = (s >= self._sat_T(T, 'sf')) & (s <= self._sat_T(T, 'sg'))
+        return np.where(inside, self.ps(T), np.nan)
+
+    ######### TWO-PHASE AND INVERSE CALLS ###########
+    # Saturation states are fixed by either T or p together with the quality x
+    def _saturation_args(self, T, p, x):
+        if T is not None:
+            T, x = _array(T, x)
+            return T, None, x
+        p, x = _array(p, x)
+        return None, p, x
+
+    def _quality(self, key, T, p, x):
+        f, g = key + 'f', key + 'g'
+        return (1 - x) * self._sat(f, T, p) + x * self._sat(g, T, p)
+
+    def _from_entropy(self, key, s, p):
+        sf, sg = self._sat_p(p, 'sf'), self._sat_p(p, 'sg')
+        x = (s - sf) / (sg - sf)
+        wet = self._quality(key, None, p, x)
+        dry = self._vapour_inverse('s', s, p, key)
+        liquid = self._liquid_Tp(key, self._liquid_T('s', s, p), p)
+        return np.where(x <= 1, np.where(x >= 0, wet, liquid), dry)
+
+    def _from_enthalpy(self, key, h, p):
+        hf, hg = self._sat_p(p, 'hf'), self._sat_p(p, 'hg')
+        x = (h - hf) / (hg - hf)
+        wet = self._quality(key, None, p, x)
+        dry = self._vapour_inverse('h', h, p, key)
+        liquid = self._liquid_Tp(key, self._liquid_T('h', h, p), p)
+        return np.where(x <= 1, np.where(x >= 0, wet, liquid), dry)
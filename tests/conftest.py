@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Result store in a temporary folder for the tests that write tables
+@pytest.fixture
+def results(tmp_path, monkeypatch):
+    import store
+    monkeypatch.setattr(store, 'ROOT', str(tmp_path))
+    return tmp_path
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import adaptive
+import cycle
+
+
+@pytest.fixture(scope='module')
+def refined():
+    return adaptive.refine(1, backend='tabulated')
+
+
+# The coarse p1 interval whose midpoint linear interpolation misses by the most gets the most new lines
+def test_refinement_samples_where_error_is_largest(refined):
+    coarse = adaptive.COARSE_P1
+    middle = (coarse[:-1] + coarse[1:]) / 2
+    Th = np.full(len(coarse), adaptive.COARSE_TH[0])
+    ends = cycle.solve(1, coarse, Th, backend='tabulated')['thermal_eff']
+    midpoints = cycle.solve(1, middle, Th[1:], backend='tabulated')['thermal_eff']
+    error = np.abs(midpoints - (ends[:-1] + ends[1:]) / 2)
+
+    lines = np.unique(refined['p1'])
+    added = np.array([np.sum((lines > lo) & (lines < hi)) for lo, hi in zip(coarse[:-1], coarse[1:])])
+    assert np.argmax(added) == np.argmax(error)
+    assert np.all(np.diff(added[np.argsort(error)]) >= 0)
+
+
+def test_interpolation_reproduces_solver_within_tolerance(refined):
+    rng = np.random.default_rng(0)
+    p1, Th = rng.uniform(10, 100, 500), rng.uniform(673, 873, 500)
+    solved = cycle.solve(1, p1, Th, backend='tabulated')['thermal_eff']
+    error = np.abs(adaptive.interpolate(refined, 'thermal_eff', p1, Th) - solved)
+    assert np.max(error) <= adaptive.TOL['thermal_eff']
+    # and the table holds the solver's values at its own samples
+    np.testing.assert_allclose(adaptive.interpolate(refined, 'thermal_eff', refined['p1'], refined['Th']),
+                               refined['thermal_eff'])
@@ -0,0 +1,51 @@
+import numpy as np
+
+import archive
+import constraints
+import cycle
+import properties
+
+
+def test_evaluate_archive_table():
+    table = archive.load_archive(3)
+    values = constraints.evaluate(3, table, backend='tabulated')
+    assert len(values['feasible']) == len(table['p1'])
+    assert np.all(np.isfinite(values['x_exhaust']))
+    assert values['feasible'].any() and not values['feasible'].all()
+
+
+def test_archive_pressure_levels_match_solver():
+    table = archive.load_archive(1, 50)
+    solved = cycle.solve(1, table['p1'], table['Th'], backend='tabulated')
+    for k in range(2, 6):
+        np.testing.assert_allclose(table[f'p{k}'], solved[f'p{k}'], rtol=1e-4)
+
+
+# The constrained cogeneration solve finishes the states it expanded instead of solving the points again
+def test_feasible_cogeneration_reuses_expanded_states(monkeypatch):
+    p1, Th = np.array([10.0, 50.0, 90.0, 50.0]), np.array([873.0, 800.0, 873.0, 680.0])
+    reference = cycle.solve_cogeneration(1, p1, Th, backend='tabulated')
+
+    def resolve(*args, **kwargs):
+        raise AssertionError("solve_feasible solved the points again")
+
+    monkeypatch.setattr(cycle, 'solve_cogeneration', resolve)
+    table = constraints.solve_feasible(1, p1, Th, cogeneration=True, backend='tabulated')
+    feasible = table['feasible'] == 1
+    assert feasible.any() and not feasible.all()
+    for name in ('W_net', 'Q_dh', 'Q_boiler', 'elec_eff', 'chp_eff'):
+        np.testing.assert_allclose(table[name][feasible], reference[name][feasible], err_msg=name)
+        assert np.all(np.isnan(table[name][~feasible]))
+
+
+# Wherever the scripts' equal steps meet the turbine limits, the optimal bleeds do too
+def test_optimal_bleeds_stay_feasible():
+    steam = properties.get_backend('tabulated')
+    p1, Th = np.meshgrid(np.arange(10.0, 101.0, 10.0), np.arange(673.0, 874.0, 20.0), indexing='ij')
+    for design in (1, 2):
+        equal = cycle.solve_state(design, p1.ravel(), Th.ravel(), backend='tabulated', bleeds='equal')
+        optimal = cycle.solve_state(design, p1.ravel(), Th.ravel(), backend='tabulated', bleeds='optimal')
+        equal_ok, _ = constraints.turbine_states(steam, equal)
+        optimal_ok, _ = constraints.turbine_states(steam, optimal)
+        assert not equal_ok.all()
+        assert np.all(optimal_ok[equal_ok])
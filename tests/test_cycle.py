@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import archive
+import cycle
+
+
+P1 = [50.0, 60.0]
+TH = [800.0, 800.0]
+
+
+def test_cogeneration_keeps_zero_heat_demand():
+    result = cycle.solve_cogeneration(1, P1, TH, Qout=0, backend='tabulated')
+    assert np.all(result['Q_dh'] == 0)
+    assert np.all(result['m_dot_dh'] == 0)
+    np.testing.assert_allclose(result['chp_eff'], result['elec_eff'])
+
+
+def test_cogeneration_keeps_zero_net_work():
+    result = cycle.solve_cogeneration(1, P1, TH, Wnet=0, backend='tabulated')
+    default = cycle.solve_cogeneration(1, P1, TH, backend='tabulated')
+    assert np.all(result['elec_eff'] == 0)
+    np.testing.assert_allclose(result['Q_dh'], cycle.DEFAULTS['Qout'])
+    assert np.all(result['Q_boiler'] < default['Q_boiler'])
+
+
+# Archived rows of one boiler pressure per design, solved the way the scripts did
+@pytest.mark.parametrize('design', [1, 2, 3])
+def test_legacy_solve_matches_archive(design):
+    golden = archive.load_archive(design)
+    rows = golden['p1'] == 50.0
+    solved = cycle.solve(design, golden['p1'][rows], golden['Th'][rows], backend='pyromat', legacy=True)
+    for name in cycle.columns(design):
+        if name in golden and name != 'm_dot_cw':  # cooling water flow is compared in test_regression.py
+            scale = np.max(np.abs(golden[name][rows]))
+            np.testing.assert_allclose(solved[name], golden[name][rows], rtol=1e-6, atol=1e-9 * scale, err_msg=name)
+
+
+@pytest.mark.parametrize('design', [1, 2, 3])
+def test_solve_stays_below_carnot(design):
+    p1, Th = np.meshgrid(np.arange(10.0, 101.0, 10.0), np.arange(673.0, 874.0, 50.0), indexing='ij')
+    result = cycle.solve(design, p1.ravel(), Th.ravel(), backend='tabulated')
+    assert np.all(result['thermal_eff'] > 0)
+    assert np.all(result['thermal_eff'] < 1 - result['tc'] / result['Th'])
+
+
+def test_corrected_design1_differs_from_scripts_only_in_the_train():
+    legacy = cycle.solve(1, P1, TH, backend='tabulated', legacy=True)
+    result = cycle.solve(1, P1, TH, backend='tabulated')
+    for name in ('h1', 'h2', 'h3', 'h4', 'p5', 'Q_in'):
+        np.testing.assert_allclose(result[name], legacy[name])
+    assert np.all(result['h5'] > legacy['h5'])
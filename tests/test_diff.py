@@ -0,0 +1,49 @@
+import numpy as np
+
+import diff
+import store
+
+
+def _tables(n=12, changed=()):
+    p1, Th = np.meshgrid(np.linspace(10, 100, 4), np.linspace(673, 873, n // 4), indexing='ij')
+    a = {'p1': p1.ravel(), 'Th': Th.ravel(), 'thermal_eff': np.linspace(0.3, 0.4, n)}
+    b = {name: values.copy() for name, values in a.items()}
+    for row in changed:
+        b['thermal_eff'][row] *= 1.01
+    store.save('a', a, {'design': 1})
+    store.save('b', b, {'design': 1})
+
+
+def test_largest_changes_only_lists_changed_rows(results):
+    _tables(changed=(3, 7))
+    report = diff.compare('a', 'b', top=5)
+    largest = report['columns']['thermal_eff']['largest']
+    assert report['columns']['thermal_eff']['changed'] == 2
+    assert len(largest) == 2
+    assert all(item['rel'] > 0 for item in largest)
+
+
+def test_colliding_hashes_are_not_merged(results, monkeypatch):
+    monkeypatch.setattr(diff, '_hash', lambda records: np.zeros(len(records), dtype=np.uint64))
+    _tables(changed=(5,))
+    report = diff.compare('a', 'b')
+    assert report['matched'] == 12 and report['only_b'] == 0
+    assert report['duplicate_keys_b'] == 0
+    largest, = report['columns']['thermal_eff']['largest']
+    assert (largest['p1'], largest['Th']) == (40.0, 873.0)
+
+
+# Splitting B's key index into hash partitions gives the same report as one index over all of B
+def test_partitioned_index_matches_single_pass(results):
+    _tables(n=40, changed=(2, 11, 30))
+    b = store.load('b', mmap=False)
+    extra = {name: np.r_[values, values[:3]] for name, values in b.items()}  # two keys only in B and one repeated key
+    extra['p1'][-3:] += 0.5
+    extra['p1'][-1] = extra['p1'][0]
+    store.save('b', extra, {'design': 1})
+    single = diff.compare('a', 'b', chunk_rows=7)
+    split = diff.compare('a', 'b', chunk_rows=7, partitions=4)
+    assert split['partitions'] == 4
+    for name in ('matched', 'only_a', 'only_b', 'duplicate_keys_b', 'columns', 'regions'):
+        assert split[name] == single[name], name
+    assert single['only_b'] == 3 and single['duplicate_keys_b'] == 1
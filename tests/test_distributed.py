@@ -0,0 +1,45 @@
+import contextlib
+import time
+
+import distributed
+import store
+
+
+AXES = {'p1': [50.0, 60.0], 'Th': [800.0, 850.0]}
+
+
+def _create(job, **options):
+    return distributed.create(job, [1], AXES, backend='tabulated', **options)
+
+
+def test_expired_lease_is_failed_after_max_attempts(results):
+    _create('dying', lease=0.0, max_attempts=3)
+    with contextlib.closing(distributed._connect('dying')) as connection:
+        for attempt in range(3):
+            unit = distributed.claim(connection, f'worker{attempt}', 0.0, 3)  # every worker dies at once
+            assert unit is not None
+            time.sleep(0.01)
+        assert distributed.claim(connection, 'worker3', 0.0, 3) is None
+    report = distributed.status('dying')
+    assert report['counts'] == {'failed': 1}
+    assert 'lease expired' in report['errors'][0]['error']
+
+
+def test_renewed_lease_is_not_claimed_twice(results):
+    _create('slow', lease=0.05)
+    with contextlib.closing(distributed._connect('slow')) as connection:
+        unit = distributed.claim(connection, 'slow', 0.05)
+        for _ in range(4):
+            time.sleep(0.03)
+            assert distributed.renew(connection, unit['id'], 'slow', 0.05)
+        assert distributed.claim(connection, 'other', 0.05) is None
+        time.sleep(0.1)
+        assert distributed.claim(connection, 'other', 0.05)['id'] == unit['id']
+        assert not distributed.renew(connection, unit['id'], 'slow', 0.05)
+
+
+def test_work_solves_units_in_chunks(results):
+    _create('chunks', unit_points=3, chunk_points=2)
+    assert distributed.work('chunks') == 2
+    name, = distributed.merge('chunks')
+    assert store.info(name)['rows'] == 4
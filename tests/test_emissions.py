@@ -0,0 +1,30 @@
+import numpy as np
+
+import cycle
+import emissions
+
+
+def test_weeks_start_on_iso_monday():
+    # 2026-01-04 is a Sunday and 2026-01-05 a Monday; hour 96 is Monday 00:00
+    labels = emissions.period_labels([95, 96, 96 + 24 * 7 - 1, 96 + 24 * 7], 'week', start='2026-01-01T00')
+    expected = np.array(['2025-12-29', '2026-01-05', '2026-01-05', '2026-01-12'], dtype='datetime64[D]')
+    np.testing.assert_array_equal(labels, expected)
+
+
+def test_weekly_aggregate_splits_at_monday():
+    table = emissions.aggregate({'power': np.ones(24 * 7)}, np.arange(24 * 7), 'week', start='2026-01-01T00')
+    assert list(table['period']) == ['2025-12-29', '2026-01-05']
+    np.testing.assert_array_equal(table['power'], [96, 72])
+
+
+def test_design2_schedule_uses_corrected_efficiency(results):
+    schedule = {'hour': np.arange(4), 'power': np.full(4, 80000.0), 'design': np.full(4, 2),
+                'p1': np.array([20.0, 20.0, 60.0, 60.0]), 'Th': np.array([843.0, 843.0, 773.0, 773.0])}
+    steps, summaries = emissions.run_schedule('design2', schedule, periods=('day',), backend='tabulated')
+    solved = cycle.solve(2, [20.0, 60.0], [843.0, 773.0], backend='tabulated')['thermal_eff']
+    legacy = cycle.solve(2, [20.0, 60.0], [843.0, 773.0], backend='tabulated', legacy=True)['thermal_eff']
+    np.testing.assert_allclose(steps['efficiency'], np.repeat(solved, 2))
+    assert np.all(steps['efficiency'] < 1 - 303.15 / schedule['Th'])
+    assert np.all(steps['efficiency'] < np.repeat(legacy, 2))
+    np.testing.assert_allclose(steps['co2_kg'], 80000.0 / steps['efficiency'] * emissions.fuel_factor('natural_gas'))
+    np.testing.assert_allclose(summaries['day']['co2_kg'], steps['co2_kg'].sum())
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import constraints
+import cycle
+import extraction
+import properties
+
+
+P1, TH = np.meshgrid(np.arange(10.0, 101.0, 30.0), np.arange(673.0, 874.0, 50.0), indexing='ij')
+
+
+@pytest.mark.parametrize('name', sorted(extraction.SCHEDULES))
+def test_schedule_is_ordered_between_condenser_and_boiler(name):
+    for design in (1, 2, 3):
+        state = cycle.solve_state(design, P1.ravel(), TH.ravel(), backend='tabulated', bleeds=name)
+        P = [state.P[k] for k in range(1, 6)]
+        for high, low in zip(P[:-1], P[1:]):
+            assert np.all(high > low), name
+
+
+# The search may only give up efficiency to leave an equal-step point that breaks the turbine limits
+def test_optimal_is_at_least_as_good_as_equal():
+    steam = properties.get_backend('tabulated')
+    for design in (1, 2, 3):
+        results = extraction.compare(design, P1.ravel(), TH.ravel(), ('equal', 'optimal'), backend='tabulated')
+        equal, optimal = (results[name]['regenerative_eff'] for name in ('equal', 'optimal'))
+        state = cycle.state_from_table(design, results['equal'])
+        feasible, _ = constraints.turbine_states(steam, state)
+        assert feasible.any()
+        assert np.all(optimal[feasible] >= equal[feasible] - 1e-9)
+        assert np.mean(optimal[feasible] - equal[feasible]) > 0
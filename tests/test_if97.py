@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import if97
+
+
+# Verification values of the IAPWS-IF97 release: T (K), p (MPa), v (m^3/kg), h (kJ/kg), s (kJ/kg/K), cp (kJ/kg/K)
+REGION_1 = [
+    (300.0, 3.0, 0.100215168e-2, 0.115331273e3, 0.392294792, 0.417301218e1),
+    (300.0, 80.0, 0.971180894e-3, 0.184142828e3, 0.368563852, 0.401008987e1),
+    (500.0, 3.0, 0.120241800e-2, 0.975542239e3, 0.258041912e1, 0.465580682e1),
+]
+REGION_2 = [
+    (300.0, 0.0035, 0.394913866e2, 0.254991145e4, 0.852238967e1, 0.191300162e1),
+    (700.0, 0.0035, 0.923015898e2, 0.333568375e4, 0.101749996e2, 0.208141274e1),
+    (700.0, 30.0, 0.542946619e-2, 0.263149474e4, 0.517540298e1, 0.103505092e2),
+]
+SATURATION_T = [(300.0, 0.353658941e-2), (500.0, 0.263889776e1), (600.0, 0.123443146e2)]
+SATURATION_P = [(0.1, 0.372755919e3), (1.0, 0.453035632e3), (10.0, 0.584149488e3)]
+
+
+@pytest.mark.parametrize('region, points', [(1, REGION_1), (2, REGION_2)])
+def test_region_verification_points(region, points):
+    T, p, v, h, s, cp = np.array(points).T
+    props = if97._region_properties(region, T, p)
+    for key, expected in (('v', v), ('h', h), ('s', s), ('cp', cp)):
+        np.testing.assert_allclose(props[key], expected, rtol=1e-8)
+
+
+def test_region_4_verification_points():
+    T, p = np.array(SATURATION_T).T
+    np.testing.assert_allclose(if97.psat(T), p, rtol=1e-8)
+    p, T = np.array(SATURATION_P).T
+    np.testing.assert_allclose(if97.Tsat(p), T, rtol=1e-8)
+
+
+# Backward temperatures of the release (its backward equations agree with the forward ones within 25 mK)
+def test_backward_temperatures():
+    np.testing.assert_allclose(if97.T_ph([3.0, 80.0, 80.0], [500.0, 500.0, 1500.0]),
+                               [0.391798509e3, 0.378108626e3, 0.611041229e3], atol=0.025)
+    np.testing.assert_allclose(if97.T_ps([3.0, 80.0, 80.0], [0.5, 0.5, 3.0]),
+                               [0.307842258e3, 0.309979785e3, 0.565899909e3], atol=0.025)
+    np.testing.assert_allclose(if97.T_ph([0.001, 3.0, 3.0], [3000.0, 3000.0, 4000.0]),
+                               [0.534433241e3, 0.575373370e3, 0.101077577e4], atol=0.025)
+
+
+def test_steam_object_units_and_single_phase_pressure():
+    steam = if97.IF97Steam()
+    np.testing.assert_allclose(steam.h(T=300.0, p=30.0), 0.115331273e3, rtol=1e-8)  # bar
+    np.testing.assert_allclose(steam.ps(T=500.0), 26.3889776, rtol=1e-8)
+    T, p = np.array([300.0, 500.0, 600.0, 400.0]), np.array([30.0, 30.0, 100.0, 1.0])
+    np.testing.assert_allclose(steam.p(T=T, s=steam.s(T=T, p=p)), p, rtol=1e-6)
+    assert np.isnan(steam.p(T=700.0, s=5.0))[0]  # region 3 is not implemented
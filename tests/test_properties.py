@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import properties
+
+
+def test_backends_are_imported_lazily():
+    code = "import sys, properties, cycle; print(sorted({'pyromat', 'tabulated', 'if97'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(properties.__file__))).stdout
+    assert out.strip() == '[]'
+
+
+def test_backend_is_built_once_on_first_use(monkeypatch):
+    calls = []
+    monkeypatch.setitem(properties._loaders, 'counting', lambda: calls.append(1) or properties.get_backend('if97'))
+    monkeypatch.setattr(properties, '_loaded', dict(properties._loaded))
+    lazy = properties.LazySteam('counting')
+    assert calls == [] and 'counting' not in properties.loaded_backends()
+    lazy.h(T=500.0, p=10.0)
+    lazy.s(T=500.0, p=10.0)
+    assert calls == [1]
+
+
+def test_set_backend_switches_shared_steam(monkeypatch):
+    monkeypatch.setattr(properties, '_active', ['tabulated'])
+    properties.set_backend('if97')
+    assert properties.active_backend() == 'if97'
+    assert properties.steam.h(T=700.0, p=30.0) == properties.get_backend('if97').h(T=700.0, p=30.0)
+    with pytest.raises(ValueError):
+        properties.set_backend('nope')
+    with pytest.raises(ValueError):
+        properties.get_backend('nope')
+
+
+# 300 K and 350 K are liquid at one atmosphere, 450 K is vapour
+@pytest.mark.parametrize('backend', ['tabulated', 'if97'])
+def test_temperature_only_calls_use_one_atmosphere(backend):
+    steam = properties.get_backend(backend)
+    T = np.array([300.0, 350.0, 450.0])
+    for key in 'hsd':
+        np.testing.assert_allclose(getattr(steam, key)(T=T), getattr(steam, key)(T=T, p=1.01325))
+    np.testing.assert_allclose(steam.h(T=T), [112.656, 321.843, 2829.689], rtol=1e-3)  # PYroMat
+
+
+# IF97 region 1 values of h and s
+def test_tabulated_compressed_liquid():
+    steam = properties.get_backend('tabulated')
+    T, p = np.array([300.0, 500.0]), np.array([30.0, 30.0])
+    np.testing.assert_allclose(steam.h(T=T, p=p), [115.331273, 975.542239], rtol=1e-3)
+    np.testing.assert_allclose(steam.s(T=T, p=p), [0.392294792, 2.58041912], rtol=1e-3)
+    np.testing.assert_allclose(steam.h(s=[0.392294792, 2.58041912], p=p), [115.331273, 975.542239], rtol=1e-3)
@@ -0,0 +1,17 @@
+import pytest
+
+import regression
+
+
+# The batched candidates are fast enough to gate every archived point on each test run
+@pytest.mark.parametrize('candidate', ['tabulated', 'if97'])
+def test_batched_candidate_matches_archive(candidate):
+    report = regression.check(candidate)
+    for design, result in report['designs'].items():
+        failed = [name for name, values in result['columns'].items() if not values['passed']]
+        assert not failed, f"design {design}: {failed}"
+        assert result['points'] == 210
+    for design in (2, 3):
+        cooling = report['designs'][design]['columns']['m_dot_cw']
+        assert cooling['excluded'] is None and cooling['max_rel'] <= report['gate']
+    assert report['passed']
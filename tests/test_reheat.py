@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import cycle
+import extraction
+import properties
+import reheat
+
+
+@pytest.fixture(scope='module')
+def study():
+    table, _ = reheat.study(p1_values=[10.0, 50.0, 100.0], backend='tabulated', samples=256, rounds=3)
+    return table
+
+
+def test_pareto_mask_matches_brute_force():
+    rng = np.random.default_rng(0)
+    group, eff, duty = rng.integers(0, 3, 300), rng.uniform(0.3, 0.5, 300), rng.uniform(1e4, 3e4, 300)
+    dominated = np.array([np.any((group == group[k]) & (eff >= eff[k]) & (duty <= duty[k])
+                                 & ((eff > eff[k]) | (duty < duty[k]))) for k in range(300)])
+    np.testing.assert_array_equal(reheat.pareto_mask(group, eff, duty), ~dominated)
+
+
+# No front member is beaten on both efficiency and reheater duty by another member of its design and point
+def test_front_members_do_not_dominate_each_other(study):
+    for key in set(zip(study['design'].tolist(), study['p1'].tolist(), study['Th'].tolist())):
+        at = (study['design'] == key[0]) & (study['p1'] == key[1]) & (study['Th'] == key[2])
+        eff, duty = study['regenerative_eff'][at], study['Q_reheat'][at]
+        assert len(eff)
+        better = (eff[:, None] >= eff[None, :]) & (duty[:, None] <= duty[None, :])
+        strictly = (eff[:, None] > eff[None, :]) | (duty[:, None] < duty[None, :])
+        assert not np.any(better & strictly)
+
+
+# Reheater outlets down to 10 K superheat lie below the turbine outlet temperature at low p1; those candidates
+# are infeasible and every feasible one heats the steam in each reheater
+def test_no_reheater_cools_the_steam():
+    steam = properties.get_backend('tabulated')
+    n = 2000
+    x = cycle._inputs(p1=np.full(n, 10.0), Th=873.0, turbEff=0.87, pumpEff=0.8, tc=303.15)
+    fractions = reheat._sample(np.random.default_rng(1), n, 6, extraction.MIN_GAP)
+    values = reheat.evaluate(steam, 3, x, fractions)
+    bleeds = {'p2': values['p2'], 'p3': values['p3'], 'p4': values['p4']}
+    state = cycle.expand_train(steam, 3, x, bleeds, [values['Tr1'], values['Tr2'], values['Tr3']])
+    cools = np.zeros(n, dtype=bool)
+    for i, j in cycle.REHEATS[3]:
+        cools |= state.h[j] < state.h[i]
+    assert cools.any() and values['feasible'].any()
+    assert not np.any(values['feasible'] & cools)
@@ -0,0 +1,72 @@
+import asyncio
+import concurrent.futures
+
+import numpy as np
+
+import service
+
+
+async def _exchange(head, backend='tabulated'):
+    solver = service.SolverService(backend=backend, workers=1)
+    server = await solver.start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(head)
+        await writer.drain()
+        response = await service._read_response(reader)
+        writer.close()
+        return response
+    finally:
+        await solver.stop()
+
+
+def test_malformed_request_line_is_bad_request():
+    status, body = asyncio.run(_exchange(b"GARBAGE\r\n\r\n"))
+    assert status == 400
+    assert 'Malformed' in body['error']
+
+
+def test_solve_request():
+    payload = b'{"design": 1, "p1": [50, 60], "Th": 800, "outputs": ["thermal_eff"]}'
+    head = (f"POST /solve HTTP/1.1\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n").encode()
+    status, body = asyncio.run(_exchange(head + payload))
+    assert status == 200
+    assert len(body['results']['thermal_eff']) == 2
+
+
+def test_body_over_limit_is_refused():
+    head = b"POST /solve HTTP/1.1\r\nContent-Length: 5000000\r\n\r\n"
+    status, body = asyncio.run(_exchange(head))
+    assert status == 413
+    assert 'limit' in body['error']
+
+
+# A request whose solve raises gets the error; the others of its micro-batch are still answered
+def test_failing_request_does_not_fail_its_batch(monkeypatch):
+    solve_batch = service._solve_batch
+
+    def failing(design, backend, inputs):
+        if np.any(inputs['p1'] < 0):
+            raise ValueError("negative boiler pressure")
+        return solve_batch(design, backend, inputs)
+
+    monkeypatch.setattr(service, '_solve_batch', failing)
+
+    async def run():
+        solver = service.SolverService(backend='tabulated', workers=1, max_wait=0.2)
+        solver.pool = concurrent.futures.ThreadPoolExecutor(1)  # the patched solve is not visible to processes
+        try:
+            return await asyncio.gather(
+                solver.solve({'design': 1, 'p1': [50, 60], 'Th': 800}),
+                solver.solve({'design': 1, 'p1': -5, 'Th': 800}),
+                solver.solve({'design': 1, 'p1': 70, 'Th': 800}),
+                return_exceptions=True), solver.metrics.batches
+        finally:
+            solver.pool.shutdown()
+
+    (first, bad, third), batches = asyncio.run(run())
+    assert isinstance(bad, ValueError)
+    assert len(first['results']['thermal_eff']) == 2
+    assert third['results']['thermal_eff'][0] > 0
+    assert batches == 2  # the failed batch was solved again for the two good requests
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import cycle
+import dispatch
+import store
+import surfaces
+
+
+@pytest.mark.parametrize('cogeneration', [False, True])
+def test_no_surface_reaches_carnot(results, cogeneration):
+    metric = 'elec_eff' if cogeneration else 'thermal_eff'
+    for design in (1, 2, 3):
+        surface = surfaces.build_surface(design, cogeneration=cogeneration, backend='tabulated')
+        carnot = 1 - surface.grids['tc'] / surface.grids['Th']
+        assert np.all(np.isfinite(surface.grids[metric]))
+        assert np.all(surface.grids[metric] < carnot)
+        p1, Th, best = surfaces.load_surface(design, cogeneration).optimum(metric)
+        assert best < 1 - 303.15 / Th
+
+
+def test_merit_order_follows_corrected_efficiency(results):
+    for design in (1, 2, 3):
+        surfaces.build_surface(design, backend='tabulated')
+    points = dispatch.operating_points(dispatch.DEFAULT_UNITS)
+    for unit, point in zip(dispatch.DEFAULT_UNITS, points):
+        expected = cycle.solve(unit['design'], point['p1'], point['Th'], backend='tabulated')['thermal_eff'][0]
+        assert point['efficiency'] == pytest.approx(expected, rel=1e-3)
+    # One unit's worth of demand at equal fuel prices goes to the most efficient unit alone
+    result = dispatch.dispatch([80000.0], 5.0, points=points)
+    best = dispatch.DEFAULT_UNITS[int(np.argmax([p['efficiency'] for p in points]))]['name']
+    assert result[f'power_{best}'][0] == pytest.approx(80000.0)
+
+
+def test_surface_of_an_older_solver_is_rebuilt(results):
+    surface = surfaces.build_surface(2, backend='tabulated')
+    store.save(surfaces.surface_name(2), {k: v.ravel() for k, v in surface.grids.items()},
+               {**surface.meta, 'revision': cycle.REVISION - 1})
+    with pytest.raises(LookupError, match='older solver'):
+        surfaces.load_surface(2)
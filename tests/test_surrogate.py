@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+import surrogate
+
+
+@pytest.mark.parametrize('kind, options', [('poly', {'degree': 5}), ('rbf', {}), ('spline', {})])
+def test_held_out_error_bounds(kind, options):
+    model = surrogate.build(2, kind, rounds=3, backend='tabulated', **options)
+    assert model.arrays['n_samples'] >= surrogate.basis_size(kind, **options) / surrogate.COMMITTEE_FRACTION
+    bounds = {'thermal_eff': 2e-2, 'm_dot': 2e-2, 'BWR': 0.15, 'Q_out_steam': 5e-2}
+    for name, bound in bounds.items():
+        assert model.errors['maxrel'][name] < bound, name
+    # The stored bounds hold on points the build never saw
+    X, Y = surrogate.sample_solver(2, surrogate.latin_hypercube(300, np.random.default_rng(7)), 'tabulated')
+    fresh = surrogate.error_bounds(model, X, Y)
+    for name in surrogate.OUTPUTS:
+        assert fresh['rms'][name] < 2 * model.errors['rms'][name], name
+
+
+def test_fit_refuses_fewer_samples_than_coefficients():
+    X = surrogate.latin_hypercube(100, np.random.default_rng(0))
+    with pytest.raises(ValueError, match='126 coefficients'):
+        surrogate.fit('poly', 1, X, np.ones((100, len(surrogate.OUTPUTS))), degree=5)